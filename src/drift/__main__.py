@@ -4,10 +4,6 @@ import os
 from argparse import ArgumentParser
 from logging.config import fileConfig
 
-from azure.identity import ClientSecretCredential
-from databricks.sdk import WorkspaceClient
-from pydataio.pipeline import Pipeline
-
 
 def parse_arguments():
     parser = ArgumentParser(description="Entrypoint for Spark job.")
@@ -15,6 +11,9 @@ def parse_arguments():
     parser.add_argument("--tenant", type=str, required=True, help="Tenant id")
     parser.add_argument("--vault_name", type=str, required=True, help="Vault Name")
     parser.add_argument("--data_asset_version", type=str, required=False, help="Data asset version for retraining")
+    parser.add_argument("--data_asset_changed", type=str, required=False, help="false to skip the retraining when the data did not change")
+    parser.add_argument("--run_id", type=str, required=False, help="Databricks job run id, kept when the task is retried")
+    parser.add_argument("--data_asset_versions", type=str, required=False, help="JSON map of the data asset names to their version for retraining")
     return parser.parse_args()
 
 
@@ -25,6 +24,11 @@ def main():
     logger.info("Starting pipeline...")
     args = parse_arguments()
 
+    # The SDKs are imported once the arguments are valid, the transformer imports its own dependencies when the pipeline loads it
+    from azure.identity import ClientSecretCredential
+    from databricks.sdk import WorkspaceClient
+    from pydataio.pipeline import Pipeline
+
     logger.info("Initialize databricks workspace client...")
     w = WorkspaceClient()
 
@@ -39,8 +43,17 @@ def main():
     logger.debug("Instantiating Pipeline...")
     pipeline = Pipeline()
     logger.info("Running pipeline...")
-    pipeline.run(args.config, credential, additionalArgs={"data_asset_version": args.data_asset_version, "vault_name": args.vault_name})
-    logger.info("Pipeline completed.")
+    pipeline.run(
+        args.config,
+        credential,
+        additionalArgs={
+            "data_asset_version": args.data_asset_version,
+            "data_asset_changed": args.data_asset_changed,
+            "data_asset_versions": args.data_asset_versions,
+            "run_id": args.run_id,
+            "vault_name": args.vault_name,
+        },
+    )
     logger.info("Pipeline completed.")
 
 
@@ -0,0 +1,6 @@
+DELTA_VERSION_TAG = "delta_version"
+DELTA_TIMESTAMP_TAG = "delta_timestamp"
+DELTA_BASE_VERSION_TAG = "delta_base_version"
+DELTA_APPEND_ONLY_TAG = "delta_append_only"
+DRIFT_SCORE_TAG = "drift_score"
+DRIFT_STATISTICS_PROPERTY = "drift_statistics"
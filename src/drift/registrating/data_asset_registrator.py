@@ -1,9 +1,16 @@
+import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
-import mltable
 from azure.ai.ml import MLClient
 from azure.ai.ml.constants import AssetTypes
 from azure.ai.ml.entities import Data, AzureDataLakeGen2Datastore, ServicePrincipalConfiguration
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
+
+from drift.registrating.asset_tags import DELTA_APPEND_ONLY_TAG, DELTA_BASE_VERSION_TAG, DELTA_TIMESTAMP_TAG, DELTA_VERSION_TAG, DRIFT_SCORE_TAG, DRIFT_STATISTICS_PROPERTY
+from drift.registrating.delta_table_inspector import DeltaChanges, DeltaCommit
+from drift.registrating.mltable_spec_builder import mltable_spec_builder
 
 logger = logging.getLogger(__name__)
 
@@ -18,32 +25,62 @@ class DataAssetRegistrator:
     parameters: dict[str, str]
     mltable_name: str
     data_asset_uri: str
+    incremental_mltable_name: str
     version: str
-    delta_timestamp: str
+    delta_commit: DeltaCommit
+    tags: dict[str, str]
+    properties: dict[str, str]
+    delta_changes: Optional[DeltaChanges]
 
-    def __init__(self, ml_client: MLClient, sp_config: ServicePrincipalConfiguration, parameters: dict[str, str], version: str, delta_timestamp: str):
+    def __init__(self, ml_client: MLClient, sp_config: ServicePrincipalConfiguration, parameters: dict[str, str], version: str, delta_commit: DeltaCommit):
         """
         Constructor
         Args:
             ml_client: the ML client
             sp_config: the service principal configuration
             parameters: the job parameters
+            version: the version of the data assets
+            delta_commit: the Delta commit the data assets are pinned to, recorded in their tags
         """
         self.ml_client = ml_client
         self.sp_config = sp_config
         self.version = version
-        self.delta_timestamp = delta_timestamp
+        self.delta_commit = delta_commit
         self.parameters = parameters
+        self.tags = {DELTA_VERSION_TAG: str(delta_commit.version), DELTA_TIMESTAMP_TAG: delta_commit.timestamp.isoformat()}
+        self.properties = {}
+        self.delta_changes = None
+
+        self.mltable_name = self.compute_mltable_name(parameters)
+        self.data_asset_uri = self.compute_uri_name(parameters)
+        self.incremental_mltable_name = f"{self.compute_asset_base_name(parameters)}-delta-mltable"
 
+    @staticmethod
+    def compute_asset_base_name(parameters: dict[str, str]) -> str:
         path_asset_name = parameters["container_path"].replace("/", "-").lstrip("-").rstrip("-")
-        self.mltable_name = f"{parameters['container_name']}-{path_asset_name}-mltable"
-        self.data_asset_uri = f"{parameters['container_name']}-{path_asset_name}-uri"
+        return f"{parameters['container_name']}-{path_asset_name}"
+
+    @staticmethod
+    def compute_mltable_name(parameters: dict[str, str]) -> str:
+        return f"{DataAssetRegistrator.compute_asset_base_name(parameters)}-mltable"
 
-    def register_dataset(self):
+    @staticmethod
+    def compute_uri_name(parameters: dict[str, str]) -> str:
+        return f"{DataAssetRegistrator.compute_asset_base_name(parameters)}-uri"
+
+    def register_dataset(self, data_asset_names: Optional[list[str]] = None):
         """
         Register the dataset in the ML workspace
 
+        The URI data asset and the incremental MLTable only depend on the datastore, so they are registered concurrently
+        once it exists. The MLTable is registered last, once they succeeded: a registered MLTable version marks a complete
+        registration, and a failed one is registered again by the next run.
+        Args:
+            data_asset_names: the names of the data assets to register, by default all of them
         """
+        if data_asset_names is None:
+            data_asset_names = [self.data_asset_uri, self.incremental_mltable_name, self.mltable_name]
+
         datastore_name = self.parameters["container_name"].replace("-", "_")
 
         store = AzureDataLakeGen2Datastore(
@@ -54,13 +91,65 @@ class DataAssetRegistrator:
             credentials=self.sp_config,
         )
 
-        created_datastore = self.ml_client.create_or_update(store)
-        logger.debug("Datastore created or updated: %s", created_datastore)
+        if self.is_datastore_up_to_date(store):
+            logger.debug("Datastore %s is up to date", datastore_name)
+        else:
+            created_datastore = self.ml_client.create_or_update(store)
+            logger.debug("Datastore created or updated: %s", created_datastore)
 
         azml_path_datastore = f"azureml://subscriptions/{self.parameters['subscription_id']}/resourcegroups/{self.parameters['resource_group']}/workspaces/{self.parameters['ml_workspace_name']}/datastores/{datastore_name}/paths/{self.parameters['container_path']}"
 
-        self.register_mltable(azml_path_datastore)
-        self.register_uri_data_asset(azml_path_datastore)
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="drift-register") as executor:
+            registrations = {}
+            if self.data_asset_uri in data_asset_names:
+                registrations[self.data_asset_uri] = executor.submit(self.register_uri_data_asset, azml_path_datastore)
+            if self.incremental_mltable_name in data_asset_names and self.delta_changes is not None:
+                if len(self.delta_changes.added_files) > 0:
+                    registrations[self.incremental_mltable_name] = executor.submit(self.register_incremental_mltable, azml_path_datastore)
+                else:
+                    logger.info("No file added since Delta version %s, the incremental MLTable is not registered.", self.delta_changes.base_version)
+
+        errors = {}
+        for data_asset_name, registration in registrations.items():
+            error = registration.exception()
+            if error is not None:
+                logger.error("Failed to register data asset %s: %s", data_asset_name, error, exc_info=error)
+                errors[data_asset_name] = error
+
+        if self.mltable_name in data_asset_names and len(errors) == 0:
+            try:
+                self.register_mltable(azml_path_datastore)
+            except Exception as error:
+                logger.error("Failed to register data asset %s: %s", self.mltable_name, error, exc_info=error)
+                errors[self.mltable_name] = error
+        elif self.mltable_name in data_asset_names:
+            logger.info("The MLTable %s is not registered, so that version %s is registered again by the next run.", self.mltable_name, self.version)
+
+        if len(errors) > 0:
+            raise Exception(f"Failed to register data assets {', '.join(errors)}: {'; '.join(str(error) for error in errors.values())}") from next(iter(errors.values()))
+
+    def is_datastore_up_to_date(self, store: AzureDataLakeGen2Datastore) -> bool:
+        """
+        Check if the datastore already exists with the same account, filesystem and credentials
+        Args:
+            store: the expected datastore
+
+        Returns: True if the upsert of the datastore can be skipped
+        """
+        try:
+            existing_store = self.ml_client.datastores.get(store.name, include_secrets=True)
+        except HttpResponseError as error:
+            if not isinstance(error, ResourceNotFoundError):
+                logger.debug("Cannot read datastore %s, upsert it: %s", store.name, error)
+            return False
+
+        existing_credentials = getattr(existing_store, "credentials", None)
+        return (
+            getattr(existing_store, "account_name", None) == store.account_name
+            and getattr(existing_store, "filesystem", None) == store.filesystem
+            and isinstance(existing_credentials, ServicePrincipalConfiguration)
+            and all(getattr(existing_credentials, key, None) == getattr(store.credentials, key, None) for key in ("tenant_id", "client_id", "client_secret"))
+        )
 
     def register_mltable(self, azml_path_datastore: str):
         """
@@ -68,14 +157,45 @@ class DataAssetRegistrator:
         Args:
             azml_path_datastore: the path to the ML data store
         """
+        with mltable_spec_builder.build(azml_path_datastore, self.delta_commit.version, self.mltable_name) as spec_path:
+            mltable_data_asset = Data(
+                path=spec_path,
+                type=AssetTypes.MLTABLE,
+                description="data asset using mltable.",
+                name=self.mltable_name,
+                version=self.version,
+                tags=self.tags,
+                properties=self.properties,
+            )
+            registered_mltable = self.ml_client.data.create_or_update(mltable_data_asset)
+            logger.debug("MLTable data asset created or updated: %s", mltable_data_asset)
 
-        table = mltable.from_delta_lake(azml_path_datastore, timestamp_as_of=self.delta_timestamp)
-        table.save(f"./{self.mltable_name}")
-        logger.debug("MLTable saved: %s", self.mltable_name)
+        mltable_spec_builder.record_upload(azml_path_datastore, self.delta_commit.version, registered_mltable.path)
 
-        mltable_data_asset = Data(path=f"./{self.mltable_name}", type=AssetTypes.MLTABLE, description="data asset using mltable.", name=self.mltable_name, version=self.version)
-        self.ml_client.data.create_or_update(mltable_data_asset)
-        logger.debug("MLTable data asset created or updated: %s", mltable_data_asset)
+    def register_incremental_mltable(self, azml_path_datastore: str):
+        """
+        Register the MLTable of the files added since the previously registered Delta version in the ML workspace
+        Args:
+            azml_path_datastore: the path to the ML data store
+        """
+        tags = dict(self.tags)
+        tags[DELTA_APPEND_ONLY_TAG] = str(self.delta_changes.append_only).lower()
+        if self.delta_changes.base_version is not None:
+            tags[DELTA_BASE_VERSION_TAG] = str(self.delta_changes.base_version)
+
+        with mltable_spec_builder.build_incremental(azml_path_datastore, self.delta_changes, self.incremental_mltable_name) as spec_path:
+            incremental_data_asset = Data(
+                path=spec_path,
+                type=AssetTypes.MLTABLE,
+                description="data asset of the files added since the previous version.",
+                name=self.incremental_mltable_name,
+                version=self.version,
+                tags=tags,
+            )
+            registered_mltable = self.ml_client.data.create_or_update(incremental_data_asset)
+            logger.debug("Incremental MLTable data asset created or updated: %s", incremental_data_asset)
+
+        mltable_spec_builder.record_upload(azml_path_datastore, self.delta_changes.version, registered_mltable.path, base_version=self.delta_changes.base_version)
 
     def register_uri_data_asset(self, azml_path_datastore: str):
         """
@@ -84,6 +204,72 @@ class DataAssetRegistrator:
             azml_path_datastore: the path to the ML data store
 
         """
-        uri_data_asset = Data(path=azml_path_datastore, type=AssetTypes.URI_FOLDER, description="Uri Data Asset", name=self.data_asset_uri, version=self.version)
+        uri_data_asset = Data(path=azml_path_datastore, type=AssetTypes.URI_FOLDER, description="Uri Data Asset", name=self.data_asset_uri, version=self.version, tags=self.tags, properties=self.properties)
         self.ml_client.data.create_or_update(uri_data_asset)
         logger.debug("URI Data asset created or updated: %s", uri_data_asset)
+
+    def get_missing_data_assets(self) -> list[str]:
+        """
+        Get the data assets without the version pinned to the Delta commit
+        Returns: the names of the URI data asset, the incremental MLTable and the MLTable not registered yet with the version
+        """
+        missing_data_assets = []
+        for data_asset_name in (self.data_asset_uri, self.incremental_mltable_name, self.mltable_name):
+            try:
+                self.ml_client.data.get(name=data_asset_name, version=self.version)
+            except ResourceNotFoundError:
+                missing_data_assets.append(data_asset_name)
+
+        return missing_data_assets
+
+    def get_latest_mltable(self) -> Optional[Data]:
+        """
+        Get the latest registered MLTable
+        Returns: the data asset, None if nothing is registered
+        """
+        try:
+            return self.ml_client.data.get(name=self.mltable_name, label="latest")
+        except ResourceNotFoundError:
+            return None
+
+    def get_latest_statistics(self) -> Optional[dict]:
+        """
+        Get the drift statistics of the latest registered MLTable
+        Returns: the statistics, None if the latest version has no statistics or nothing is registered
+        """
+        registered_mltable = self.get_latest_mltable()
+        if registered_mltable is None:
+            return None
+
+        statistics = (registered_mltable.properties or {}).get(DRIFT_STATISTICS_PROPERTY, None)
+        return None if statistics is None else json.loads(statistics)
+
+    def get_latest_delta_version(self) -> Optional[int]:
+        """
+        Get the Delta version of the latest registered MLTable
+        Returns: the Delta version, None if nothing is registered or the latest version has no delta_version tag
+        """
+        registered_mltable = self.get_latest_mltable()
+        if registered_mltable is None:
+            return None
+
+        delta_version = (registered_mltable.tags or {}).get(DELTA_VERSION_TAG, None)
+        return None if delta_version is None else int(delta_version)
+
+    def set_delta_changes(self, delta_changes: DeltaChanges):
+        """
+        Register the incremental MLTable of the changes with the data assets
+        Args:
+            delta_changes: the files added since the previously registered Delta version
+        """
+        self.delta_changes = delta_changes
+
+    def set_drift_statistics(self, statistics: dict):
+        """
+        Record the drift statistics of the snapshot with the data assets
+        Args:
+            statistics: the statistics computed by the drift analyzer
+        """
+        self.properties[DRIFT_STATISTICS_PROPERTY] = json.dumps(statistics)
+        if statistics.get("drift_score", None) is not None:
+            self.tags[DRIFT_SCORE_TAG] = str(statistics["drift_score"])
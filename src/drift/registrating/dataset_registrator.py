@@ -1,12 +1,17 @@
 import logging
-from datetime import datetime
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
+from azure.ai.ml.entities import ServicePrincipalConfiguration
 from pydataio.job_config import JobConfig
 from pydataio.transformer import Transformer
 from pyspark.sql import SparkSession
 
 from drift.registrating.data_asset_registrator import DataAssetRegistrator
-from drift.tools.azml import init_ml_flow_utils
+from drift.registrating.delta_table_inspector import DeltaCommit, DeltaTableInspector
+from drift.tools.azml import MlFlowUtils, init_ml_flow_utils
 
 logger = logging.getLogger(__name__)
 
@@ -23,52 +28,197 @@ class DatasetRegistrator(Transformer):
             jobConfig: the job configuration
             spark: the spark session
         """
+        datasets = jobConfig.parameters.get("datasets", None)
+        if datasets is not None:
+            self.register_datasets(jobConfig, spark, additionalArgs, datasets)
+            return
+
         parameters = self.load_parameters(jobConfig)
-        version, delta_timestamp = self.compute_version()
 
         ml_flow_utils = init_ml_flow_utils(jobConfig, additionalArgs["vault_name"])
+        version, changed = self.register(jobConfig, spark, parameters, ml_flow_utils)
+
+        self.publish_new_version(version, changed, self.compute_data_asset_versions(parameters, version, changed))
+
+    def register_datasets(self, jobConfig: JobConfig, spark: SparkSession, additionalArgs: dict, datasets: list[dict]):
+        """
+        Register a new version of several datasets concurrently, with shared clients
+        Args:
+            jobConfig: the job configuration
+            spark: the spark session
+            additionalArgs: the additional arguments
+            datasets: the dataset specifications, each with its own containerName and containerDataPath, and optionally its storageAccountName
+        """
+        dataset_parameters = {}
+        for dataset in datasets:
+            parameters = self.load_parameters(jobConfig, dataset)
+            mltable_name = DataAssetRegistrator.compute_mltable_name(parameters)
+            if mltable_name in dataset_parameters:
+                raise Exception(f"Dataset {mltable_name} is configured more than once.")
+            dataset_parameters[mltable_name] = parameters
+
+        ml_flow_utils = init_ml_flow_utils(jobConfig, additionalArgs["vault_name"])
+
+        max_workers = int(jobConfig.parameters.get("registrationMaxWorkers", 4))
+        logger.info("Register %s datasets with %s workers", len(dataset_parameters), max_workers)
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="drift-dataset") as executor:
+            registrations = {name: executor.submit(self.register, jobConfig, spark, parameters, ml_flow_utils) for name, parameters in dataset_parameters.items()}
+
+        data_asset_versions = {}
+        errors = {}
+        for name, registration in registrations.items():
+            error = registration.exception()
+            if error is not None:
+                logger.error("Failed to register dataset %s: %s", name, error, exc_info=error)
+                errors[name] = error
+                continue
 
-        data_asset_registrator = DataAssetRegistrator(ml_flow_utils.ml_client, ml_flow_utils.sp_config, parameters, version, delta_timestamp)
-        data_asset_registrator.register_dataset()
+            version, changed = registration.result()
+            data_asset_versions.update(self.compute_data_asset_versions(dataset_parameters[name], version, changed))
 
-        self.publish_new_version(version)
+        if len(errors) > 0:
+            raise Exception(f"Failed to register datasets {', '.join(errors)}: {'; '.join(str(error) for error in errors.values())}") from next(iter(errors.values()))
 
-    def publish_new_version(self, new_version: str):
+        changed = any(data_asset_version["changed"] for data_asset_version in data_asset_versions.values())
+        self.publish_new_version(None, changed, data_asset_versions)
+
+    def register(self, jobConfig: JobConfig, spark: SparkSession, parameters: dict[str, str], ml_flow_utils: MlFlowUtils) -> tuple[str, bool]:
         """
-        Publish the new version of the data asset to databricks
+        Register the data assets of a dataset missing the version of its latest Delta commit, none if it is already registered
         Args:
-            new_version: the new version
+            jobConfig: the job configuration
+            spark: the spark session
+            parameters: the parameters of the dataset
+            ml_flow_utils: the ML flow utils
+
+        Returns: the version of the data assets, and False if the data did not change and must not be retrained on
+        """
+        delta_table_inspector = DeltaTableInspector(parameters, ml_flow_utils.sp_config)
+        delta_commit = delta_table_inspector.get_latest_commit()
+        version = self.compute_version(delta_commit)
+
+        data_asset_registrator = DataAssetRegistrator(ml_flow_utils.ml_client, ml_flow_utils.sp_config, parameters, version, delta_commit)
+
+        missing_data_assets = data_asset_registrator.get_missing_data_assets()
+        if data_asset_registrator.mltable_name not in missing_data_assets:
+            # The MLTable is registered last, but the URI data asset of the versions registered before may be missing
+            if data_asset_registrator.data_asset_uri in missing_data_assets:
+                logger.warning("Data asset %s is missing version %s, register it again.", data_asset_registrator.data_asset_uri, version)
+                data_asset_registrator.register_dataset([data_asset_registrator.data_asset_uri])
+
+            skip_unchanged = str(jobConfig.parameters.get("skipUnchanged", "false")).lower() == "true"
+            logger.info("No new commit in the Delta table since version %s, skip the registration.", version)
+            # Without skipUnchanged, the downstream models are still retrained on the registered version
+            return version, not skip_unchanged
+
+        if str(jobConfig.parameters.get("driftAnalysis", "false")).lower() == "true":
+            self.analyze_drift(jobConfig, spark, parameters, ml_flow_utils.sp_config, delta_table_inspector, delta_commit, data_asset_registrator)
+
+        if str(jobConfig.parameters.get("incrementalAsset", "false")).lower() == "true":
+            previously_registered = data_asset_registrator.get_latest_mltable() is not None
+            base_version = data_asset_registrator.get_latest_delta_version() if previously_registered else None
+            data_asset_registrator.set_delta_changes(delta_table_inspector.get_changes(base_version, delta_commit.version, previously_registered))
+
+        data_asset_registrator.register_dataset(missing_data_assets)
+
+        return version, True
+
+    @staticmethod
+    def analyze_drift(
+        jobConfig: JobConfig,
+        spark: SparkSession,
+        parameters: dict[str, str],
+        sp_config: ServicePrincipalConfiguration,
+        delta_table_inspector: DeltaTableInspector,
+        delta_commit: DeltaCommit,
+        data_asset_registrator: DataAssetRegistrator,
+    ):
+        """
+        Compute the drift statistics of the new snapshot against the latest registered one and record them with the data assets
+        Args:
+            jobConfig: the job configuration
+            spark: the spark session
+            parameters: the job parameters
+            sp_config: the service principal configuration
+            delta_table_inspector: the inspector of the Delta table
+            delta_commit: the Delta commit of the new snapshot
+            data_asset_registrator: the registrator of the data assets
+        """
+        bins = int(jobConfig.parameters.get("driftBins", 10))
+        columns = jobConfig.parameters.get("driftColumns", None)
+
+        # Each drift engine imports its own dependencies
+        if jobConfig.parameters.get("driftEngine", "spark") == "sketch":
+            from drift.registrating.sketch_cache import SketchCache
+            from drift.registrating.sketch_drift_analyzer import SketchDriftAnalyzer
+
+            sketch_cache = SketchCache(jobConfig.parameters.get("sketchCachePath", os.path.join(tempfile.gettempdir(), "drift-sketches")))
+            drift_analyzer = SketchDriftAnalyzer(delta_table_inspector.table_uri, delta_table_inspector.storage_options, sketch_cache, bins, columns)
+        else:
+            from drift.registrating.drift_analyzer import DriftAnalyzer
+
+            drift_analyzer = DriftAnalyzer(spark, delta_table_inspector.table_uri, bins, columns)
+            drift_analyzer.configure_storage_access(parameters["storage_account_name"], sp_config)
+
+        statistics = drift_analyzer.compute_statistics(delta_commit.version, data_asset_registrator.get_latest_statistics())
+        data_asset_registrator.set_drift_statistics(statistics)
+
+    def publish_new_version(self, new_version: Optional[str], changed: bool, data_asset_versions: dict[str, dict]):
+        """
+        Publish the new version of the data assets to databricks
+        Args:
+            new_version: the new version, None when several datasets with their own version are registered
+            changed: False when the data did not change since the previous registration
+            data_asset_versions: the version and whether it changed by registered data asset name, as read by the data_asset_versions argument
 
         """
         from databricks.sdk.runtime import dbutils
 
-        dbutils.jobs.taskValues.set(key="data_asset_version", value=new_version)
+        dbutils.jobs.taskValues.set(key="data_asset_version", value=new_version or "")
+        dbutils.jobs.taskValues.set(key="data_asset_changed", value=str(changed).lower())
+        dbutils.jobs.taskValues.set(key="data_asset_versions", value=data_asset_versions)
 
     @staticmethod
-    def load_parameters(jobConfig: JobConfig) -> dict[str, str]:
+    def compute_data_asset_versions(parameters: dict[str, str], version: str, changed: bool) -> dict[str, dict]:
+        """
+        Compute the published entries of a dataset
+        Args:
+            parameters: the parameters of the dataset
+            version: the version of its data assets
+            changed: False when the data did not change since the previous registration
+
+        Returns: the version and whether it changed by data asset name, for the MLTable and the URI data asset
+        """
+        data_asset_version = {"version": version, "changed": changed}
+        return {DataAssetRegistrator.compute_mltable_name(parameters): data_asset_version, DataAssetRegistrator.compute_uri_name(parameters): dict(data_asset_version)}
+
+    @staticmethod
+    def load_parameters(jobConfig: JobConfig, dataset: Optional[dict] = None) -> dict[str, str]:
         """
         Load the parameters from the job configuration
         Args:
             jobConfig: the job configuration
+            dataset: the specification of one of the datasets, None for the dataset of the job parameters
         """
+        dataset = dataset or jobConfig.parameters
         parameters = {
             "subscription_id": jobConfig.parameters["azml"]["subscriptionId"],
             "resource_group": jobConfig.parameters["azml"]["resourceGroup"],
             "ml_workspace_name": jobConfig.parameters["azml"]["mlWorkspaceName"],
-            "storage_account_name": jobConfig.parameters["storageAccountName"],
-            "container_name": jobConfig.parameters["containerName"],
-            "container_path": jobConfig.parameters["containerDataPath"],
+            "storage_account_name": dataset.get("storageAccountName", None) or jobConfig.parameters["storageAccountName"],
+            "container_name": dataset["containerName"],
+            "container_path": dataset["containerDataPath"],
         }
 
         return parameters
 
     @staticmethod
-    def compute_version() -> (str, str):
-        """
-        Compute the new version of the data assets
+    def compute_version(delta_commit: DeltaCommit) -> str:
         """
-        current_datetime = datetime.now()
-        delta_timestamp = current_datetime.strftime("%Y-%m-%dT%H:%M:%SZ")
-        version = current_datetime.strftime("%Y%m%d%H%M%S")
+        Compute the version of the data assets pinned to a Delta commit
+        Args:
+            delta_commit: the Delta commit
 
-        return version, delta_timestamp
+        Returns: the commit timestamp followed by the commit version, e.g. 20231115120000-v42
+        """
+        return f"{delta_commit.timestamp.strftime('%Y%m%d%H%M%S')}-v{delta_commit.version}"
@@ -0,0 +1,126 @@
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from azure.ai.ml.entities import ServicePrincipalConfiguration
+from deltalake import DeltaTable
+
+logger = logging.getLogger(__name__)
+
+
+class DeltaCommit:
+    """
+    A commit of a Delta table
+    """
+
+    version: int
+    timestamp: datetime
+
+    def __init__(self, version: int, timestamp: datetime):
+        self.version = version
+        self.timestamp = timestamp
+
+    def __str__(self):
+        return f"DeltaCommit(version={self.version}, timestamp={self.timestamp})"
+
+
+class DeltaChanges:
+    """
+    The data files added to a Delta table between two commits
+    """
+
+    base_version: Optional[int]
+    version: int
+    added_files: list[str]
+    partition_columns: list[str]
+    append_only: bool
+
+    def __init__(self, base_version: Optional[int], version: int, added_files: list[str], partition_columns: list[str], append_only: bool):
+        """
+        Constructor
+        Args:
+            base_version: the previous Delta version, None if all the files of the version are new
+            version: the Delta version
+            added_files: the paths of the added files relative to the table
+            partition_columns: the partition columns of the table
+            append_only: True if no file of the base version was removed, so the added files hold exactly the new rows
+        """
+        self.base_version = base_version
+        self.version = version
+        self.added_files = added_files
+        self.partition_columns = partition_columns
+        self.append_only = append_only
+
+    def __str__(self):
+        return f"DeltaChanges(base_version={self.base_version}, version={self.version}, added_files={len(self.added_files)}, append_only={self.append_only})"
+
+
+class DeltaTableInspector:
+    """
+    Read the transaction log of the Delta table registered as data asset
+    """
+
+    table_uri: str
+    storage_options: dict[str, str]
+
+    def __init__(self, parameters: dict[str, str], sp_config: ServicePrincipalConfiguration):
+        """
+        Constructor
+        Args:
+            parameters: the job parameters
+            sp_config: the service principal configuration
+        """
+        container_path = parameters["container_path"].strip("/")
+        self.table_uri = f"abfss://{parameters['container_name']}@{parameters['storage_account_name']}.dfs.core.windows.net/{container_path}"
+        self.storage_options = {
+            "azure_tenant_id": sp_config.tenant_id,
+            "azure_client_id": sp_config.client_id,
+            "azure_client_secret": sp_config.client_secret,
+        }
+
+    def get_latest_commit(self) -> DeltaCommit:
+        """
+        Get the latest commit of the Delta table, reading the transaction log only
+        Returns: the latest commit
+        """
+        delta_table = DeltaTable(self.table_uri, storage_options=self.storage_options, without_files=True)
+        commit_info = delta_table.history(limit=1)[0]
+
+        latest_commit = DeltaCommit(version=delta_table.version(), timestamp=datetime.fromtimestamp(commit_info["timestamp"] / 1000, tz=timezone.utc))
+        logger.info("Latest commit of %s: %s", self.table_uri, latest_commit)
+
+        return latest_commit
+
+    def get_changes(self, base_version: Optional[int], version: int, previously_registered: bool = False) -> DeltaChanges:
+        """
+        Get the data files added between two versions of the Delta table, from the file lists of their snapshots
+        Args:
+            base_version: the previously registered Delta version, None to consider all the files as new
+            version: the Delta version to register
+            previously_registered: True if a previous version of the data assets is registered, even without its Delta version
+
+        Returns: the changes of the Delta table
+        """
+        delta_table = DeltaTable(self.table_uri, version=version, storage_options=self.storage_options)
+        files = delta_table.files()
+        partition_columns = delta_table.metadata().partition_columns
+
+        if base_version is None:
+            # Without the Delta version of a previously registered version, its rows may have been rewritten since
+            return DeltaChanges(None, version, files, partition_columns, not previously_registered)
+
+        try:
+            base_files = set(DeltaTable(self.table_uri, version=base_version, storage_options=self.storage_options).files())
+        except Exception as error:
+            # The log of the base version may be vacuumed or expired: all the files are then considered as new
+            logger.warning("Cannot load Delta version %s of %s, consider all the files as new: %s", base_version, self.table_uri, error)
+            return DeltaChanges(None, version, files, partition_columns, False)
+
+        added_files = [file for file in files if file not in base_files]
+        # Updates, deletes, overwrites and compactions remove files: the added files then also hold rows of the base version
+        append_only = base_files.issubset(files)
+
+        changes = DeltaChanges(base_version, version, added_files, partition_columns, append_only)
+        logger.info("Changes of %s since Delta version %s: %s", self.table_uri, base_version, changes)
+
+        return changes
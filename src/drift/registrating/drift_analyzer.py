@@ -0,0 +1,198 @@
+import logging
+import math
+from typing import Optional
+
+from azure.ai.ml.entities import ServicePrincipalConfiguration
+from pyspark.sql import SparkSession
+from pyspark.sql import functions as F
+from pyspark.sql.types import NumericType
+
+logger = logging.getLogger(__name__)
+
+PSI_EPSILON = 1e-4
+
+
+class DriftAnalyzer:
+    """
+    Compute the statistics of a Delta table snapshot and its drift from the previously registered snapshot
+
+    All the statistics are computed in a single Spark aggregation: row and null counts, approximate distinct counts,
+    approximate quantiles of the numeric columns and their histogram over the quantiles of the previous snapshot,
+    from which the population stability index (PSI) of each numeric column is derived.
+    """
+
+    spark: SparkSession
+    table_uri: str
+    bins: int
+    columns: Optional[list[str]]
+
+    def __init__(self, spark: SparkSession, table_uri: str, bins: int = 10, columns: Optional[list[str]] = None):
+        """
+        Constructor
+        Args:
+            spark: the spark session
+            table_uri: the URI of the Delta table
+            bins: the number of quantile bins of the histograms
+            columns: the columns to analyze, None for all the columns
+        """
+        self.spark = spark
+        self.table_uri = table_uri
+        self.bins = bins
+        self.columns = columns
+
+    def configure_storage_access(self, storage_account_name: str, sp_config: ServicePrincipalConfiguration):
+        """
+        Configure the spark session to read the storage account with the service principal
+        Args:
+            storage_account_name: the storage account name
+            sp_config: the service principal configuration
+        """
+        account = f"{storage_account_name}.dfs.core.windows.net"
+        self.spark.conf.set(f"fs.azure.account.auth.type.{account}", "OAuth")
+        self.spark.conf.set(f"fs.azure.account.oauth.provider.type.{account}", "org.apache.hadoop.fs.azurebfs.oauth2.ClientCredsTokenProvider")
+        self.spark.conf.set(f"fs.azure.account.oauth2.client.id.{account}", sp_config.client_id)
+        self.spark.conf.set(f"fs.azure.account.oauth2.client.secret.{account}", sp_config.client_secret)
+        self.spark.conf.set(f"fs.azure.account.oauth2.client.endpoint.{account}", f"https://login.microsoftonline.com/{sp_config.tenant_id}/oauth2/token")
+
+    def compute_statistics(self, delta_version: int, previous_statistics: Optional[dict]) -> dict:
+        """
+        Compute the statistics of a snapshot of the Delta table
+        Args:
+            delta_version: the Delta version of the snapshot
+            previous_statistics: the statistics of the previously registered snapshot, None for the first registration
+
+        Returns: the statistics of the snapshot with the drift score, the highest PSI of its columns
+        """
+        data_frame = self.spark.read.format("delta").option("versionAsOf", delta_version).load(self.table_uri)
+        columns = [field for field in data_frame.schema.fields if self.columns is None or field.name in self.columns]
+        previous_columns = (previous_statistics or {}).get("columns", {})
+        levels = [index / self.bins for index in range(1, self.bins)]
+
+        aggregations = [F.count(F.lit(1)).alias("row_count")]
+        histogram_edges: dict[str, list[tuple[float, float]]] = {}
+        for index, field in enumerate(columns):
+            column = F.col(f"`{field.name}`")
+            aggregations.append(F.count(column).alias(f"c{index}_count"))
+            aggregations.append(F.approx_count_distinct(column).alias(f"c{index}_distinct"))
+
+            if isinstance(field.dataType, NumericType):
+                aggregations.append(F.percentile_approx(column, levels).alias(f"c{index}_quantiles"))
+
+                edges = self.compute_histogram_edges(previous_columns.get(field.name, {}).get("quantiles", None), levels)
+                if edges is not None:
+                    histogram_edges[field.name] = edges
+                    aggregations.extend(self.histogram_aggregations(column, [edge for edge, _ in edges], f"c{index}_bin"))
+
+        result = data_frame.agg(*aggregations).collect()[0]
+        row_count = result["row_count"]
+
+        statistics_columns = {}
+        for index, field in enumerate(columns):
+            non_null_count = result[f"c{index}_count"]
+            column_statistics = {
+                "null_rate": 0.0 if row_count == 0 else (row_count - non_null_count) / row_count,
+                "distinct": result[f"c{index}_distinct"],
+            }
+
+            if isinstance(field.dataType, NumericType):
+                quantiles = result[f"c{index}_quantiles"]
+                column_statistics["quantiles"] = None if quantiles is None else [float(quantile) for quantile in quantiles]
+
+            if field.name in histogram_edges and non_null_count > 0:
+                edges = histogram_edges[field.name]
+                actual = [result[f"c{index}_bin{bin_index}"] / non_null_count for bin_index in range(len(edges) + 1)]
+                column_statistics["psi"] = self.compute_psi(self.expected_proportions(edges), actual)
+
+            statistics_columns[field.name] = column_statistics
+
+        statistics = {"delta_version": delta_version, "row_count": row_count, "columns": statistics_columns}
+        statistics["drift_score"] = self.get_drift_score(statistics)
+        logger.info("Drift score of Delta version %s: %s", delta_version, statistics["drift_score"])
+
+        return statistics
+
+    @staticmethod
+    def compute_histogram_edges(previous_quantiles: Optional[list[float]], levels: list[float]) -> Optional[list[tuple[float, float]]]:
+        """
+        Compute the edges of the histogram from the quantiles of the previous snapshot
+        Args:
+            previous_quantiles: the quantiles of the column in the previous snapshot
+            levels: the levels of the quantiles
+
+        Returns: the distinct edges with the share of the previous snapshot below each of them, None without previous quantiles
+        """
+        if previous_quantiles is None or len(previous_quantiles) != len(levels):
+            return None
+
+        edges: dict[float, float] = {}
+        for quantile, level in zip(previous_quantiles, levels):
+            edges[quantile] = max(level, edges.get(quantile, 0.0))
+
+        return sorted(edges.items())
+
+    @staticmethod
+    def histogram_aggregations(column, edges: list[float], alias_prefix: str) -> list:
+        """
+        Build the aggregations counting the values of each bin of the histogram
+        Args:
+            column: the column
+            edges: the sorted edges of the bins
+            alias_prefix: the prefix of the aggregation aliases
+
+        Returns: one count per bin, the first bin below the first edge and the last one above the last edge
+        """
+        aggregations = []
+        lower_edge = None
+        for bin_index, upper_edge in enumerate(edges + [None]):
+            condition = column.isNotNull()
+            if lower_edge is not None:
+                condition = condition & (column > lower_edge)
+            if upper_edge is not None:
+                condition = condition & (column <= upper_edge)
+
+            aggregations.append(F.sum(F.when(condition, 1).otherwise(0)).alias(f"{alias_prefix}{bin_index}"))
+            lower_edge = upper_edge
+
+        return aggregations
+
+    @staticmethod
+    def expected_proportions(edges: list[tuple[float, float]]) -> list[float]:
+        """
+        Compute the share of the previous snapshot in each bin of the histogram
+        Args:
+            edges: the distinct edges with the share of the previous snapshot below each of them
+
+        Returns: the expected proportion of each bin
+        """
+        cumulative_shares = [0.0] + [share for _, share in edges] + [1.0]
+        return [upper - lower for lower, upper in zip(cumulative_shares, cumulative_shares[1:])]
+
+    @staticmethod
+    def compute_psi(expected: list[float], actual: list[float]) -> float:
+        """
+        Compute the population stability index between two distributions
+        Args:
+            expected: the proportions of each bin in the previous snapshot
+            actual: the proportions of each bin in the new snapshot
+
+        Returns: the population stability index
+        """
+        psi = 0.0
+        for expected_proportion, actual_proportion in zip(expected, actual):
+            expected_proportion = max(expected_proportion, PSI_EPSILON)
+            actual_proportion = max(actual_proportion, PSI_EPSILON)
+            psi += (actual_proportion - expected_proportion) * math.log(actual_proportion / expected_proportion)
+
+        return psi
+
+    @staticmethod
+    def get_drift_score(statistics: dict) -> Optional[float]:
+        """
+        Get the drift score of a snapshot
+        Args:
+            statistics: the statistics of the snapshot
+
+        Returns: the highest PSI of the columns, None when there is no previous snapshot to compare with
+        """
+        psis = [column_statistics["psi"] for column_statistics in statistics["columns"].values() if "psi" in column_statistics]
+        return max(psis) if len(psis) > 0 else None
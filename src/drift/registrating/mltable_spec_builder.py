@@ -0,0 +1,155 @@
+import logging
+import os
+import tempfile
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, Optional
+
+from drift.registrating.delta_table_inspector import DeltaChanges
+
+logger = logging.getLogger(__name__)
+
+SHARED_MEMORY_DIRECTORY = "/dev/shm"
+FILE_NAME_COLUMN = "delta_file_name"
+
+
+class MLTableSpecBuilder:
+    """
+    Process-wide builder of the MLTable specs of the Delta tables, keyed by datastore path and Delta version, and base
+    Delta version for the incremental specs
+
+    Each spec is saved in its own temporary directory, on tmpfs when available, removed once the spec is uploaded.
+    The upload path of a registered spec is kept, so that registering the same Delta version again in the same process
+    reuses it instead of building and uploading the spec again, e.g. when a registration is retried after a partial
+    failure or when several datasets share a table. Across runs, the registration of an already registered Delta commit
+    is skipped before any spec is built.
+    """
+
+    temporary_root: Optional[str]
+    uploaded_specs: dict[tuple[str, int, Optional[int]], str]
+    lock: threading.Lock
+
+    def __init__(self, temporary_root: Optional[str] = None):
+        """
+        Constructor
+        Args:
+            temporary_root: the directory of the temporary directories, by default the shared memory if it exists, else the system default
+        """
+        if temporary_root is None and os.path.isdir(SHARED_MEMORY_DIRECTORY):
+            temporary_root = SHARED_MEMORY_DIRECTORY
+
+        self.temporary_root = temporary_root
+        self.uploaded_specs = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def build(self, datastore_path: str, delta_version: int, mltable_name: str) -> Iterator[str]:
+        """
+        Build the MLTable spec of a Delta version, removed when the context exits
+        Args:
+            datastore_path: the path of the Delta table in the ML data store
+            delta_version: the Delta version the spec is pinned to
+            mltable_name: the name of the MLTable
+
+        Returns: the path of the spec to register, either the upload path of the same spec or a local temporary directory
+        """
+
+        def create_table():
+            # mltable is only needed by the registration, not by the other transformers reading the tags
+            import mltable
+
+            return mltable.from_delta_lake(datastore_path, version_as_of=delta_version)
+
+        with self.build_spec(datastore_path, delta_version, None, mltable_name, create_table) as spec_path:
+            yield spec_path
+
+    @contextmanager
+    def build_incremental(self, datastore_path: str, changes: DeltaChanges, mltable_name: str) -> Iterator[str]:
+        """
+        Build the MLTable spec of the Parquet files added to the Delta table since the base version, removed when the context exits
+        Args:
+            datastore_path: the path of the Delta table in the ML data store
+            changes: the changes of the Delta table since the base version
+            mltable_name: the name of the MLTable
+
+        Returns: the path of the spec to register, either the upload path of the same spec or a local temporary directory
+        """
+
+        def create_table():
+            import mltable
+
+            table = mltable.from_parquet_files([{"file": f"{datastore_path.rstrip('/')}/{added_file}"} for added_file in changes.added_files])
+            if len(changes.partition_columns) == 0:
+                return table
+
+            # The partition values are only stored in the Hive-style directories of the files
+            partition_format = "".join(f"/{column}={{{column}}}" for column in changes.partition_columns)
+            table = table.extract_columns_from_partition_format(f"{partition_format}/{{{FILE_NAME_COLUMN}}}")
+            return table.drop_columns([FILE_NAME_COLUMN])
+
+        with self.build_spec(datastore_path, changes.version, changes.base_version, mltable_name, create_table) as spec_path:
+            yield spec_path
+
+    @contextmanager
+    def build_spec(self, datastore_path: str, delta_version: int, base_version: Optional[int], mltable_name: str, create_table: Callable[[], Any]) -> Iterator[str]:
+        """
+        Build a MLTable spec with its table factory, unless the same spec is already uploaded
+        Args:
+            datastore_path: the path of the Delta table in the ML data store
+            delta_version: the Delta version the spec is pinned to
+            base_version: the base Delta version of an incremental spec, None for a full snapshot
+            mltable_name: the name of the MLTable
+            create_table: the factory of the table to save as spec
+
+        Returns: the path of the spec to register, either the upload path of the same spec or a local temporary directory
+        """
+        uploaded_path = self.get_uploaded_path(datastore_path, delta_version, base_version)
+        if uploaded_path is not None:
+            logger.debug("Reuse the MLTable spec of Delta version %s uploaded to %s", delta_version, uploaded_path)
+            yield uploaded_path
+            return
+
+        with tempfile.TemporaryDirectory(prefix="drift-mltable-", dir=self.temporary_root) as temporary_directory:
+            spec_path = os.path.join(temporary_directory, mltable_name)
+            create_table().save(spec_path)
+            logger.debug("MLTable spec saved: %s", spec_path)
+            yield spec_path
+
+    def get_uploaded_path(self, datastore_path: str, delta_version: int, base_version: Optional[int] = None) -> Optional[str]:
+        """
+        Get the upload path of a spec registered by this process
+        Args:
+            datastore_path: the path of the Delta table in the ML data store
+            delta_version: the Delta version the spec is pinned to
+            base_version: the base Delta version of an incremental spec, None for a full snapshot
+
+        Returns: the path of the registered MLTable data asset, None if the spec is not uploaded yet
+        """
+        with self.lock:
+            return self.uploaded_specs.get((datastore_path, delta_version, base_version), None)
+
+    def record_upload(self, datastore_path: str, delta_version: int, uploaded_path: Optional[str], base_version: Optional[int] = None):
+        """
+        Record the upload path of a registered spec
+        Args:
+            datastore_path: the path of the Delta table in the ML data store
+            delta_version: the Delta version the spec is pinned to
+            uploaded_path: the path of the registered MLTable data asset
+            base_version: the base Delta version of an incremental spec, None for a full snapshot
+        """
+        if not isinstance(uploaded_path, str) or not uploaded_path.startswith("azureml:"):
+            return
+
+        with self.lock:
+            self.uploaded_specs[(datastore_path, delta_version, base_version)] = uploaded_path
+
+    def clear(self):
+        """
+        Forget the upload paths of the registered specs
+        """
+        with self.lock:
+            self.uploaded_specs = {}
+
+
+mltable_spec_builder = MLTableSpecBuilder()
@@ -0,0 +1,72 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+from typing import Optional
+
+from drift.registrating.sketches import ColumnSketch
+
+logger = logging.getLogger(__name__)
+
+
+class SketchCache:
+    """
+    Directory of the sketches of the Delta data files, keyed by file path
+
+    Delta data files are immutable, the sketches of a file never need to be recomputed once cached.
+    """
+
+    directory: str
+
+    def __init__(self, directory: str):
+        """
+        Constructor
+        Args:
+            directory: the cache directory, e.g. a DBFS or a mounted volume path to share it between runs
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get_entry_path(self, file_path: str) -> str:
+        return os.path.join(self.directory, f"{hashlib.sha256(file_path.encode()).hexdigest()}.json.gz")
+
+    def get(self, file_path: str, column_names: list[str]) -> Optional[dict[str, ColumnSketch]]:
+        """
+        Get the cached sketches of a data file
+        Args:
+            file_path: the path of the data file
+            column_names: the columns to sketch
+
+        Returns: the sketches of the columns, None if the file or one of the columns is not cached
+        """
+        entry_path = self.get_entry_path(file_path)
+        if not os.path.exists(entry_path):
+            return None
+
+        try:
+            with gzip.open(entry_path, "rt", encoding="utf-8") as entry_file:
+                entry = json.load(entry_file)
+        except (OSError, ValueError) as error:
+            logger.warning("Ignoring unreadable sketch cache entry %s: %s", entry_path, error)
+            return None
+
+        if entry["file_path"] != file_path or any(column_name not in entry["columns"] for column_name in column_names):
+            return None
+
+        return {column_name: ColumnSketch.from_dict(entry["columns"][column_name]) for column_name in column_names}
+
+    def put(self, file_path: str, sketches: dict[str, ColumnSketch]):
+        """
+        Cache the sketches of a data file
+        Args:
+            file_path: the path of the data file
+            sketches: the sketches of the columns
+        """
+        entry_path = self.get_entry_path(file_path)
+        temporary_path = f"{entry_path}.tmp"
+        with gzip.open(temporary_path, "wt", encoding="utf-8") as entry_file:
+            json.dump({"file_path": file_path, "columns": {column_name: sketch.to_dict() for column_name, sketch in sketches.items()}}, entry_file)
+
+        # Concurrent runs never read a partially written entry
+        os.replace(temporary_path, entry_path)
@@ -0,0 +1,151 @@
+import logging
+from typing import Optional
+
+import pyarrow.dataset as ds
+from deltalake import DeltaTable
+
+from drift.registrating.drift_analyzer import DriftAnalyzer
+from drift.registrating.sketch_cache import SketchCache
+from drift.registrating.sketches import ColumnSketch
+
+logger = logging.getLogger(__name__)
+
+
+class SketchDriftAnalyzer:
+    """
+    Compute the statistics of a Delta table snapshot and its drift from mergeable sketches
+
+    Each data file of the snapshot is sketched once and cached by path: HyperLogLog for the distinct counts, KLL for the
+    quantiles of the numeric columns and count-min for the frequencies of the other ones. A new snapshot only reads its added
+    files and merges their sketches with the cached sketches of the unchanged files.
+    The statistics have the same shape as the ones of DriftAnalyzer, plus the most frequent values of the categorical columns.
+    """
+
+    table_uri: str
+    storage_options: dict[str, str]
+    sketch_cache: SketchCache
+    bins: int
+    columns: Optional[list[str]]
+
+    def __init__(self, table_uri: str, storage_options: dict[str, str], sketch_cache: SketchCache, bins: int = 10, columns: Optional[list[str]] = None):
+        """
+        Constructor
+        Args:
+            table_uri: the URI of the Delta table
+            storage_options: the options to access the storage account
+            sketch_cache: the cache of the sketches of the data files
+            bins: the number of quantile bins of the histograms
+            columns: the columns to analyze, None for all the columns
+        """
+        self.table_uri = table_uri
+        self.storage_options = storage_options
+        self.sketch_cache = sketch_cache
+        self.bins = bins
+        self.columns = columns
+
+    def compute_statistics(self, delta_version: int, previous_statistics: Optional[dict]) -> dict:
+        """
+        Compute the statistics of a snapshot of the Delta table
+        Args:
+            delta_version: the Delta version of the snapshot
+            previous_statistics: the statistics of the previously registered snapshot, None for the first registration
+
+        Returns: the statistics of the snapshot with the drift score, the highest PSI of its columns
+        """
+        delta_table = DeltaTable(self.table_uri, version=delta_version, storage_options=self.storage_options)
+        dataset = delta_table.to_pyarrow_dataset()
+
+        table_sketches: dict[str, ColumnSketch] = {}
+        row_count = 0
+        cached_file_count = 0
+        file_count = 0
+        for fragment in dataset.get_fragments():
+            file_count += 1
+            # Partition columns are not stored in the data files
+            column_names = [field.name for field in fragment.physical_schema if self.columns is None or field.name in self.columns]
+
+            file_sketches = self.sketch_cache.get(fragment.path, column_names)
+            if file_sketches is None:
+                file_sketches = self.sketch_file(fragment, column_names)
+                self.sketch_cache.put(fragment.path, file_sketches)
+            else:
+                cached_file_count += 1
+
+            # Every column sketch counts all the rows of the file, null or not
+            first_sketch = next(iter(file_sketches.values()), None)
+            row_count += fragment.count_rows() if first_sketch is None else first_sketch.count + first_sketch.null_count
+            for column_name, sketch in file_sketches.items():
+                if column_name in table_sketches:
+                    table_sketches[column_name].merge(sketch)
+                else:
+                    table_sketches[column_name] = sketch
+
+        logger.info("Sketched %s new files of Delta version %s, %s files read from the cache", file_count - cached_file_count, delta_version, cached_file_count)
+
+        previous_columns = (previous_statistics or {}).get("columns", {})
+        statistics_columns = {
+            column_name: self.compute_column_statistics(sketch, row_count, previous_columns.get(column_name, {})) for column_name, sketch in table_sketches.items()
+        }
+
+        statistics = {"delta_version": delta_version, "row_count": row_count, "columns": statistics_columns}
+        statistics["drift_score"] = DriftAnalyzer.get_drift_score(statistics)
+        logger.info("Drift score of Delta version %s: %s", delta_version, statistics["drift_score"])
+
+        return statistics
+
+    @staticmethod
+    def sketch_file(fragment: ds.Fragment, column_names: list[str]) -> dict[str, ColumnSketch]:
+        """
+        Sketch the columns of a data file, one record batch at a time
+        Args:
+            fragment: the data file
+            column_names: the columns to sketch
+
+        Returns: the sketches of the columns
+        """
+        sketches = {field.name: ColumnSketch.for_type(field.type) for field in fragment.physical_schema if field.name in column_names}
+        for record_batch in fragment.to_batches(columns=list(sketches)):
+            for column_name, sketch in sketches.items():
+                sketch.update(record_batch.column(column_name))
+
+        return sketches
+
+    def compute_column_statistics(self, sketch: ColumnSketch, row_count: int, previous_column_statistics: dict) -> dict:
+        """
+        Compute the statistics of a column from its sketches
+        Args:
+            sketch: the sketches of the column
+            row_count: the number of rows of the snapshot
+            previous_column_statistics: the statistics of the column in the previous snapshot
+
+        Returns: the statistics of the column, with its PSI when the previous snapshot has comparable statistics
+        """
+        levels = [index / self.bins for index in range(1, self.bins)]
+        column_statistics = {
+            "null_rate": 0.0 if row_count == 0 else (row_count - sketch.count) / row_count,
+            "distinct": round(sketch.distinct.estimate()),
+        }
+
+        if sketch.quantiles is not None:
+            column_statistics["quantiles"] = sketch.quantiles.quantiles(levels)
+
+            edges = DriftAnalyzer.compute_histogram_edges(previous_column_statistics.get("quantiles", None), levels)
+            if edges is not None and sketch.count > 0:
+                cumulative_shares = [0.0] + [sketch.quantiles.cdf(edge) for edge, _ in edges] + [1.0]
+                actual = [upper - lower for lower, upper in zip(cumulative_shares, cumulative_shares[1:])]
+                column_statistics["psi"] = DriftAnalyzer.compute_psi(DriftAnalyzer.expected_proportions(edges), actual)
+
+        if sketch.frequencies is not None:
+            column_statistics["frequencies"] = {value: count / sketch.count for value, count in sketch.frequencies.heavy_hitters.items()} if sketch.count > 0 else {}
+
+            previous_frequencies = previous_column_statistics.get("frequencies", None)
+            if previous_frequencies and sketch.count > 0:
+                estimates = sketch.frequencies.estimate_all(list(previous_frequencies))
+                expected = list(previous_frequencies.values())
+                actual = [estimates[value] / sketch.count for value in previous_frequencies]
+                # The values outside of the previous most frequent ones form the last bin
+                expected.append(max(0.0, 1.0 - sum(expected)))
+                actual.append(max(0.0, 1.0 - sum(actual)))
+                column_statistics["psi"] = DriftAnalyzer.compute_psi(expected, actual)
+
+        return column_statistics
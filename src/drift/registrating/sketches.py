@@ -0,0 +1,457 @@
+import base64
+import hashlib
+import math
+import random
+from array import array
+from typing import Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+UINT64 = pa.uint64()
+
+
+def uint64(value: int) -> pa.Scalar:
+    return pa.scalar(value, UINT64)
+
+
+def hash_values(values: pa.Array) -> pa.Array:
+    """
+    Hash the non null values of an array on 64 bits
+    Args:
+        values: the values
+
+    Returns: the hashes, the numeric values are mixed with splitmix64 and the other values are hashed with blake2b
+    """
+    values = values.drop_null()
+
+    keys = None
+    if pa.types.is_integer(values.type) or pa.types.is_boolean(values.type) or pa.types.is_temporal(values.type):
+        try:
+            keys = pc.cast(values, pa.int64()).view(UINT64)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            keys = None
+    elif pa.types.is_floating(values.type) or pa.types.is_decimal(values.type):
+        keys = pc.cast(values, pa.float64()).view(UINT64)
+
+    if keys is None:
+        encoded = values if pa.types.is_dictionary(values.type) else pc.dictionary_encode(values)
+        digests = [int.from_bytes(hashlib.blake2b(value if isinstance(value, bytes) else str(value).encode(), digest_size=8).digest(), "little") for value in encoded.dictionary.to_pylist()]
+        return pc.take(pa.array(digests, UINT64), encoded.indices)
+
+    mixed = pc.add(keys, uint64(0x9E3779B97F4A7C15))
+    mixed = pc.multiply(pc.bit_wise_xor(mixed, pc.shift_right(mixed, uint64(30))), uint64(0xBF58476D1CE4E5B9))
+    mixed = pc.multiply(pc.bit_wise_xor(mixed, pc.shift_right(mixed, uint64(27))), uint64(0x94D049BB133111EB))
+    return pc.bit_wise_xor(mixed, pc.shift_right(mixed, uint64(31)))
+
+
+def is_string_like(data_type: pa.DataType) -> bool:
+    """
+    Check if the values of a type are hashed as strings
+    Args:
+        data_type: the type of the values
+
+    Returns: True for the strings and the dictionary encoded strings, whose hashes are those of their string values
+    """
+    if pa.types.is_dictionary(data_type):
+        data_type = data_type.value_type
+
+    return pa.types.is_string(data_type) or pa.types.is_large_string(data_type)
+
+
+def bit_length(values: pa.Array) -> pa.Array:
+    """
+    Compute the number of bits of unsigned 64 bits values
+    Args:
+        values: the values
+
+    Returns: the bit length of each value, 0 for 0
+    """
+    lengths = pa.repeat(uint64(0), len(values))
+    for shift in (32, 16, 8, 4, 2, 1):
+        is_longer = pc.greater_equal(values, uint64(1 << shift))
+        values = pc.if_else(is_longer, pc.shift_right(values, uint64(shift)), values)
+        lengths = pc.add(lengths, pc.if_else(is_longer, uint64(shift), uint64(0)))
+
+    return pc.add(lengths, values)
+
+
+class HyperLogLog:
+    """
+    Mergeable estimator of the number of distinct values
+    """
+
+    precision: int
+    registers: bytearray
+
+    def __init__(self, precision: int = 12, registers: Optional[bytearray] = None):
+        self.precision = precision
+        self.registers = bytearray(1 << precision) if registers is None else registers
+
+    def update(self, hashes: pa.Array):
+        """
+        Add hashed values to the sketch
+        Args:
+            hashes: the 64 bits hashes of the values
+        """
+        if len(hashes) == 0:
+            return
+
+        remainder_bits = 64 - self.precision
+        indexes = pc.shift_right(hashes, uint64(remainder_bits))
+        remainders = pc.bit_wise_and(hashes, uint64((1 << remainder_bits) - 1))
+        ranks = pc.subtract(uint64(remainder_bits + 1), bit_length(remainders))
+
+        maximums = pa.table({"index": indexes, "rank": ranks}).group_by("index").aggregate([("rank", "max")])
+        for index, rank in zip(maximums["index"].to_pylist(), maximums["rank_max"].to_pylist()):
+            if rank > self.registers[index]:
+                self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog"):
+        """
+        Merge another sketch of the same precision into this one
+        Args:
+            other: the other sketch
+        """
+        self.registers = bytearray(max(register, other_register) for register, other_register in zip(self.registers, other.registers))
+
+    def estimate(self) -> float:
+        """
+        Estimate the number of distinct values
+        Returns: the estimated number of distinct values
+        """
+        register_count = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / register_count)
+        estimate = alpha * register_count * register_count / sum(2.0**-register for register in self.registers)
+
+        empty_registers = self.registers.count(0)
+        if estimate <= 2.5 * register_count and empty_registers > 0:
+            estimate = register_count * math.log(register_count / empty_registers)
+
+        return estimate
+
+    def to_dict(self) -> dict:
+        return {"precision": self.precision, "registers": base64.b64encode(bytes(self.registers)).decode("ascii")}
+
+    @staticmethod
+    def from_dict(sketch: dict) -> "HyperLogLog":
+        return HyperLogLog(sketch["precision"], bytearray(base64.b64decode(sketch["registers"])))
+
+
+class KllSketch:
+    """
+    Mergeable sketch of the quantiles of numeric values
+
+    The items of level h stand for 2^h values. A level exceeding its capacity is sorted and every other item is promoted to the next level.
+    """
+
+    k: int
+    levels: list[pa.Array]
+
+    def __init__(self, k: int = 200, levels: Optional[list[pa.Array]] = None):
+        self.k = k
+        self.levels = [pa.array([], pa.float64())] if levels is None else levels
+
+    def capacity(self, level: int) -> int:
+        """
+        Compute the capacity of a level, the lower levels being smaller
+        Args:
+            level: the level
+
+        Returns: the maximum number of items of the level
+        """
+        depth = len(self.levels) - 1 - level
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def update(self, values: pa.Array):
+        """
+        Add numeric values to the sketch
+        Args:
+            values: the non null values
+        """
+        self.levels[0] = pa.concat_arrays([self.levels[0], pc.cast(values, pa.float64())])
+        self.compress()
+
+    def merge(self, other: "KllSketch"):
+        """
+        Merge another sketch into this one
+        Args:
+            other: the other sketch
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(pa.array([], pa.float64()))
+
+        for level, items in enumerate(other.levels):
+            self.levels[level] = pa.concat_arrays([self.levels[level], items])
+
+        self.compress()
+
+    def compress(self):
+        """
+        Compact the levels exceeding their capacity
+        """
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self.capacity(level):
+                level += 1
+                continue
+
+            if level + 1 == len(self.levels):
+                self.levels.append(pa.array([], pa.float64()))
+
+            sorted_items = pc.take(items, pc.array_sort_indices(items))
+            compacted_count = len(sorted_items) - len(sorted_items) % 2
+            promoted_items = pc.take(sorted_items, pa.array(range(random.randint(0, 1), compacted_count, 2), pa.int64()))
+
+            self.levels[level] = sorted_items.slice(compacted_count)
+            self.levels[level + 1] = pa.concat_arrays([self.levels[level + 1], promoted_items])
+            level = 0
+
+    def weighted_items(self) -> list[tuple[float, int]]:
+        """
+        Get the items of the sketch with their weight
+        Returns: the sorted items with their weight
+        """
+        return sorted((item, 1 << level) for level, items in enumerate(self.levels) for item in items.to_pylist())
+
+    def count(self) -> int:
+        return sum(len(items) << level for level, items in enumerate(self.levels))
+
+    def quantiles(self, levels: list[float]) -> Optional[list[float]]:
+        """
+        Estimate the quantiles of the values
+        Args:
+            levels: the levels of the quantiles, between 0 and 1
+
+        Returns: the quantiles, None if the sketch is empty
+        """
+        weighted_items = self.weighted_items()
+        total_weight = sum(weight for _, weight in weighted_items)
+        if total_weight == 0:
+            return None
+
+        quantiles = []
+        item_index = 0
+        cumulative_weight = weighted_items[0][1]
+        for level in sorted(levels):
+            while cumulative_weight < level * total_weight and item_index + 1 < len(weighted_items):
+                item_index += 1
+                cumulative_weight += weighted_items[item_index][1]
+            quantiles.append(weighted_items[item_index][0])
+
+        return quantiles
+
+    def cdf(self, value: float) -> float:
+        """
+        Estimate the share of the values lower or equal to a value
+        Args:
+            value: the value
+
+        Returns: the estimated share
+        """
+        total_weight = self.count()
+        if total_weight == 0:
+            return 0.0
+
+        return sum(weight for item, weight in self.weighted_items() if item <= value) / total_weight
+
+    def to_dict(self) -> dict:
+        return {"k": self.k, "levels": [items.to_pylist() for items in self.levels]}
+
+    @staticmethod
+    def from_dict(sketch: dict) -> "KllSketch":
+        return KllSketch(sketch["k"], [pa.array(items, pa.float64()) for items in sketch["levels"]])
+
+
+class CountMinSketch:
+    """
+    Mergeable estimator of the frequencies of categorical values, tracking the most frequent ones
+    """
+
+    width: int
+    depth: int
+    top_k: int
+    table: list[array]
+    heavy_hitters: dict[str, int]
+
+    def __init__(self, width: int = 1024, depth: int = 4, top_k: int = 20, table: Optional[list[array]] = None, heavy_hitters: Optional[dict[str, int]] = None):
+        """
+        Constructor
+        Args:
+            width: the number of counters of each row, a power of two
+            depth: the number of rows
+            top_k: the number of most frequent values tracked
+            table: the counters
+            heavy_hitters: the most frequent values with their estimated frequency
+        """
+        self.width = width
+        self.depth = depth
+        self.top_k = top_k
+        self.table = [array("q", bytes(8 * width)) for _ in range(depth)] if table is None else table
+        self.heavy_hitters = {} if heavy_hitters is None else heavy_hitters
+
+    def cells(self, hashes: pa.Array, row: int) -> pa.Array:
+        """
+        Compute the counters of the hashed values in a row
+        Args:
+            hashes: the hashes of the values
+            row: the row
+
+        Returns: the index of the counter of each value
+        """
+        low_hashes = pc.bit_wise_and(hashes, uint64(0xFFFFFFFF))
+        high_hashes = pc.shift_right(hashes, uint64(32))
+        return pc.bit_wise_and(pc.add(low_hashes, pc.multiply(high_hashes, uint64(row))), uint64(self.width - 1))
+
+    def update(self, values: pa.Array, hashes: Optional[pa.Array] = None):
+        """
+        Add categorical values to the sketch
+        Args:
+            values: the non null values
+            hashes: the hashes of the values as strings, computed if not provided
+        """
+        values = pc.cast(values, pa.string())
+        if hashes is None:
+            hashes = hash_values(values)
+        for row in range(self.depth):
+            cell_counts = pc.value_counts(self.cells(hashes, row))
+            for cell, count in zip(cell_counts.field("values").to_pylist(), cell_counts.field("counts").to_pylist()):
+                self.table[row][cell] += count
+
+        value_counts = pc.value_counts(values)
+        batch_counts = sorted(zip(value_counts.field("counts").to_pylist(), value_counts.field("values").to_pylist()), reverse=True)
+        self.refresh_heavy_hitters(list(self.heavy_hitters) + [value for _, value in batch_counts[: self.top_k]])
+
+    def merge(self, other: "CountMinSketch"):
+        """
+        Merge another sketch of the same dimensions into this one
+        Args:
+            other: the other sketch
+        """
+        for row in range(self.depth):
+            self.table[row] = array("q", (count + other_count for count, other_count in zip(self.table[row], other.table[row])))
+
+        self.refresh_heavy_hitters(list(self.heavy_hitters) + list(other.heavy_hitters))
+
+    def refresh_heavy_hitters(self, candidates: list[str]):
+        """
+        Keep the most frequent candidates as heavy hitters
+        Args:
+            candidates: the candidate values
+        """
+        estimates = self.estimate_all(list(dict.fromkeys(candidates)))
+        self.heavy_hitters = dict(sorted(estimates.items(), key=lambda item: item[1], reverse=True)[: self.top_k])
+
+    def estimate_all(self, values: list[str]) -> dict[str, int]:
+        """
+        Estimate the frequency of values
+        Args:
+            values: the values
+
+        Returns: the estimated frequency of each value
+        """
+        if len(values) == 0:
+            return {}
+
+        hashes = hash_values(pa.array(values, pa.string()))
+        row_cells = [self.cells(hashes, row).to_pylist() for row in range(self.depth)]
+        return {value: min(self.table[row][row_cells[row][index]] for row in range(self.depth)) for index, value in enumerate(values)}
+
+    def to_dict(self) -> dict:
+        return {
+            "width": self.width,
+            "depth": self.depth,
+            "top_k": self.top_k,
+            "table": [base64.b64encode(row.tobytes()).decode("ascii") for row in self.table],
+            "heavy_hitters": self.heavy_hitters,
+        }
+
+    @staticmethod
+    def from_dict(sketch: dict) -> "CountMinSketch":
+        table = []
+        for encoded_row in sketch["table"]:
+            row = array("q")
+            row.frombytes(base64.b64decode(encoded_row))
+            table.append(row)
+
+        return CountMinSketch(sketch["width"], sketch["depth"], sketch["top_k"], table, sketch["heavy_hitters"])
+
+
+class ColumnSketch:
+    """
+    Sketches of the values of a column: counts, distinct values, quantiles of the numeric columns and frequencies of the other ones
+    """
+
+    count: int
+    null_count: int
+    distinct: HyperLogLog
+    quantiles: Optional[KllSketch]
+    frequencies: Optional[CountMinSketch]
+
+    def __init__(self, numeric: bool):
+        """
+        Constructor
+        Args:
+            numeric: True to sketch the quantiles of the values, False to sketch their frequencies
+        """
+        self.count = 0
+        self.null_count = 0
+        self.distinct = HyperLogLog()
+        self.quantiles = KllSketch() if numeric else None
+        self.frequencies = None if numeric else CountMinSketch()
+
+    @staticmethod
+    def for_type(data_type: pa.DataType) -> "ColumnSketch":
+        return ColumnSketch(pa.types.is_integer(data_type) or pa.types.is_floating(data_type) or pa.types.is_decimal(data_type))
+
+    def update(self, values: pa.Array):
+        """
+        Add the values of a column chunk to the sketches
+        Args:
+            values: the values
+        """
+        self.null_count += values.null_count
+        values = values.drop_null()
+        self.count += len(values)
+
+        # The strings are hashed in Python, once for both the distinct values and the frequencies
+        hashes = hash_values(values)
+        self.distinct.update(hashes)
+        if self.quantiles is not None:
+            self.quantiles.update(values)
+        if self.frequencies is not None:
+            self.frequencies.update(values, hashes if is_string_like(values.type) else None)
+
+    def merge(self, other: "ColumnSketch"):
+        """
+        Merge the sketches of another chunk of the same column
+        Args:
+            other: the other sketches
+        """
+        self.count += other.count
+        self.null_count += other.null_count
+        self.distinct.merge(other.distinct)
+        if self.quantiles is not None and other.quantiles is not None:
+            self.quantiles.merge(other.quantiles)
+        if self.frequencies is not None and other.frequencies is not None:
+            self.frequencies.merge(other.frequencies)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "null_count": self.null_count,
+            "distinct": self.distinct.to_dict(),
+            "quantiles": None if self.quantiles is None else self.quantiles.to_dict(),
+            "frequencies": None if self.frequencies is None else self.frequencies.to_dict(),
+        }
+
+    @staticmethod
+    def from_dict(sketch: dict) -> "ColumnSketch":
+        column_sketch = ColumnSketch(sketch["quantiles"] is not None)
+        column_sketch.count = sketch["count"]
+        column_sketch.null_count = sketch["null_count"]
+        column_sketch.distinct = HyperLogLog.from_dict(sketch["distinct"])
+        column_sketch.quantiles = None if sketch["quantiles"] is None else KllSketch.from_dict(sketch["quantiles"])
+        column_sketch.frequencies = None if sketch["frequencies"] is None else CountMinSketch.from_dict(sketch["frequencies"])
+        return column_sketch
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+
+from azure.ai.ml import MLClient
+from azure.ai.ml.entities import PipelineJob
+from pydataio.job_config import JobConfig
+
+from drift.retraining.async_training_status_refresher import AsyncTrainingStatusRefresher
+from drift.retraining.job_group import JobGroup
+from drift.retraining.model_retrainer import ModelRetrainer
+from drift.retraining.training_status_refresher import TrainingStatusRefresher
+from drift.tools.async_runner import BlockingCallRunner
+from drift.tools.throttling import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncModelRetrainer(ModelRetrainer):
+    """
+    Model retrainer submitting and watching the retraining jobs with asyncio
+
+    The submissions and the status checks overlap on an event loop, at most asyncMaxConcurrency Azure ML calls at a time,
+    instead of one blocking call after the other.
+    """
+
+    def create_training_status_refresher(self, jobConfig: JobConfig, ml_client: MLClient) -> TrainingStatusRefresher:
+        """
+        Create the refresher watching the retraining jobs concurrently
+        Args:
+            jobConfig: the job configuration
+            ml_client: the ml client
+
+        Returns: the asynchronous training status refresher
+        """
+        return AsyncTrainingStatusRefresher(jobConfig, ml_client, self.get_scope_matcher())
+
+    def retrain_models(self, ml_client: MLClient, jobs_to_retrain: list[JobGroup], additionalArgs: dict) -> list[PipelineJob]:
+        """
+        Retrain the models
+        Args:
+            ml_client: the ml client
+            jobs_to_retrain: the jobs to retrain
+            additionalArgs: the additional arguments
+
+        Returns: the newly created jobs for retraining, in the order of the jobs to retrain
+        """
+        return asyncio.run(self.retrain_models_async(ml_client, jobs_to_retrain, additionalArgs))
+
+    async def retrain_models_async(self, ml_client: MLClient, jobs_to_retrain: list[JobGroup], additionalArgs: dict) -> list[PipelineJob]:
+        """
+        Submit the retraining jobs concurrently
+        Args:
+            ml_client: the ml client
+            jobs_to_retrain: the jobs to retrain
+            additionalArgs: the additional arguments
+
+        Returns: the newly created jobs for retraining, in the order of the jobs to retrain
+        """
+        data_asset_versions = self.get_data_asset_versions(additionalArgs)
+        run_id = self.get_run_id()
+        logger.info("Retrain models with data asset versions %s, run id %s", data_asset_versions, run_id)
+
+        rate_per_second = self.jobConfig.parameters.get("submissionRatePerSecond", None)
+        rate_limiter = RateLimiter(None if rate_per_second is None else float(rate_per_second))
+
+        with BlockingCallRunner(int(self.jobConfig.parameters.get("asyncMaxConcurrency", 16))) as runner:
+            outcomes = await asyncio.gather(
+                *[runner.run(self.submit_retraining, ml_client, group_job, data_asset_versions, run_id, rate_limiter) for group_job in jobs_to_retrain],
+                return_exceptions=True,
+            )
+
+        return self.check_submissions(jobs_to_retrain, list(outcomes))
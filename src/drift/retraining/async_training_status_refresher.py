@@ -0,0 +1,169 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Optional
+
+from azure.ai.ml import MLClient
+from azure.ai.ml.entities import PipelineJob
+from pydataio.job_config import JobConfig
+
+from drift.retraining.poll_scheduler import PollScheduler
+from drift.retraining.scope_matcher import ScopeMatcher
+from drift.retraining.training_status_refresher import CANCELED_STATUS, COMPLETED_STATUS, FAILED_STATUSES, TrainingStatusRefresher
+from drift.tools.async_runner import BlockingCallRunner
+
+if TYPE_CHECKING:
+    from drift.retraining.retraining_scheduler import RetrainingScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTrainingStatusRefresher(TrainingStatusRefresher):
+    """
+    Training status refresher watching each job in its own coroutine
+
+    The status checks of the jobs overlap, at most asyncMaxConcurrency at a time, and follow the same poll scheduling and wait policy.
+    """
+
+    max_concurrency: int
+
+    def __init__(self, job_config: JobConfig, ml_client: MLClient, scope_matcher: Optional[ScopeMatcher] = None):
+        super().__init__(job_config, ml_client, scope_matcher)
+        self.max_concurrency = int(job_config.parameters.get("asyncMaxConcurrency", 16))
+
+    def wait_training(
+        self, new_jobs: list[PipelineJob], expected_durations: Optional[dict[str, float]] = None, scheduler: Optional["RetrainingScheduler"] = None
+    ) -> list[PipelineJob]:
+        """
+        Wait for the training jobs to completed
+        Args:
+            new_jobs: the new jobs to wait for
+            expected_durations: the expected training duration in seconds by group
+            scheduler: the scheduler of the groups still queued, with waitMode detach the monitoring is handed back to
+                Azure ML once no group is queued anymore
+
+        Returns: the not completed jobs
+        """
+        if self.wait_policy.detach:
+            if scheduler is None or not scheduler.has_queued_jobs():
+                logger.info("Hand the monitoring of %s jobs back to Azure ML.", len(new_jobs))
+                return []
+
+            logger.info("Wait for the %s queued groups to be submitted before handing the monitoring back to Azure ML.", len(scheduler.queue))
+
+        return asyncio.run(self.wait_training_async(new_jobs, expected_durations or {}, scheduler))
+
+    async def wait_training_async(
+        self, new_jobs: list[PipelineJob], expected_durations: dict[str, float], scheduler: Optional["RetrainingScheduler"] = None
+    ) -> list[PipelineJob]:
+        """
+        Wait for the training jobs to completed, watching them concurrently
+        Args:
+            new_jobs: the new jobs to wait for
+            expected_durations: the expected training duration in seconds by group
+            scheduler: the scheduler of the groups still queued, submitted as the watched jobs finish
+
+        Returns: the not completed jobs
+        """
+        timeout = datetime.now() + timedelta(seconds=self.timeout_delay)
+        logger.info("Waiting for %s seconds, until %s", self.timeout_delay, timeout)
+
+        poll_scheduler = PollScheduler(self.refresh_delay, self.max_refresh_delay, expected_durations if self.adaptive_refresh else None)
+        started_at = datetime.now()
+        latest_jobs = {job.name: job for job in new_jobs}
+        not_completed_jobs: list[PipelineJob] = []
+
+        with BlockingCallRunner(self.max_concurrency) as runner:
+
+            def create_watcher(job: PipelineJob, submitted_at: datetime) -> asyncio.Task:
+                deadline = self.wait_policy.get_deadline(self.get_group_name(job), submitted_at, expected_durations)
+                return asyncio.create_task(self.watch_job(runner, job, poll_scheduler, submitted_at, deadline, latest_jobs))
+
+            watchers = {create_watcher(job, started_at): job for job in new_jobs}
+
+            pending_watchers = set(watchers)
+            while len(pending_watchers) > 0:
+                remaining = (timeout - datetime.now()).total_seconds()
+                done_watchers, pending_watchers = await asyncio.wait(pending_watchers, timeout=max(0.0, remaining), return_when=asyncio.FIRST_COMPLETED)
+
+                for watcher in done_watchers:
+                    not_completed_job = watcher.result()
+                    if not_completed_job is not None:
+                        not_completed_jobs.append(not_completed_job)
+
+                if len(done_watchers) == 0:
+                    self.cancel_watchers(pending_watchers)
+                    raise Exception("Timeout reached")
+
+                if scheduler is not None:
+                    if self.wait_policy.fail_fast and len(not_completed_jobs) > 0:
+                        scheduler.cancel_queued("another job failed")
+                    else:
+                        submitted_jobs = await runner.run(scheduler.release, {watchers[watcher].name for watcher in pending_watchers})
+                        for job in submitted_jobs:
+                            latest_jobs[job.name] = job
+                            watcher = create_watcher(job, datetime.now())
+                            watchers[watcher] = job
+                            pending_watchers.add(watcher)
+
+                    if self.wait_policy.detach and not scheduler.has_queued_jobs():
+                        logger.info("All the groups are submitted, hand the monitoring of %s jobs back to Azure ML.", len(pending_watchers))
+                        self.cancel_watchers(pending_watchers)
+                        break
+
+                if self.wait_policy.fail_fast and len(not_completed_jobs) > 0 and len(pending_watchers) > 0:
+                    self.cancel_watchers(pending_watchers)
+                    pending_jobs = [latest_jobs[watchers[watcher].name] for watcher in pending_watchers]
+                    await runner.run(self.stop_jobs, pending_jobs, "another job failed")
+                    not_completed_jobs.extend(pending_jobs)
+                    break
+
+        return not_completed_jobs
+
+    async def watch_job(
+        self, runner: BlockingCallRunner, job: PipelineJob, poll_scheduler: PollScheduler, started_at: datetime, deadline: Optional[datetime], latest_jobs: dict[str, PipelineJob]
+    ) -> Optional[PipelineJob]:
+        """
+        Watch a job until it reaches a terminal status or its deadline
+        Args:
+            runner: the runner of the blocking calls
+            job: the job to watch
+            poll_scheduler: the scheduler of the status checks
+            started_at: the time the waiting started
+            deadline: the deadline of the job, None for the global timeout only
+            latest_jobs: the latest known state of the jobs by name, updated in place
+
+        Returns: None if the job is completed or canceled, otherwise the job in its last known state
+        """
+        group_name = self.get_group_name(job)
+        while True:
+            refreshed_job = await runner.run(self.ml_client.jobs.get, job.name)
+            latest_jobs[job.name] = refreshed_job
+            logger.info("Training job %s (%s): [%s]", refreshed_job.display_name, refreshed_job.name, refreshed_job.status)
+
+            if refreshed_job.status == COMPLETED_STATUS:
+                return None
+
+            if refreshed_job.status == CANCELED_STATUS:
+                logger.warning("Training job %s (%s) was canceled, e.g. superseded by a newer run, stop waiting for it.", refreshed_job.display_name, refreshed_job.name)
+                return None
+
+            if refreshed_job.status in FAILED_STATUSES:
+                return refreshed_job
+
+            now = datetime.now()
+            if deadline is not None and deadline < now:
+                await runner.run(self.stop_jobs, [refreshed_job], "its deadline is reached")
+                return refreshed_job
+
+            await asyncio.sleep(poll_scheduler.next_check_delay(group_name, (now - started_at).total_seconds()))
+
+    @staticmethod
+    def cancel_watchers(watchers: set[asyncio.Task]):
+        """
+        Cancel the watchers still running
+        Args:
+            watchers: the watchers
+        """
+        for watcher in watchers:
+            watcher.cancel()
@@ -0,0 +1,74 @@
+import json
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DataAssetVersion:
+    """
+    The version of a monitored data asset to retrain on
+    """
+
+    version: Optional[str]
+    changed: bool
+
+    def __init__(self, version: Optional[str], changed: bool = True):
+        self.version = version
+        self.changed = changed
+
+    def __str__(self):
+        return f"DataAssetVersion(version={self.version}, changed={self.changed})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def get_registered_name(data_asset_value: str) -> str:
+    """
+    Get the registered name of a data asset from its value in the job configuration
+    Args:
+        data_asset_value: the data asset, either its name or a reference such as azureml:<name>:<version> or azureml:<name>@<label>
+
+    Returns: the name the data asset is registered with
+    """
+    if data_asset_value.startswith("azureml:") and not data_asset_value.startswith("azureml://"):
+        data_asset_value = data_asset_value[len("azureml:"):]
+        data_asset_value = data_asset_value.split("@", 1)[0].split(":", 1)[0]
+
+    return data_asset_value
+
+
+def parse_data_asset_versions(data_assets: list[dict], additionalArgs: dict) -> dict[str, DataAssetVersion]:
+    """
+    Parse the version of each monitored data asset from the additional arguments
+    Args:
+        data_assets: the monitored data assets, with their input name and their value
+        additionalArgs: the additional arguments; data_asset_versions is a JSON object mapping the registered data asset names,
+            as published by the dataset registrator, to either their version or {"version": ..., "changed": true|false}. Without
+            it, all the data assets use data_asset_version and data_asset_changed
+
+    Returns: the version by data asset input name
+    """
+    default_changed = str(additionalArgs.get("data_asset_changed", None)).lower() != "false"
+    default_version = DataAssetVersion(additionalArgs.get("data_asset_version", None) or None, default_changed)
+
+    versions = additionalArgs.get("data_asset_versions", None) or {}
+    if isinstance(versions, str):
+        versions = json.loads(versions)
+
+    data_asset_versions = {}
+    for data_asset in data_assets:
+        data_asset_name = data_asset["name"]
+        registered_name = get_registered_name(str(data_asset.get("value", data_asset_name)))
+        version = versions.get(registered_name, versions.get(data_asset_name, None))
+        if version is None:
+            if len(versions) > 0:
+                logger.error("No version published for data asset %s (%s), use the default version %s.", data_asset_name, registered_name, default_version)
+            data_asset_versions[data_asset_name] = default_version
+        elif isinstance(version, dict):
+            data_asset_versions[data_asset_name] = DataAssetVersion(version.get("version", None), str(version.get("changed", True)).lower() != "false")
+        else:
+            data_asset_versions[data_asset_name] = DataAssetVersion(str(version))
+
+    return data_asset_versions
@@ -0,0 +1,164 @@
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JobIndex:
+    """
+    Persistent index of the jobs in the scope of the model retraining
+
+    The index is a SQLite file storing, for each job in the scope, its group, its training timestamp, its name and its input paths.
+    A watermark keeps the creation date of the newest listed job so that the next runs only list the jobs created after it.
+    The index is worked on a local copy of the file, so it can be stored on a mounted storage such as DBFS or a volume.
+    """
+
+    index_path: str
+    scope_signature: str
+    local_path: str
+    connection: sqlite3.Connection
+
+    def __init__(self, index_path: str, scope_signature: str):
+        """
+        Constructor
+        Args:
+            index_path: the path of the SQLite file
+            scope_signature: the signature of the retraining scope, the index is rebuilt when it changes
+        """
+        self.index_path = index_path
+        self.scope_signature = scope_signature
+
+        self.local_path = os.path.join(tempfile.mkdtemp(prefix="drift-job-index-"), "job_index.sqlite")
+        if os.path.exists(index_path):
+            shutil.copyfile(index_path, self.local_path)
+
+        self.connection = sqlite3.connect(self.local_path)
+        self.create_schema()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(persist=exc_type is None)
+
+    def create_schema(self):
+        """
+        Create the tables of the index and reset it when the retraining scope changed
+        """
+        self.connection.execute("CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (job_name TEXT PRIMARY KEY, group_name TEXT NOT NULL, training_timestamp INTEGER NOT NULL, input_paths TEXT NOT NULL, created_at TEXT)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS jobs_by_group ON jobs (group_name, training_timestamp)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS durations (job_name TEXT PRIMARY KEY, group_name TEXT NOT NULL, duration REAL NOT NULL)")
+
+        if self.get_metadata("scope_signature") != self.scope_signature:
+            logger.info("Retraining scope changed, reset the job index %s", self.index_path)
+            self.connection.execute("DELETE FROM jobs")
+            self.connection.execute("DELETE FROM durations")
+            self.connection.execute("DELETE FROM metadata")
+            self.set_metadata("scope_signature", self.scope_signature)
+
+        self.connection.commit()
+
+    def get_metadata(self, key: str) -> Optional[str]:
+        """
+        Get a metadata value of the index
+        Args:
+            key: the metadata key
+
+        Returns: the metadata value, None if not set
+        """
+        row = self.connection.execute("SELECT value FROM metadata WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def set_metadata(self, key: str, value: str):
+        """
+        Set a metadata value of the index
+        Args:
+            key: the metadata key
+            value: the metadata value
+        """
+        self.connection.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", (key, value))
+
+    def get_watermark(self) -> Optional[datetime]:
+        """
+        Get the creation date of the newest job already listed
+        Returns: the watermark, None if the index is empty
+        """
+        watermark = self.get_metadata("watermark")
+        return None if watermark is None else datetime.fromisoformat(watermark)
+
+    def set_watermark(self, watermark: datetime):
+        """
+        Set the creation date of the newest job already listed
+        Args:
+            watermark: the new watermark
+        """
+        self.set_metadata("watermark", watermark.isoformat())
+        self.connection.commit()
+
+    def add_job(self, group_name: str, training_timestamp: int, job_name: str, input_paths: dict[str, str], created_at: Optional[datetime]):
+        """
+        Add or replace a job in the index
+        Args:
+            group_name: the group of the job
+            training_timestamp: the training timestamp of the job
+            job_name: the name of the job
+            input_paths: the paths of the job inputs by input name
+            created_at: the creation date of the job
+        """
+        self.connection.execute(
+            "INSERT OR REPLACE INTO jobs (job_name, group_name, training_timestamp, input_paths, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_name, group_name, int(training_timestamp), json.dumps(input_paths), None if created_at is None else created_at.isoformat()),
+        )
+
+    def get_newest_jobs(self) -> list[tuple[str, int, str]]:
+        """
+        Get the newest job of each group
+        Returns: the group name, the training timestamp and the job name of the newest job of each group
+        """
+        return self.connection.execute("SELECT group_name, MAX(training_timestamp), job_name FROM jobs GROUP BY group_name ORDER BY group_name").fetchall()
+
+    def add_duration(self, group_name: str, job_name: str, duration: float):
+        """
+        Add or replace the training duration of a completed job
+        Args:
+            group_name: the group of the job
+            job_name: the name of the job
+            duration: the training duration in seconds
+        """
+        self.connection.execute("INSERT OR REPLACE INTO durations (job_name, group_name, duration) VALUES (?, ?, ?)", (job_name, group_name, duration))
+
+    def get_durations(self) -> list[tuple[str, float, Optional[datetime]]]:
+        """
+        Get the recorded training durations, from the oldest to the newest job
+        Returns: the group name, the duration and the creation date of each completed job
+        """
+        rows = self.connection.execute(
+            "SELECT durations.group_name, durations.duration, jobs.created_at FROM durations LEFT JOIN jobs ON jobs.job_name = durations.job_name ORDER BY jobs.created_at, durations.rowid"
+        ).fetchall()
+        return [(group_name, duration, None if created_at is None else datetime.fromisoformat(created_at)) for group_name, duration, created_at in rows]
+
+    def close(self, persist: bool = True):
+        """
+        Close the index and copy it back to its location
+        Args:
+            persist: True to copy the local index back to its location
+        """
+        self.connection.commit()
+        self.connection.close()
+
+        if persist:
+            index_directory = os.path.dirname(self.index_path)
+            if index_directory:
+                os.makedirs(index_directory, exist_ok=True)
+            shutil.copyfile(self.local_path, self.index_path)
+
+        shutil.rmtree(os.path.dirname(self.local_path), ignore_errors=True)
@@ -0,0 +1,26 @@
+class JobSummary:
+    """
+    Projection of a listed job on the fields needed to pick the newest job of each group
+    """
+
+    __slots__ = ("name", "group_name", "training_timestamp", "input_paths")
+
+    name: str
+    group_name: str
+    training_timestamp: int
+    input_paths: dict[str, str]
+
+    def __init__(self, name: str, group_name: str, training_timestamp: int, input_paths: dict[str, str]):
+        self.name = name
+        self.group_name = group_name
+        self.training_timestamp = training_timestamp
+        self.input_paths = input_paths
+
+    def is_older_than(self, other_training_timestamp: int) -> bool:
+        return self.training_timestamp < other_training_timestamp
+
+    def __str__(self):
+        return f"JobSummary(name={self.name}, group_name={self.group_name}, training_timestamp={self.training_timestamp})"
+
+    def __repr__(self):
+        return self.__str__()
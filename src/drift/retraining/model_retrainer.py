@@ -1,29 +1,55 @@
+import hashlib
+import json
 import logging
 import random
 import re
 import string
-from datetime import datetime
+import uuid
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 from azure.ai.ml import MLClient
 from azure.ai.ml.entities import PipelineJob
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
 from pydataio.job_config import JobConfig
 from pydataio.transformer import Transformer
 from pyspark.sql import SparkSession
 
+from drift.registrating.asset_tags import DRIFT_SCORE_TAG
 from drift.tools.azml import init_ml_flow_utils
+from drift.tools.throttling import RateLimiter, call_with_retry
+from drift.retraining.data_asset_version import DataAssetVersion, parse_data_asset_versions
 from drift.retraining.job_group import JobGroup
-from drift.retraining.training_status_refresher import TrainingStatusRefresher
+from drift.retraining.job_index import JobIndex
+from drift.retraining.job_summary import JobSummary
+from drift.retraining.retraining_scheduler import RetrainingScheduler
+from drift.retraining.scope_matcher import ScopeMatcher
+from drift.retraining.submission_journal import SubmissionJournal
+from drift.retraining.template_cache import TemplateCache
+from drift.retraining.training_history import TrainingHistory
+from drift.retraining.training_status_refresher import RUN_ID_PROPERTY, TrainingStatusRefresher
 
 logger = logging.getLogger(__name__)
 
+IN_FLIGHT_STATUSES = ("NotStarted", "Queued", "Preparing", "Provisioning", "Starting", "Running", "Finalizing")
+
 
 class ModelRetrainer(Transformer):
     jobConfig: JobConfig
     job_name_pattern: str
+    scope_matcher: Optional[ScopeMatcher]
     training_status_refresher: TrainingStatusRefresher
+    training_history: TrainingHistory
+    run_id: Optional[str]
+    submission_journal: Optional[SubmissionJournal]
 
     def __init__(self):
-        return
+        self.training_history = TrainingHistory()
+        self.run_id = None
+        self.submission_journal = None
+        self.scope_matcher = None
 
     def featurize(self, jobConfig: JobConfig, spark: SparkSession, additionalArgs: dict = None):
         self.jobConfig = jobConfig
@@ -32,12 +58,59 @@ class ModelRetrainer(Transformer):
 
         logger.info(self.jobConfig.parameters["dataAssets"])
 
+        data_asset_versions = self.get_data_asset_versions(additionalArgs)
+        if not any(data_asset_version.changed for data_asset_version in data_asset_versions.values()):
+            logger.info("Data asset versions %s did not change, skip the retraining.", data_asset_versions)
+            return
+
         ml_flow_utils = init_ml_flow_utils(jobConfig, additionalArgs["vault_name"])
-        self.training_status_refresher = TrainingStatusRefresher(jobConfig, ml_flow_utils.ml_client)
+        self.training_status_refresher = self.create_training_status_refresher(jobConfig, ml_flow_utils.ml_client)
 
         jobs_to_retrain = self.retrieve_jobs_to_retrain(ml_flow_utils.ml_client)
-        created_jobs = self.retrain_models(ml_flow_utils.ml_client, jobs_to_retrain, additionalArgs)
-        self.check_success(created_jobs)
+        jobs_to_retrain = self.filter_changed_groups(jobs_to_retrain, data_asset_versions)
+        jobs_to_retrain = self.filter_drifted_groups(ml_flow_utils.ml_client, jobs_to_retrain, data_asset_versions)
+        if len(jobs_to_retrain) == 0:
+            logger.info("The data did not change or drift enough for any group, skip the retraining.")
+            return
+
+        if str(jobConfig.parameters.get("supersedeInFlight", "false")).lower() == "true":
+            self.cancel_superseded_jobs(ml_flow_utils.ml_client, jobs_to_retrain, data_asset_versions)
+
+        resumed_jobs: list[tuple[JobGroup, PipelineJob]] = []
+        if jobConfig.parameters.get("submissionJournalPath", None) is not None and additionalArgs.get("run_id", None) is not None:
+            self.submission_journal = SubmissionJournal(jobConfig.parameters["submissionJournalPath"], self.compute_journal_key(additionalArgs["run_id"], data_asset_versions))
+            jobs_to_retrain, resumed_jobs = self.resume_submissions(ml_flow_utils.ml_client, jobs_to_retrain)
+
+        scheduler = RetrainingScheduler(
+            jobConfig, self.training_history.get_expected_durations(), lambda group_jobs: self.retrain_models(ml_flow_utils.ml_client, group_jobs, additionalArgs)
+        )
+        scheduler.schedule(jobs_to_retrain)
+        for group_job, resumed_job in resumed_jobs:
+            scheduler.track(group_job, resumed_job)
+
+        created_jobs = [resumed_job for _, resumed_job in resumed_jobs] + scheduler.submit_next()
+        self.check_success(created_jobs, scheduler)
+
+    def create_training_status_refresher(self, jobConfig: JobConfig, ml_client: MLClient) -> TrainingStatusRefresher:
+        """
+        Create the refresher waiting for the retraining jobs
+        Args:
+            jobConfig: the job configuration
+            ml_client: the ml client
+
+        Returns: the training status refresher
+        """
+        return TrainingStatusRefresher(jobConfig, ml_client, self.get_scope_matcher())
+
+    def get_data_asset_versions(self, additionalArgs: dict) -> dict[str, DataAssetVersion]:
+        """
+        Get the version of each monitored data asset
+        Args:
+            additionalArgs: the additional arguments with data_asset_versions or data_asset_version
+
+        Returns: the version by data asset name
+        """
+        return parse_data_asset_versions(self.jobConfig.parameters["dataAssets"], additionalArgs)
 
     def compute_jobname_pattern(self, additionalArgs: dict):
         """
@@ -50,13 +123,18 @@ class ModelRetrainer(Transformer):
         if additionalArgs.get("model_name_prefix", None) is not None:
             model_name_prefix = additionalArgs["model_name_prefix"].replace(",", "|")
             logger.info("Retrain models for %s  only.", model_name_prefix)
-            group_name_pattern = f"({model_name_prefix})"
+            group_name_pattern = model_name_prefix
 
-        self.job_name_pattern = r"^" + group_name_pattern + "_[0-9]{14}_.*$"
+        self.job_name_pattern = r"^(?P<group_name>" + group_name_pattern + ")_(?P<training_timestamp>[0-9]{14})_.*$"
 
     def retrain_models(self, ml_client: MLClient, jobs_to_retrain: list[JobGroup], additionalArgs: dict) -> list[PipelineJob]:
         """
         Retrain the models
+
+        The jobs are submitted by a pool of submissionMaxWorkers threads, limited to submissionRatePerSecond requests per second
+        and retried when Azure ML is throttling. The created jobs keep the order of the jobs to retrain. A failed submission
+        does not stop the other ones, the failures are raised together once all the jobs are submitted.
+        All the jobs submitted by the same retrainer are tagged with the same run id.
         Args:
             ml_client: the ml client
             jobs_to_retrain: the jobs to retrain
@@ -65,34 +143,221 @@ class ModelRetrainer(Transformer):
         Returns: the newly created jobs for retraining
         """
 
-        data_asset_version = additionalArgs["data_asset_version"]
-        logger.info("Retrain models with data asset version %s", data_asset_version)
+        data_asset_versions = self.get_data_asset_versions(additionalArgs)
+        run_id = self.get_run_id()
+        logger.info("Retrain models with data asset versions %s, run id %s", data_asset_versions, run_id)
+
+        max_workers = int(self.jobConfig.parameters.get("submissionMaxWorkers", 1))
+        rate_per_second = self.jobConfig.parameters.get("submissionRatePerSecond", None)
+        rate_limiter = RateLimiter(None if rate_per_second is None else float(rate_per_second))
+
+        def submit(group_job: JobGroup) -> PipelineJob:
+            return self.submit_retraining(ml_client, group_job, data_asset_versions, run_id, rate_limiter)
+
+        outcomes: list = []
+        if max_workers > 1:
+            logger.info("Submit %s jobs with %s workers", len(jobs_to_retrain), max_workers)
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="drift-submit") as executor:
+                submissions = [executor.submit(submit, group_job) for group_job in jobs_to_retrain]
+
+            for submission in submissions:
+                error = submission.exception()
+                outcomes.append(submission.result() if error is None else error)
+        else:
+            for group_job in jobs_to_retrain:
+                try:
+                    outcomes.append(submit(group_job))
+                except Exception as error:
+                    outcomes.append(error)
+
+        return self.check_submissions(jobs_to_retrain, outcomes)
+
+    def check_submissions(self, jobs_to_retrain: list[JobGroup], outcomes: list) -> list[PipelineJob]:
+        """
+        Check that the retraining job of every group is submitted
+        Args:
+            jobs_to_retrain: the jobs to retrain
+            outcomes: the created job or the submission error of each job to retrain, in the same order
+
+        Returns: the created jobs, in the order of the jobs to retrain
+        """
+        errors = {group_job.group_name: outcome for group_job, outcome in zip(jobs_to_retrain, outcomes) if isinstance(outcome, BaseException)}
+        if len(errors) == 0:
+            return outcomes
 
-        created_jobs: list[PipelineJob] = []
+        for group_name, error in errors.items():
+            logger.error("Failed to submit the retraining job of group %s: %s", group_name, error, exc_info=error)
 
+        created_jobs = [outcome for outcome in outcomes if not isinstance(outcome, BaseException)]
+        if len(created_jobs) > 0:
+            # The created jobs are journaled, so that a retried task resumes them instead of submitting them again
+            logger.error("Jobs %s were created before the failure and keep running.", ", ".join(f"{job.display_name} ({job.name})" for job in created_jobs))
+
+        raise Exception(f"Failed to submit the retraining jobs of groups {', '.join(errors)}: {'; '.join(str(error) for error in errors.values())}") from next(iter(errors.values()))
+
+    def get_run_id(self) -> str:
+        """
+        Get the id of the Drift run
+        Returns: the run id, resumed from the submission journal or generated on first use
+        """
+        if self.run_id is None:
+            if self.submission_journal is not None and self.submission_journal.drift_run_id is not None:
+                self.run_id = self.submission_journal.drift_run_id
+            else:
+                self.run_id = uuid.uuid4().hex
+                if self.submission_journal is not None:
+                    self.submission_journal.set_drift_run_id(self.run_id)
+
+        return self.run_id
+
+    @staticmethod
+    def compute_journal_key(run_id: str, data_asset_versions: dict[str, DataAssetVersion]) -> str:
+        """
+        Compute the key of the submission journal of a run
+        Args:
+            run_id: the id of the Databricks job run, kept when the task is retried
+            data_asset_versions: the version by data asset name
+
+        Returns: the run id followed by a digest of the data asset versions
+        """
+        versions = json.dumps({data_asset_name: data_asset_version.version for data_asset_name, data_asset_version in data_asset_versions.items()}, sort_keys=True)
+        return f"{re.sub(r'[^A-Za-z0-9_-]', '_', str(run_id))}-{hashlib.sha256(versions.encode()).hexdigest()[:16]}"
+
+    def resume_submissions(self, ml_client: MLClient, jobs_to_retrain: list[JobGroup]) -> tuple[list[JobGroup], list[tuple[JobGroup, PipelineJob]]]:
+        """
+        Resume the jobs already submitted by a previous attempt of the run
+        Args:
+            ml_client: the ml client
+            jobs_to_retrain: the jobs to retrain
+
+        Returns: the jobs still to submit, and the groups with their live or completed journaled job
+        """
+        remaining_jobs = []
+        resumed_jobs = []
         for group_job in jobs_to_retrain:
-            logger.info("Retrain model for group %s", group_job.group_name)
+            job_name = self.submission_journal.get_submitted_job(group_job.group_name)
+            submitted_job = None
+            if job_name is not None:
+                try:
+                    submitted_job = ml_client.jobs.get(job_name)
+                except ResourceNotFoundError:
+                    logger.warning("Journaled job %s of group %s not found", job_name, group_job.group_name)
+
+            if submitted_job is not None and (submitted_job.status in IN_FLIGHT_STATUSES or submitted_job.status == "Completed"):
+                logger.info("Resume job %s of group %s in status %s", job_name, group_job.group_name, submitted_job.status)
+                resumed_jobs.append((group_job, submitted_job))
+            else:
+                remaining_jobs.append(group_job)
+
+        return remaining_jobs, resumed_jobs
+
+    def submit_retraining(
+        self, ml_client: MLClient, group_job: JobGroup, data_asset_versions: dict[str, DataAssetVersion], run_id: str, rate_limiter: RateLimiter
+    ) -> PipelineJob:
+        """
+        Submit the retraining job of a group
+        Args:
+            ml_client: the ml client
+            group_job: the job to retrain
+            data_asset_versions: the version by data asset name
+            run_id: the id of the Drift run, set as job tag and property to refresh the jobs of the run together
+            rate_limiter: the rate limiter of the submissions
+
+        Returns: the newly created job
+        """
+        logger.info("Retrain model for group %s", group_job.group_name)
+
+        based_job = group_job.job
+        self.update_data_assets(based_job, data_asset_versions)
+        # Named once, so that retrying a submission accepted despite the error does not create another job
+        based_job.name = f"drift_{uuid.uuid4().hex}"
+        based_job.display_name = self.create_new_display_name(group_job.group_name)
+        based_job.tags = {**(based_job.tags or {}), RUN_ID_PROPERTY: run_id}
+        based_job.properties = {**(based_job.properties or {}), RUN_ID_PROPERTY: run_id}
 
-            based_job = group_job.job
-            self.update_data_assets(based_job, data_asset_version)
-            based_job.name = None
-            based_job.display_name = self.create_new_display_name(group_job.group_name)
-            created_job = ml_client.jobs.create_or_update(based_job)
+        max_retries = int(self.jobConfig.parameters.get("submissionMaxRetries", 5))
+        retry_delay = float(self.jobConfig.parameters.get("submissionRetryDelay", 2))
+        attempts = 0
 
-            logger.info("Created job %s", created_job.display_name)
-            logger.debug(created_job)
+        def create_job() -> PipelineJob:
+            nonlocal attempts
+            attempts += 1
+            if attempts > 1:
+                try:
+                    return ml_client.jobs.get(based_job.name)
+                except ResourceNotFoundError:
+                    logger.debug("Job %s was not created by the previous attempt", based_job.name)
 
-            created_jobs.append(created_job)
+            return ml_client.jobs.create_or_update(based_job)
 
-        return created_jobs
+        created_job = call_with_retry(create_job, max_retries, retry_delay, rate_limiter)
 
-    def check_success(self, jobs: list[PipelineJob]):
+        logger.info("Created job %s", created_job.display_name)
+        if self.submission_journal is not None:
+            self.submission_journal.record(group_job.group_name, created_job.name)
+        logger.debug(created_job)
+
+        return created_job
+
+    def cancel_superseded_jobs(self, ml_client: MLClient, jobs_to_retrain: list[JobGroup], data_asset_versions: dict[str, DataAssetVersion]):
+        """
+        Cancel the in-flight retraining jobs started by Drift for the groups to retrain on other data asset versions
+        Args:
+            ml_client: the ml client
+            jobs_to_retrain: the jobs to retrain
+            data_asset_versions: the version by data asset name
+        """
+        group_names = {group_job.group_name for group_job in jobs_to_retrain}
+        created_after = self.compute_listing_cutoff()
+        scope_matcher = self.get_scope_matcher()
+
+        for job in ml_client.jobs.list(tag=RUN_ID_PROPERTY):
+            if job is None:
+                continue
+
+            if created_after is not None and self.is_created_before(job, created_after):
+                break
+
+            parsed_display_name = scope_matcher.parse_display_name(job.display_name)
+            if job.status not in IN_FLIGHT_STATUSES or parsed_display_name is None:
+                continue
+
+            group_name = parsed_display_name[0]
+            if group_name in group_names and self.is_superseded(job, data_asset_versions):
+                logger.warning("Cancel job %s (%s) of group %s, superseded by the new data asset versions.", job.display_name, job.name, group_name)
+                try:
+                    ml_client.jobs.begin_cancel(job.name)
+                except HttpResponseError as error:
+                    logger.warning("Cannot cancel job %s: %s", job.name, error)
+
+    def is_superseded(self, job: PipelineJob, data_asset_versions: dict[str, DataAssetVersion]) -> bool:
+        """
+        Check if the job uses another version of a monitored data asset than the new one
+        Args:
+            job: the job
+            data_asset_versions: the version by data asset name
+
+        Returns: True if one of the data assets referenced by the job has a new version
+        """
+        for data_asset in self.jobConfig.parameters["dataAssets"]:
+            job_input = job.inputs.get(data_asset["name"], None)
+            data_asset_version = data_asset_versions[data_asset["name"]]
+            if job_input is None or data_asset_version.version is None or not data_asset_version.changed:
+                continue
+
+            if job_input.path != f"{data_asset['value']}:{data_asset_version.version}":
+                return True
+
+        return False
+
+    def check_success(self, jobs: list[PipelineJob], scheduler: Optional[RetrainingScheduler] = None):
         """
         Check if the jobs are successful
         Args:
             jobs: the jobs to checks
+            scheduler: the scheduler of the groups still queued
         """
-        failed_jobs = self.training_status_refresher.wait_training(jobs)
+        failed_jobs = self.training_status_refresher.wait_training(jobs, self.training_history.get_expected_durations(), scheduler)
         if len(failed_jobs) > 0:
             for failed_job in failed_jobs:
                 logger.error("Job %s failed.", failed_job.display_name)
@@ -113,87 +378,385 @@ class ModelRetrainer(Transformer):
         current_datetime = datetime.now()
         return f"{group_name}_{current_datetime.strftime('%Y%m%d%H%M%S')}_{random_string}"
 
-    def update_data_assets(self, job: PipelineJob, data_asset_version: str):
+    def update_data_assets(self, job: PipelineJob, data_asset_versions: dict[str, DataAssetVersion]):
         """
-        Update the data assets
+        Update the data assets referenced by the job
         Args:
             job: the job
-            data_asset_version: the data asset version
+            data_asset_versions: the version by data asset name, the data assets without version use their latest version
         """
 
         for data_asset in self.jobConfig.parameters["dataAssets"]:
-            logger.info("Update data asset %s for based job %s", data_asset["name"], job.display_name)
-            job.inputs[data_asset["name"]].path = f"{data_asset['value']}:{data_asset_version}"
+            if job.inputs.get(data_asset["name"], None) is None:
+                continue
+
+            data_asset_version = data_asset_versions[data_asset["name"]].version
+            logger.info("Update data asset %s to version %s for based job %s", data_asset["name"], data_asset_version, job.display_name)
+            if data_asset_version is not None:
+                job.inputs[data_asset["name"]].path = f"{data_asset['value']}:{data_asset_version}"
+            elif self.is_named_data_asset(data_asset["value"]):
+                job.inputs[data_asset["name"]].path = f"{data_asset['value']}@latest"
+
+    @staticmethod
+    def is_named_data_asset(data_asset: str) -> bool:
+        """
+        Check if the data asset is a registered data asset rather than a datastore path
+        Args:
+            data_asset: the data asset, e.g. azureml:my-data-asset
+
+        Returns: True if the data asset is referenced by name
+        """
+        return "/" not in data_asset.removeprefix("azureml:")
 
     def retrieve_jobs_to_retrain(self, ml_client: MLClient) -> list[JobGroup]:
         """
         Retrieve the jobs to retrain
+
+        The job listing is consumed page by page and only a summary of the newest job of each group is kept,
+        so the memory footprint depends on the number of groups and not on the job history. The full job is only
+        retrieved for the newest job of each group. When a job index is configured, only the jobs created since the previous run are listed.
+        When a template cache is configured, the base jobs are loaded from the cache.
         Args:
             ml_client: the ml client
 
         Returns: the jobs to retrain
         """
 
-        job_to_schedule: list[PipelineJob] = list(ml_client.jobs.list())
-        logger.debug("Retrieved %s jobs.", len(job_to_schedule))
-
-        job_to_schedule = list(filter(self.is_in_scope, job_to_schedule))
-        logger.debug("Retrieved %s jobs in the scope:", len(job_to_schedule))
-
-        jobs_to_retrain_dict: dict[str, JobGroup] = {}
-        for job in job_to_schedule:
-            names = re.split(r"_", job.display_name)
-            group_name = names[0]
-            training_timestamp = names[1]
-
-            if jobs_to_retrain_dict.get(group_name) is None:
-                logger.info("Add new job %s trained at %s to group %s ", job.display_name, training_timestamp, group_name)
-                jobs_to_retrain_dict[group_name] = JobGroup(group_name, training_timestamp, job)
-            else:
-                if jobs_to_retrain_dict[group_name].is_older_than(training_timestamp):
-                    logger.info("Update group %s with newer job %s trained at %s", group_name, job.display_name, training_timestamp)
-                    jobs_to_retrain_dict[group_name] = JobGroup(group_name, training_timestamp, job)
+        if self.jobConfig.parameters.get("templateCachePath", None) is not None:
+            jobs_to_retrain = self.retrieve_jobs_to_retrain_from_cache(ml_client, self.jobConfig.parameters["templateCachePath"])
+        else:
+            jobs_to_retrain = self.discover_jobs_to_retrain(ml_client)
 
-        jobs_to_retrain = list(jobs_to_retrain_dict.values())
         logger.debug(jobs_to_retrain)
 
-        if len(job_to_schedule) == 0:
+        if len(jobs_to_retrain) == 0:
             logger.info("No jobs to retrain.")
             raise Exception("No jobs in scope to retrain.")
 
         return jobs_to_retrain
 
+    def discover_jobs_to_retrain(self, ml_client: MLClient) -> list[JobGroup]:
+        """
+        Discover the newest job of each group in the workspace
+        Args:
+            ml_client: the ml client
+
+        Returns: the jobs to retrain
+        """
+        if self.jobConfig.parameters.get("jobIndexPath", None) is not None:
+            return self.retrieve_jobs_to_retrain_from_index(ml_client, self.jobConfig.parameters["jobIndexPath"])
+
+        scope_matcher = self.get_scope_matcher()
+        newest_jobs: dict[str, JobSummary] = {}
+        for job in self.list_jobs(ml_client, self.compute_listing_cutoff()):
+            job_summary = scope_matcher.match(job)
+            if job_summary is not None:
+                self.keep_newest_job(newest_jobs, job_summary)
+                self.training_history.add_job(job_summary.group_name, job)
+
+        return [self.retrieve_job_group(ml_client, job_summary.group_name, job_summary.training_timestamp, job_summary.name) for job_summary in newest_jobs.values()]
+
+    def retrieve_jobs_to_retrain_from_cache(self, ml_client: MLClient, cache_path: str) -> list[JobGroup]:
+        """
+        Retrieve the jobs to retrain from the template cache
+
+        The first run discovers the jobs in the workspace and caches them. The next runs only list the jobs created since
+        the cache was written, to replace the templates of the groups with a newer job, unless templateCacheValidation is none.
+        Args:
+            ml_client: the ml client
+            cache_path: the directory of the template cache
+
+        Returns: the jobs to retrain
+        """
+        template_cache = TemplateCache(cache_path, self.compute_scope_signature())
+        listed_at = datetime.now(timezone.utc)
+
+        if template_cache.is_empty():
+            jobs_to_retrain = self.discover_jobs_to_retrain(ml_client)
+        else:
+            for group_name, durations in template_cache.durations.items():
+                for duration in durations:
+                    self.training_history.add_duration(group_name, duration)
+
+            newer_jobs: dict[str, JobSummary] = {}
+            if self.jobConfig.parameters.get("templateCacheValidation", "listing") != "none":
+                scope_matcher = self.get_scope_matcher()
+                for job in self.list_jobs(ml_client, template_cache.listed_at):
+                    job_summary = scope_matcher.match(job)
+                    if job_summary is not None:
+                        self.keep_newest_job(newer_jobs, job_summary)
+                        self.training_history.add_job(job_summary.group_name, job)
+
+            jobs_to_retrain = []
+            for group_name, template in template_cache.templates.items():
+                if group_name in newer_jobs and not newer_jobs[group_name].is_older_than(template.training_timestamp):
+                    continue
+
+                logger.info("Load the template of group %s from job %s", group_name, template.job_name)
+                job = template_cache.load_job(group_name)
+                if job is None:
+                    job = ml_client.jobs.get(template.job_name)
+                jobs_to_retrain.append(JobGroup(group_name, template.training_timestamp, job))
+
+            for job_summary in newer_jobs.values():
+                template = template_cache.templates.get(job_summary.group_name, None)
+                if template is None or not job_summary.is_older_than(template.training_timestamp):
+                    jobs_to_retrain.append(self.retrieve_job_group(ml_client, job_summary.group_name, job_summary.training_timestamp, job_summary.name))
+
+        template_cache.save(jobs_to_retrain, listed_at, self.training_history.durations)
+        return jobs_to_retrain
+
+    def retrieve_jobs_to_retrain_from_index(self, ml_client: MLClient, index_path: str) -> list[JobGroup]:
+        """
+        Retrieve the jobs to retrain through the persistent job index
+        Args:
+            ml_client: the ml client
+            index_path: the path of the job index
+
+        Returns: the jobs to retrain
+        """
+
+        scope_matcher = self.get_scope_matcher()
+        with JobIndex(index_path, self.compute_scope_signature()) as job_index:
+            watermark = job_index.get_watermark()
+            created_after = self.compute_listing_cutoff()
+            if watermark is not None and (created_after is None or watermark > created_after):
+                created_after = watermark
+
+            newest_created_at = watermark
+            for job in self.list_jobs(ml_client, created_after):
+                created_at = self.get_creation_date(job)
+                if created_at is not None and (newest_created_at is None or created_at > newest_created_at):
+                    newest_created_at = created_at
+
+                job_summary = scope_matcher.match(job)
+                if job_summary is not None:
+                    job_index.add_job(job_summary.group_name, job_summary.training_timestamp, job_summary.name, job_summary.input_paths, created_at)
+
+                    duration = TrainingHistory.get_duration(job)
+                    if duration is not None:
+                        job_index.add_duration(job_summary.group_name, job_summary.name, duration)
+
+            if newest_created_at is not None:
+                job_index.set_watermark(newest_created_at)
+
+            newest_jobs = job_index.get_newest_jobs()
+            for group_name, duration, created_at in job_index.get_durations():
+                self.training_history.add_duration(group_name, duration, created_at)
+
+        return [self.retrieve_job_group(ml_client, group_name, training_timestamp, job_name) for group_name, training_timestamp, job_name in newest_jobs]
+
+    @staticmethod
+    def retrieve_job_group(ml_client: MLClient, group_name: str, training_timestamp: int, job_name: str) -> JobGroup:
+        """
+        Retrieve the full job to retrain of a group
+        Args:
+            ml_client: the ml client
+            group_name: the group name
+            training_timestamp: the training timestamp of the job
+            job_name: the name of the job
+
+        Returns: the job to retrain
+        """
+        logger.info("Retrieve job %s trained at %s for group %s", job_name, training_timestamp, group_name)
+        return JobGroup(group_name, training_timestamp, ml_client.jobs.get(job_name))
+
+    def list_jobs(self, ml_client: MLClient, created_after: Optional[datetime]) -> Iterator[PipelineJob]:
+        """
+        List the jobs of the workspace page by page
+        Azure ML lists the jobs from the newest to the oldest, so the listing stops at the first job older than the cutoff.
+        Args:
+            ml_client: the ml client
+            created_after: the creation date before which the jobs are not listed, None to list the whole job history
+
+        Returns: the listed jobs
+        """
+        if created_after is not None:
+            logger.info("Only consider jobs created after %s", created_after)
+
+        listed_jobs = 0
+        for job in ml_client.jobs.list():
+            if job is None:
+                continue
+
+            if created_after is not None and self.is_created_before(job, created_after):
+                logger.info("Reached jobs created before %s, stop listing.", created_after)
+                break
+
+            listed_jobs += 1
+            yield job
+
+        logger.debug("Retrieved %s jobs.", listed_jobs)
+
+    @staticmethod
+    def keep_newest_job(newest_jobs: dict[str, JobSummary], job_summary: JobSummary):
+        """
+        Keep the job in its group if it is the newest one seen so far
+        Args:
+            newest_jobs: the newest job of each group, updated in place
+            job_summary: the summary of the job in the scope
+        """
+        group_name = job_summary.group_name
+
+        if newest_jobs.get(group_name) is None:
+            logger.info("Add new job %s trained at %s to group %s ", job_summary.name, job_summary.training_timestamp, group_name)
+            newest_jobs[group_name] = job_summary
+        elif newest_jobs[group_name].is_older_than(job_summary.training_timestamp):
+            logger.info("Update group %s with newer job %s trained at %s", group_name, job_summary.name, job_summary.training_timestamp)
+            newest_jobs[group_name] = job_summary
+
+    def compute_scope_signature(self) -> str:
+        """
+        Compute the signature of the retraining scope
+        Returns: the job name pattern and the monitored data assets with their match mode serialized as JSON
+        """
+        return json.dumps(
+            {
+                "job_name_pattern": self.job_name_pattern,
+                "data_assets": self.jobConfig.parameters["dataAssets"],
+                "data_assets_match": self.jobConfig.parameters.get("dataAssetsMatch", "all"),
+            },
+            sort_keys=True,
+        )
+
+    def compute_listing_cutoff(self) -> Optional[datetime]:
+        """
+        Compute the creation date before which the jobs are not listed anymore
+        Returns: the cutoff date, None to list the whole job history
+        """
+        max_age_days = self.jobConfig.parameters.get("jobsMaxAgeDays", None)
+        if max_age_days is None:
+            return None
+
+        return datetime.now(timezone.utc) - timedelta(days=int(max_age_days))
+
     @staticmethod
-    def is_data_asset_in_scope(job: PipelineJob, data_asset_name: str, data_asset: str) -> bool:
+    def get_creation_date(job: PipelineJob) -> Optional[datetime]:
         """
-        Check if the job referencing the monitored data asset
+        Get the creation date of the job
         Args:
             job: the job
-            data_asset_name: the name of the data asset
-            data_asset:  the data asset
 
-        Returns: True if the data asset is in the scope of the job
+        Returns: the timezone aware creation date, None if unknown
         """
+        if job.creation_context is None or job.creation_context.created_at is None:
+            return None
 
-        if job.inputs.get(data_asset_name, None) is None:
-            return False
+        created_at = job.creation_context.created_at
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
 
-        return job.inputs[data_asset_name].path.startswith(data_asset)
+        return created_at
 
-    def are_data_assets_in_scope(self, job: PipelineJob) -> bool:
+    @staticmethod
+    def is_created_before(job: PipelineJob, cutoff: datetime) -> bool:
         """
-        Check if the job is in the scope of the data assets
+        Check if the job was created before the cutoff date
         Args:
             job: the job
+            cutoff: the cutoff date
 
-        Returns: True if the job is in the scope of the data assets
+        Returns: True if the job is older than the cutoff date
         """
+        created_at = ModelRetrainer.get_creation_date(job)
+        return created_at is not None and created_at < cutoff
+
+    def filter_changed_groups(self, jobs_to_retrain: list[JobGroup], data_asset_versions: dict[str, DataAssetVersion]) -> list[JobGroup]:
+        """
+        Keep the groups referencing at least one data asset that changed
+        Args:
+            jobs_to_retrain: the jobs to retrain
+            data_asset_versions: the version by data asset name
+
+        Returns: the jobs to retrain
+        """
+        changed_data_assets = [data_asset_name for data_asset_name, data_asset_version in data_asset_versions.items() if data_asset_version.changed]
+
+        changed_jobs = []
+        for group_job in jobs_to_retrain:
+            if any(group_job.job.inputs.get(data_asset_name, None) is not None for data_asset_name in changed_data_assets):
+                changed_jobs.append(group_job)
+            else:
+                logger.info("Skip group %s, its data assets did not change", group_job.group_name)
 
+        return changed_jobs
+
+    def filter_drifted_groups(self, ml_client: MLClient, jobs_to_retrain: list[JobGroup], data_asset_versions: dict[str, DataAssetVersion]) -> list[JobGroup]:
+        """
+        Keep the groups referencing at least one data asset whose drift score reaches driftThreshold
+        Args:
+            ml_client: the ml client
+            jobs_to_retrain: the jobs to retrain
+            data_asset_versions: the version by data asset name
+
+        Returns: the jobs to retrain, all of them when no drift threshold is configured
+        """
+        drift_threshold = self.jobConfig.parameters.get("driftThreshold", None)
+        if drift_threshold is None:
+            return jobs_to_retrain
+
+        drifted_data_assets = []
         for data_asset in self.jobConfig.parameters["dataAssets"]:
-            if not self.is_data_asset_in_scope(job, data_asset["name"], data_asset["value"]):
-                return False
+            data_asset_version = data_asset_versions[data_asset["name"]].version
+            drift_score = None if data_asset_version is None else self.get_drift_score(ml_client, data_asset["value"], data_asset_version)
+            logger.info("Drift score of data asset %s version %s: %s", data_asset["name"], data_asset_version, drift_score)
+
+            if drift_score is None or drift_score >= float(drift_threshold):
+                drifted_data_assets.append(data_asset["name"])
+
+        drifted_jobs = []
+        for group_job in jobs_to_retrain:
+            if any(group_job.job.inputs.get(data_asset_name, None) is not None for data_asset_name in drifted_data_assets):
+                drifted_jobs.append(group_job)
+            else:
+                logger.info("Skip group %s, its data assets drifted below %s", group_job.group_name, drift_threshold)
 
-        return True
+        return drifted_jobs
+
+    @staticmethod
+    def get_drift_score(ml_client: MLClient, data_asset: str, data_asset_version: str) -> Optional[float]:
+        """
+        Get the drift score recorded with a data asset version
+        Args:
+            ml_client: the ml client
+            data_asset: the data asset, e.g. azureml:my-data-asset
+            data_asset_version: the data asset version
+
+        Returns: the drift score, None if unknown
+        """
+        if not ModelRetrainer.is_named_data_asset(data_asset):
+            return None
+
+        try:
+            registered_data_asset = ml_client.data.get(name=data_asset.removeprefix("azureml:"), version=data_asset_version)
+        except ResourceNotFoundError:
+            return None
+
+        drift_score = (registered_data_asset.tags or {}).get(DRIFT_SCORE_TAG, None)
+        return None if drift_score is None else float(drift_score)
+
+    def get_scope_matcher(self) -> ScopeMatcher:
+        """
+        Get the matcher of the jobs in the scope, compiled once for the current job name pattern
+        Returns: the scope matcher
+        """
+        if self.scope_matcher is None or self.scope_matcher.job_name_pattern != self.job_name_pattern:
+            self.scope_matcher = ScopeMatcher(
+                self.job_name_pattern, self.jobConfig.parameters["dataAssets"], self.jobConfig.parameters.get("dataAssetsMatch", "all") == "any"
+            )
+
+        return self.scope_matcher
+
+    def are_data_assets_in_scope(self, job: PipelineJob) -> bool:
+        """
+        Check if the job is in the scope of the data assets
+        Args:
+            job: the job
+
+        Returns: True if the job references all the monitored data assets, or at least one of them when dataAssetsMatch is any
+        """
+
+        return self.get_scope_matcher().are_data_assets_in_scope(job)
 
     def is_in_scope(self, job: PipelineJob) -> bool:
         """
@@ -204,7 +767,4 @@ class ModelRetrainer(Transformer):
         Returns: True if the job is in the scope of the model retraining
         """
 
-        if re.match(self.job_name_pattern, job.display_name):
-            return self.are_data_assets_in_scope(job)
-        else:
-            return False
+        return self.get_scope_matcher().match(job) is not None
@@ -0,0 +1,48 @@
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PollScheduler:
+    """
+    Plan the status checks of the training jobs from the expected duration of their group
+
+    The delay before the next check is half of the remaining expected duration, bounded by the minimum and maximum delays,
+    so the jobs are checked rarely at the beginning of the training and more often near its expected end.
+    """
+
+    min_delay: float
+    max_delay: float
+    expected_durations: dict[str, float]
+
+    def __init__(self, min_delay: float, max_delay: float, expected_durations: Optional[dict[str, float]] = None):
+        """
+        Constructor
+        Args:
+            min_delay: the minimum delay between two checks in seconds
+            max_delay: the maximum delay between two checks in seconds
+            expected_durations: the expected training duration by group, the jobs of unknown groups are checked every minimum delay
+        """
+        self.min_delay = min_delay
+        self.max_delay = max(min_delay, max_delay)
+        self.expected_durations = expected_durations or {}
+
+    def next_check_delay(self, group_name: Optional[str], elapsed: float) -> float:
+        """
+        Compute the delay before the next check of a job
+        Args:
+            group_name: the group of the job
+            elapsed: the time elapsed since the job was submitted in seconds
+
+        Returns: the delay in seconds
+        """
+        expected_duration = self.expected_durations.get(group_name, None)
+        if expected_duration is None:
+            return self.min_delay
+
+        remaining = expected_duration - elapsed
+        if remaining <= 0:
+            return self.min_delay
+
+        return min(self.max_delay, max(self.min_delay, remaining / 2))
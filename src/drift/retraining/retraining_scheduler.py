@@ -0,0 +1,145 @@
+import logging
+from typing import Callable, Optional
+
+from azure.ai.ml.entities import PipelineJob
+from pydataio.job_config import JobConfig
+
+from drift.retraining.job_group import JobGroup
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMPUTE = "default"
+
+
+class RetrainingScheduler:
+    """
+    Queue of the groups to retrain, submitted by priority with at most maxRunningPerCompute jobs running on each compute target
+
+    The groups are ordered by retrainingPriorities, the highest first, then with longestFirst by their expected training duration,
+    the longest first, to shorten the total runtime. The training status refresher releases the capacity of the finished jobs.
+    """
+
+    max_running_per_compute: Optional[int]
+    priorities: dict[str, float]
+    longest_first: bool
+    expected_durations: dict[str, float]
+    submit: Callable[[list[JobGroup]], list[PipelineJob]]
+    queue: list[JobGroup]
+    running_jobs: dict[str, str]
+
+    def __init__(self, job_config: JobConfig, expected_durations: dict[str, float], submit: Callable[[list[JobGroup]], list[PipelineJob]]):
+        """
+        Constructor
+        Args:
+            job_config: the job configuration
+            expected_durations: the expected training duration in seconds by group
+            submit: the function submitting the retraining jobs of groups, returning the created jobs in the same order
+        """
+        max_running_per_compute = job_config.parameters.get("maxRunningPerCompute", None)
+        self.max_running_per_compute = None if max_running_per_compute is None else int(max_running_per_compute)
+        self.priorities = {group_name: float(priority) for group_name, priority in (job_config.parameters.get("retrainingPriorities", None) or {}).items()}
+        self.longest_first = str(job_config.parameters.get("longestFirst", "false")).lower() == "true"
+        self.expected_durations = expected_durations
+        self.submit = submit
+        self.queue = []
+        self.running_jobs = {}
+
+    def schedule(self, jobs_to_retrain: list[JobGroup]):
+        """
+        Queue the groups to retrain by priority
+        Args:
+            jobs_to_retrain: the jobs to retrain
+        """
+        self.queue = sorted(self.queue + jobs_to_retrain, key=self.get_sort_key)
+
+    def get_sort_key(self, group_job: JobGroup) -> tuple[float, float]:
+        """
+        Get the position of a group in the queue
+        Args:
+            group_job: the job to retrain
+
+        Returns: the opposite of the priority, then of the expected duration with longestFirst
+        """
+        expected_duration = self.expected_durations.get(group_job.group_name, 0.0) if self.longest_first else 0.0
+        return -self.priorities.get(group_job.group_name, 0.0), -expected_duration
+
+    @staticmethod
+    def get_compute(group_job: JobGroup) -> str:
+        """
+        Get the compute target of a job to retrain
+        Args:
+            group_job: the job to retrain
+
+        Returns: the compute of the job, or the default compute of the pipeline
+        """
+        job = group_job.job
+        compute = getattr(job, "compute", None)
+        if compute is None and getattr(job, "settings", None) is not None:
+            compute = getattr(job.settings, "default_compute", None)
+
+        return compute if isinstance(compute, str) else DEFAULT_COMPUTE
+
+    def count_running(self, compute: str) -> int:
+        return sum(1 for running_compute in self.running_jobs.values() if running_compute == compute)
+
+    def has_queued_jobs(self) -> bool:
+        return len(self.queue) > 0
+
+    def submit_next(self) -> list[PipelineJob]:
+        """
+        Submit the queued groups as long as their compute target has capacity
+        Returns: the created jobs
+        """
+        released_jobs = []
+        running_counts = {}
+        for group_job in self.queue:
+            compute = self.get_compute(group_job)
+            running_count = running_counts.get(compute, self.count_running(compute))
+            if self.max_running_per_compute is None or running_count < self.max_running_per_compute:
+                released_jobs.append(group_job)
+                running_counts[compute] = running_count + 1
+
+        if len(released_jobs) == 0:
+            return []
+
+        self.queue = [group_job for group_job in self.queue if group_job not in released_jobs]
+        logger.info("Submit %s jobs, %s jobs queued", len(released_jobs), len(self.queue))
+
+        created_jobs = self.submit(released_jobs)
+        for group_job, created_job in zip(released_jobs, created_jobs):
+            self.track(group_job, created_job)
+
+        return created_jobs
+
+    def track(self, group_job: JobGroup, job: PipelineJob):
+        """
+        Count a running job against the capacity of its compute target
+        Args:
+            group_job: the retrained job
+            job: the running job
+        """
+        self.running_jobs[job.name] = self.get_compute(group_job)
+
+    def release(self, pending_job_names: set[str]) -> list[PipelineJob]:
+        """
+        Release the capacity of the finished jobs and submit the next queued groups
+        Args:
+            pending_job_names: the names of the jobs still running
+
+        Returns: the created jobs
+        """
+        for job_name in [job_name for job_name in self.running_jobs if job_name not in pending_job_names]:
+            del self.running_jobs[job_name]
+
+        return self.submit_next()
+
+    def cancel_queued(self, reason: str):
+        """
+        Drop the queued groups without submitting them
+        Args:
+            reason: the reason why the groups are not retrained
+        """
+        for group_job in self.queue:
+            logger.warning("Do not retrain group %s because %s.", group_job.group_name, reason)
+
+        self.queue = []
@@ -0,0 +1,119 @@
+import re
+from typing import Optional
+
+from azure.ai.ml.entities import PipelineJob
+
+from drift.retraining.job_summary import JobSummary
+
+
+class ScopeMatcher:
+    """
+    Precompiled matcher of the jobs in the retraining scope
+
+    The display name is matched and parsed by one compiled regular expression, which must have the named groups group_name and training_timestamp.
+    The monitored data assets are indexed by input name, so that a job is checked in one pass over its own inputs,
+    whatever the number of monitored data assets.
+    """
+
+    job_name_pattern: str
+    display_name_regex: re.Pattern
+    data_asset_prefixes: dict[str, tuple[str, ...]]
+    match_any: bool
+
+    def __init__(self, job_name_pattern: str, data_assets: list[dict[str, str]], match_any: bool = False):
+        """
+        Constructor
+        Args:
+            job_name_pattern: the pattern of the display names in the scope
+            data_assets: the monitored data assets with their input name and value
+            match_any: True if the jobs referencing some of the data assets are in the scope, False if they must reference all of them
+        """
+        self.job_name_pattern = job_name_pattern
+        self.display_name_regex = re.compile(job_name_pattern)
+        if not {"group_name", "training_timestamp"}.issubset(self.display_name_regex.groupindex):
+            raise Exception(f"Job name pattern {job_name_pattern} must have the named groups group_name and training_timestamp.")
+        self.match_any = match_any
+
+        prefixes: dict[str, list[str]] = {}
+        for data_asset in data_assets:
+            prefixes.setdefault(data_asset["name"], []).append(data_asset["value"])
+        self.data_asset_prefixes = {data_asset_name: tuple(values) for data_asset_name, values in prefixes.items()}
+
+    def parse_display_name(self, display_name: Optional[str]) -> Optional[tuple[str, int]]:
+        """
+        Match and parse a display name
+        Args:
+            display_name: the display name following the pattern {group_name}_{training_timestamp}_{random_string}
+
+        Returns: the group name and the training timestamp, None if the display name is not in the scope
+        """
+        if display_name is None:
+            return None
+
+        match = self.display_name_regex.match(display_name)
+        if match is None:
+            return None
+
+        return match.group("group_name"), int(match.group("training_timestamp"))
+
+    def count_matching_data_assets(self, job: PipelineJob) -> int:
+        """
+        Count the monitored data assets referenced by the job
+        Args:
+            job: the job
+
+        Returns: the number of monitored input names whose path starts with one of their data assets
+        """
+        matching_count = 0
+        for input_name, job_input in job.inputs.items():
+            prefixes = self.data_asset_prefixes.get(input_name, None)
+            if prefixes is None:
+                continue
+
+            path = getattr(job_input, "path", None)
+            if isinstance(path, str) and path.startswith(prefixes):
+                matching_count += 1
+
+        return matching_count
+
+    def are_data_assets_in_scope(self, job: PipelineJob) -> bool:
+        """
+        Check if the job is in the scope of the data assets
+        Args:
+            job: the job
+
+        Returns: True if the job references all the monitored data assets, or at least one of them with match_any
+        """
+        if self.match_any:
+            return self.count_matching_data_assets(job) > 0
+
+        if len(job.inputs) < len(self.data_asset_prefixes):
+            return False
+
+        return self.count_matching_data_assets(job) == len(self.data_asset_prefixes)
+
+    def match(self, job: PipelineJob) -> Optional[JobSummary]:
+        """
+        Check if the job is in the scope of the model retraining
+        Args:
+            job: the job
+
+        Returns: the summary of the job if it is in the scope, None otherwise
+        """
+        parsed_display_name = self.parse_display_name(job.display_name)
+        if parsed_display_name is None or not self.are_data_assets_in_scope(job):
+            return None
+
+        group_name, training_timestamp = parsed_display_name
+        return JobSummary(job.name, group_name, training_timestamp, self.get_input_paths(job))
+
+    @staticmethod
+    def get_input_paths(job: PipelineJob) -> dict[str, str]:
+        """
+        Get the paths of the job inputs
+        Args:
+            job: the job
+
+        Returns: the paths by input name
+        """
+        return {name: job_input.path for name, job_input in job.inputs.items() if isinstance(getattr(job_input, "path", None), str)}
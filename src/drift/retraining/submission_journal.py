@@ -0,0 +1,72 @@
+import json
+import logging
+import os
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SubmissionJournal:
+    """
+    Durable record of the retraining jobs submitted by a Drift run, to resume the run after a restart
+
+    The journal is a JSON file, rewritten atomically after each submission, for instance on a volume or DBFS mount.
+    """
+
+    journal_path: str
+    drift_run_id: Optional[str]
+    submitted_jobs: dict[str, str]
+    lock: threading.Lock
+
+    def __init__(self, journal_directory: str, journal_key: str):
+        """
+        Constructor
+        Args:
+            journal_directory: the directory of the journals
+            journal_key: the key of the run, e.g. the Databricks run id and the data asset version
+        """
+        os.makedirs(journal_directory, exist_ok=True)
+        self.journal_path = os.path.join(journal_directory, f"{journal_key}.json")
+        self.drift_run_id = None
+        self.submitted_jobs = {}
+        self.lock = threading.Lock()
+
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, encoding="utf-8") as journal_file:
+                journal = json.load(journal_file)
+
+            self.drift_run_id = journal.get("drift_run_id", None)
+            self.submitted_jobs = journal.get("submitted_jobs", {})
+            logger.info("Resume from journal %s with %s submitted jobs", self.journal_path, len(self.submitted_jobs))
+
+    def set_drift_run_id(self, drift_run_id: str):
+        """
+        Record the id set as tag and property of the submitted jobs
+        Args:
+            drift_run_id: the Drift run id
+        """
+        with self.lock:
+            self.drift_run_id = drift_run_id
+            self.save()
+
+    def record(self, group_name: str, job_name: str):
+        """
+        Record a submitted job
+        Args:
+            group_name: the group of the job
+            job_name: the name of the job
+        """
+        with self.lock:
+            self.submitted_jobs[group_name] = job_name
+            self.save()
+
+    def get_submitted_job(self, group_name: str) -> Optional[str]:
+        return self.submitted_jobs.get(group_name, None)
+
+    def save(self):
+        temporary_path = f"{self.journal_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as journal_file:
+            json.dump({"drift_run_id": self.drift_run_id, "submitted_jobs": self.submitted_jobs}, journal_file, indent=2)
+
+        os.replace(temporary_path, self.journal_path)
@@ -0,0 +1,130 @@
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Optional
+
+from azure.ai.ml import load_job
+from azure.ai.ml.entities import PipelineJob
+
+from drift.retraining.job_group import JobGroup
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE_NAME = "index.json"
+
+
+class CachedTemplate:
+    """
+    The base job of a group cached by a previous run
+    """
+
+    group_name: str
+    training_timestamp: int
+    job_name: str
+    template_file: str
+
+    def __init__(self, group_name: str, training_timestamp: int, job_name: str, template_file: str):
+        self.group_name = group_name
+        self.training_timestamp = training_timestamp
+        self.job_name = job_name
+        self.template_file = template_file
+
+
+class TemplateCache:
+    """
+    Directory of the base job of each group, serialized as YAML with the name of the job it comes from
+
+    The index of the cache records the scope it was built for, the time of the job listing it reflects
+    and the training durations of the groups.
+    """
+
+    directory: str
+    scope_signature: str
+    listed_at: Optional[datetime]
+    templates: dict[str, CachedTemplate]
+    durations: dict[str, list[float]]
+
+    def __init__(self, directory: str, scope_signature: str):
+        """
+        Constructor
+        Args:
+            directory: the cache directory, e.g. a volume or DBFS mount path to keep it between runs
+            scope_signature: the signature of the retraining scope, the cache of another scope is ignored
+        """
+        self.directory = directory
+        self.scope_signature = scope_signature
+        self.listed_at = None
+        self.templates = {}
+        self.durations = {}
+
+        index_path = os.path.join(directory, INDEX_FILE_NAME)
+        if not os.path.exists(index_path):
+            return
+
+        with open(index_path, encoding="utf-8") as index_file:
+            index = json.load(index_file)
+
+        if index.get("scope_signature", None) != scope_signature:
+            logger.info("Template cache %s was built for another scope, ignore it.", directory)
+            return
+
+        self.listed_at = datetime.fromisoformat(index["listed_at"])
+        self.templates = {group_name: CachedTemplate(group_name, **template) for group_name, template in index["templates"].items()}
+        self.durations = index.get("durations", {})
+
+    def is_empty(self) -> bool:
+        return self.listed_at is None or len(self.templates) == 0
+
+    def load_job(self, group_name: str) -> Optional[PipelineJob]:
+        """
+        Load the cached base job of a group
+        Args:
+            group_name: the group name
+
+        Returns: the job, None if the template cannot be loaded
+        """
+        template = self.templates[group_name]
+        try:
+            return load_job(os.path.join(self.directory, template.template_file))
+        except Exception as error:
+            logger.warning("Cannot load the template of group %s: %s", group_name, error)
+            return None
+
+    def save(self, jobs_to_retrain: list[JobGroup], listed_at: datetime, durations: dict[str, list[float]]):
+        """
+        Cache the base jobs of the groups
+        Args:
+            jobs_to_retrain: the newest job of each group
+            listed_at: the time of the job listing the jobs come from
+            durations: the training durations by group
+        """
+        os.makedirs(self.directory, exist_ok=True)
+
+        for group_job in jobs_to_retrain:
+            cached_template = self.templates.get(group_job.group_name, None)
+            if cached_template is not None and cached_template.job_name == group_job.job.name:
+                continue
+
+            template_file = f"{re.sub(r'[^A-Za-z0-9_-]', '_', group_job.group_name)}.yaml"
+            group_job.job.dump(os.path.join(self.directory, template_file))
+            self.templates[group_job.group_name] = CachedTemplate(group_job.group_name, int(group_job.training_timestamp), group_job.job.name, template_file)
+
+        self.listed_at = listed_at
+        self.durations = durations
+
+        index = {
+            "scope_signature": self.scope_signature,
+            "listed_at": listed_at.isoformat(),
+            "templates": {
+                group_name: {"training_timestamp": template.training_timestamp, "job_name": template.job_name, "template_file": template.template_file}
+                for group_name, template in self.templates.items()
+            },
+            "durations": durations,
+        }
+        index_path = os.path.join(self.directory, INDEX_FILE_NAME)
+        with open(f"{index_path}.tmp", "w", encoding="utf-8") as index_file:
+            json.dump(index, index_file, indent=2)
+
+        os.replace(f"{index_path}.tmp", index_path)
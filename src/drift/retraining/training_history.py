@@ -0,0 +1,88 @@
+import logging
+from datetime import datetime
+from statistics import median
+from typing import Optional
+
+from azure.ai.ml.entities import PipelineJob
+
+logger = logging.getLogger(__name__)
+
+
+class TrainingHistory:
+    """
+    Durations of the previous trainings of each group
+
+    The durations of each group are ordered by the creation date of their job, so that only the newest ones are kept
+    whatever the order the jobs are listed in.
+    """
+
+    max_durations: int
+    records: dict[str, list[tuple[Optional[datetime], float]]]
+
+    def __init__(self, max_durations: int = 10):
+        """
+        Constructor
+        Args:
+            max_durations: the maximum number of durations kept per group
+        """
+        self.max_durations = max_durations
+        self.records = {}
+
+    @property
+    def durations(self) -> dict[str, list[float]]:
+        """
+        Get the recorded durations
+        Returns: the durations of each group, from the oldest to the newest job
+        """
+        return {group_name: [duration for _, duration in group_records] for group_name, group_records in self.records.items()}
+
+    def add_job(self, group_name: str, job: PipelineJob):
+        """
+        Record the duration of a completed job of the group
+        Args:
+            group_name: the group of the job
+            job: the job
+        """
+        duration = self.get_duration(job)
+        if duration is not None:
+            self.add_duration(group_name, duration, job.creation_context.created_at)
+
+    def add_duration(self, group_name: str, duration: float, created_at: Optional[datetime] = None):
+        """
+        Record a training duration of the group
+        Args:
+            group_name: the group
+            duration: the training duration in seconds
+            created_at: the creation date of the job, None for a duration older than all the dated ones, e.g. read from a cache
+        """
+        group_records = self.records.setdefault(group_name, [])
+        group_records.append((created_at, duration))
+        # The sort is stable, so the undated durations keep the order they were recorded in
+        group_records.sort(key=lambda record: (record[0] is not None, record[0] or datetime.min))
+        del group_records[: -self.max_durations]
+
+    def get_expected_durations(self) -> dict[str, float]:
+        """
+        Get the expected training duration of each group
+        Returns: the median of the recorded durations by group
+        """
+        return {group_name: median(group_durations) for group_name, group_durations in self.durations.items() if len(group_durations) > 0}
+
+    @staticmethod
+    def get_duration(job: PipelineJob) -> Optional[float]:
+        """
+        Get the duration of a completed job, approximated by the time between its creation and its last modification
+        Args:
+            job: the job
+
+        Returns: the duration in seconds, None if the job is not completed
+        """
+        if job.status != "Completed" or job.creation_context is None:
+            return None
+
+        created_at = job.creation_context.created_at
+        last_modified_at = job.creation_context.last_modified_at
+        if created_at is None or last_modified_at is None:
+            return None
+
+        return (last_modified_at - created_at).total_seconds()
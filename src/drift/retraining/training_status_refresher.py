@@ -1,52 +1,186 @@
 import time
 import logging
 from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Optional
 
 from azure.ai.ml import MLClient
+from azure.core.exceptions import HttpResponseError
 from azure.ai.ml.entities import PipelineJob
 from pydataio.job_config import JobConfig
 
+from drift.retraining.poll_scheduler import PollScheduler
+from drift.retraining.scope_matcher import ScopeMatcher
+from drift.retraining.wait_policy import WaitPolicy
+
+if TYPE_CHECKING:
+    from drift.retraining.retraining_scheduler import RetrainingScheduler
+
 logger = logging.getLogger(__name__)
 
+RUN_ID_PROPERTY = "drift_run_id"
+
+# Terminal statuses of the jobs, shared by the refreshers: the canceled jobs were stopped on purpose, e.g. superseded by a newer Drift run
+COMPLETED_STATUS = "Completed"
+CANCELED_STATUS = "Canceled"
+FAILED_STATUSES = ("Failed", "NotResponding", "Paused")
+
 
 class TrainingStatusRefresher:
     ml_client: MLClient
     timeout_delay: int
     refresh_delay: int
+    batched_refresh: bool
+    adaptive_refresh: bool
+    max_refresh_delay: int
+    wait_policy: WaitPolicy
+    scope_matcher: Optional[ScopeMatcher]
 
-    def __init__(self, job_config: JobConfig, ml_client: MLClient):
+    def __init__(self, job_config: JobConfig, ml_client: MLClient, scope_matcher: Optional[ScopeMatcher] = None):
+        """
+        Constructor
+        Args:
+            job_config: the job configuration
+            ml_client: the ml client
+            scope_matcher: the matcher of the jobs to retrain, parsing the group of the jobs from their display name
+        """
         self.timeout_delay = int(job_config.parameters["refreshTimeout"])
         self.refresh_delay = int(job_config.parameters["refreshDelay"])
+        self.adaptive_refresh = str(job_config.parameters.get("adaptiveRefresh", "false")).lower() == "true"
+        self.max_refresh_delay = int(job_config.parameters.get("maxRefreshDelay", 600))
+        self.batched_refresh = str(job_config.parameters.get("batchedRefresh", "false")).lower() == "true"
+        self.wait_policy = WaitPolicy(job_config)
         self.ml_client = ml_client
+        self.scope_matcher = scope_matcher
 
-    def wait_training(self, new_jobs: list[PipelineJob]) -> list[PipelineJob]:
+    def wait_training(
+        self, new_jobs: list[PipelineJob], expected_durations: Optional[dict[str, float]] = None, scheduler: Optional["RetrainingScheduler"] = None
+    ) -> list[PipelineJob]:
         """
         Wait for the training jobs to completed
+
+        With the adaptive refresh, each job is checked according to the expected training duration of its group,
+        otherwise every refreshDelay seconds. The waiting ends as soon as no job is pending, or earlier according to the wait policy.
+        With a scheduler, the queued groups are submitted as the running jobs finish. With waitMode detach, the monitoring is
+        only handed back to Azure ML once no group is queued anymore.
         Args:
             new_jobs: the new jobs to wait for
+            expected_durations: the expected training duration in seconds by group
+            scheduler: the scheduler of the groups still queued
 
         Returns: the not completed jobs
         """
 
+        if self.wait_policy.detach:
+            if scheduler is None or not scheduler.has_queued_jobs():
+                logger.info("Hand the monitoring of %s jobs back to Azure ML.", len(new_jobs))
+                return []
+
+            logger.info("Wait for the %s queued groups to be submitted before handing the monitoring back to Azure ML.", len(scheduler.queue))
+
         timeout = datetime.now() + timedelta(seconds=self.timeout_delay)
         logger.info("Waiting for %s seconds, until %s", self.timeout_delay, timeout)
 
-        updated_jobs = new_jobs
+        expected_durations = expected_durations or {}
+        poll_scheduler = PollScheduler(self.refresh_delay, self.max_refresh_delay, expected_durations if self.adaptive_refresh else None)
 
-        has_to_wait = True
-        while has_to_wait:
-            updated_jobs = self.refresh_job_status(updated_jobs)
-            for job in updated_jobs:
+        started_at = datetime.now()
+        deadlines = {job.name: self.wait_policy.get_deadline(self.get_group_name(job), started_at, expected_durations) for job in new_jobs}
+        next_checks: dict[str, datetime] = {}
+        submitted_at: dict[str, datetime] = {}
+        stopped_jobs: list[PipelineJob] = []
+        updated_jobs = new_jobs
+        check_time = started_at
+
+        while True:
+            due_jobs = [job for job in updated_jobs if job.status not in FAILED_STATUSES and next_checks.get(job.name, check_time) <= check_time]
+            refreshed_jobs = {job.name: job for job in self.refresh_job_status(due_jobs)}
+            due_names = {job.name for job in due_jobs}
+            updated_jobs = [refreshed_jobs.get(job.name, None) if job.name in due_names else job for job in updated_jobs]
+            updated_jobs = [job for job in updated_jobs if job is not None]
+
+            now = datetime.now()
+            late_jobs = [job for job in updated_jobs if job.status not in FAILED_STATUSES and deadlines.get(job.name) is not None and deadlines[job.name] < now]
+            if len(late_jobs) > 0:
+                self.stop_jobs(late_jobs, "its deadline is reached")
+                stopped_jobs.extend(late_jobs)
+                updated_jobs = [job for job in updated_jobs if job not in late_jobs]
+
+            pending_jobs = [job for job in updated_jobs if job.status not in FAILED_STATUSES]
+            for job in pending_jobs:
                 logger.info("Wait for job %s to complete.", job.display_name)
 
-            has_to_wait = len([updt_jb for updt_jb in updated_jobs if updt_jb.status != "Failed"]) > 0
+            has_failure = len(pending_jobs) < len(updated_jobs) or len(stopped_jobs) > 0
+            if self.wait_policy.fail_fast and has_failure and len(pending_jobs) > 0:
+                self.stop_jobs(pending_jobs, "another job failed")
+                stopped_jobs.extend(pending_jobs)
+                updated_jobs = [job for job in updated_jobs if job not in pending_jobs]
+                pending_jobs = []
+
+            if scheduler is not None:
+                if self.wait_policy.fail_fast and has_failure:
+                    scheduler.cancel_queued("another job failed")
+                else:
+                    submitted_jobs = scheduler.release({job.name for job in pending_jobs})
+                    for job in submitted_jobs:
+                        submitted_at[job.name] = datetime.now()
+                        deadlines[job.name] = self.wait_policy.get_deadline(self.get_group_name(job), submitted_at[job.name], expected_durations)
+                    updated_jobs = updated_jobs + submitted_jobs
+                    pending_jobs = pending_jobs + submitted_jobs
+
+                if self.wait_policy.detach and not scheduler.has_queued_jobs():
+                    logger.info("All the groups are submitted, hand the monitoring of %s jobs back to Azure ML.", len(pending_jobs))
+                    return [job for job in updated_jobs if job.status in FAILED_STATUSES] + stopped_jobs
+
+            has_to_wait = len(pending_jobs) > 0
             logger.debug("Has to wait %s", has_to_wait)
+            if not has_to_wait:
+                break
 
             self.check_timeout_reached(timeout)
 
-            time.sleep(self.refresh_delay)
+            now = datetime.now()
+            for job in pending_jobs:
+                if job.name in due_names or job.name not in next_checks:
+                    elapsed = (now - submitted_at.get(job.name, started_at)).total_seconds()
+                    next_checks[job.name] = now + timedelta(seconds=poll_scheduler.next_check_delay(self.get_group_name(job), elapsed))
 
-        return updated_jobs
+            next_check = min(next_checks.get(job.name, now) for job in pending_jobs)
+            time.sleep(max(0.0, (next_check - now).total_seconds()))
+            check_time = max(datetime.now(), next_check)
+
+        return updated_jobs + stopped_jobs
+
+    def stop_jobs(self, jobs: list[PipelineJob], reason: str):
+        """
+        Stop waiting for the jobs, cancelling them if required by the wait policy
+        Args:
+            jobs: the jobs
+            reason: the reason why the waiting stops
+        """
+        for job in jobs:
+            if self.wait_policy.should_cancel():
+                logger.warning("Cancel job %s (%s) because %s.", job.display_name, job.name, reason)
+                try:
+                    self.ml_client.jobs.begin_cancel(job.name)
+                except HttpResponseError as error:
+                    logger.warning("Cannot cancel job %s: %s", job.name, error)
+            else:
+                logger.warning("Stop waiting for job %s (%s) because %s.", job.display_name, job.name, reason)
+
+    def get_group_name(self, job: PipelineJob) -> Optional[str]:
+        """
+        Get the group of a job from its display name, parsed with the pattern selecting the jobs to retrain
+        Args:
+            job: the job
+
+        Returns: the group name, None for the default settings if the display name does not match
+        """
+        parsed_display_name = None if self.scope_matcher is None else self.scope_matcher.parse_display_name(job.display_name)
+        if parsed_display_name is None:
+            logger.debug("Job %s does not match the job name pattern, use the default settings", job.display_name)
+            return None
+
+        return parsed_display_name[0]
 
     def check_timeout_reached(self, timeout: datetime):
         """
@@ -65,16 +199,47 @@ class TrainingStatusRefresher:
         Args:
             jobs: the jobs
 
-        Returns: the refreshed jobs not completed
+        Returns: the refreshed jobs neither completed nor canceled
         """
 
+        listed_jobs = self.list_jobs_by_run_id(jobs) if self.batched_refresh else {}
+
         refreshed_jobs = []
         for job in jobs:
-            refreshed_job = self.ml_client.jobs.get(job.name)
+            refreshed_job = listed_jobs.get(job.name, None)
+            if refreshed_job is None:
+                refreshed_job = self.ml_client.jobs.get(job.name)
+
             logger.info("Training job %s (%s): [%s]", refreshed_job.display_name, refreshed_job.name, refreshed_job.status)
 
-            if refreshed_job.status != "Completed":
+            if refreshed_job.status == CANCELED_STATUS:
+                logger.warning("Training job %s (%s) was canceled, e.g. superseded by a newer run, stop waiting for it.", refreshed_job.display_name, refreshed_job.name)
+            elif refreshed_job.status != COMPLETED_STATUS:
                 logger.debug("Add %s (%s) to waiting list", refreshed_job.display_name, refreshed_job.name)
                 refreshed_jobs.append(refreshed_job)
 
         return refreshed_jobs
+
+    def list_jobs_by_run_id(self, jobs: list[PipelineJob]) -> dict[str, PipelineJob]:
+        """
+        Refresh the jobs with one filtered listing per Drift run instead of one request per job
+        Args:
+            jobs: the jobs tagged with their Drift run id
+
+        Returns: the refreshed jobs by name, the jobs missing from the listing have to be refreshed individually
+        """
+
+        pending_names = {job.name for job in jobs}
+        run_ids = {job.properties.get(RUN_ID_PROPERTY) for job in jobs if job.properties and job.properties.get(RUN_ID_PROPERTY, None) is not None}
+
+        listed_jobs: dict[str, PipelineJob] = {}
+        for run_id in run_ids:
+            for listed_job in self.ml_client.jobs.list(properties=f"{RUN_ID_PROPERTY}={run_id}"):
+                if listed_job is not None and listed_job.name in pending_names:
+                    listed_jobs[listed_job.name] = listed_job
+
+                if len(listed_jobs) == len(pending_names):
+                    break
+
+        logger.debug("Refreshed %s of %s jobs from %s listings", len(listed_jobs), len(pending_names), len(run_ids))
+        return listed_jobs
@@ -0,0 +1,65 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pydataio.job_config import JobConfig
+
+logger = logging.getLogger(__name__)
+
+CANCEL_ACTION = "cancel"
+ABANDON_ACTION = "abandon"
+
+
+class WaitPolicy:
+    """
+    Policy deciding when to stop waiting for the training jobs
+
+    Each group can have its own deadline, configured in groupTimeouts or derived from the expected training duration with deadlineFactor.
+    With failFast, the first failure stops the waiting and the pending jobs are cancelled or abandoned to Azure ML.
+    With waitMode detach, the monitoring is handed back to Azure ML right after the submission.
+    """
+
+    group_timeouts: dict[str, float]
+    deadline_factor: Optional[float]
+    fail_fast: bool
+    stop_action: str
+    detach: bool
+
+    def __init__(self, job_config: JobConfig):
+        """
+        Constructor
+        Args:
+            job_config: the job configuration
+        """
+        self.group_timeouts = {group_name: float(timeout) for group_name, timeout in job_config.parameters.get("groupTimeouts", {}).items()}
+        deadline_factor = job_config.parameters.get("deadlineFactor", None)
+        self.deadline_factor = None if deadline_factor is None else float(deadline_factor)
+        self.fail_fast = str(job_config.parameters.get("failFast", "false")).lower() == "true"
+        self.stop_action = job_config.parameters.get("stopAction", CANCEL_ACTION)
+        self.detach = job_config.parameters.get("waitMode", "wait") == "detach"
+
+        if self.stop_action not in (CANCEL_ACTION, ABANDON_ACTION):
+            raise Exception(f"Unknown stop action {self.stop_action}, expected {CANCEL_ACTION} or {ABANDON_ACTION}.")
+
+    def get_deadline(self, group_name: Optional[str], started_at: datetime, expected_durations: dict[str, float]) -> Optional[datetime]:
+        """
+        Get the deadline of the jobs of a group
+        Args:
+            group_name: the group
+            started_at: the time the waiting started
+            expected_durations: the expected training duration by group
+
+        Returns: the deadline, None if the group only has the global timeout
+        """
+        timeout = self.group_timeouts.get(group_name, None)
+        if timeout is None and self.deadline_factor is not None and group_name in expected_durations:
+            timeout = expected_durations[group_name] * self.deadline_factor
+
+        return None if timeout is None else started_at + timedelta(seconds=timeout)
+
+    def should_cancel(self) -> bool:
+        """
+        Check if the jobs the waiting stops for have to be cancelled
+        Returns: True to cancel them, False to leave them running in Azure ML
+        """
+        return self.stop_action == CANCEL_ACTION
@@ -0,0 +1,52 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BlockingCallRunner:
+    """
+    Run blocking SDK calls from coroutines in a bounded pool of threads
+
+    The Azure ML SDK has no asynchronous client, so its calls are run in worker threads
+    while the orchestration of the jobs stays on the event loop.
+    """
+
+    executor: ThreadPoolExecutor
+
+    def __init__(self, max_concurrency: int):
+        """
+        Constructor
+        Args:
+            max_concurrency: the maximum number of calls running at the same time
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="drift-async")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    async def run(self, function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking call in the pool of threads
+        Args:
+            function: the blocking function
+            args: the positional arguments of the function
+            kwargs: the keyword arguments of the function
+
+        Returns: the result of the function
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(function, *args, **kwargs))
+
+    def close(self):
+        """
+        Release the threads once the running calls are finished
+        """
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -1,13 +1,33 @@
 import logging
 import os
+import threading
+from typing import Optional
 
+import requests
 from azure.ai.ml import MLClient
-from azure.ai.ml.entities import ServicePrincipalConfiguration
+from azure.core.pipeline.transport import RequestsTransport
+from azure.ai.ml.entities import ServicePrincipalConfiguration, Workspace
 from azure.identity import ClientSecretCredential
 from pydataio.job_config import JobConfig
 
 logger = logging.getLogger(__name__)
 
+_shared_transport: Optional[RequestsTransport] = None
+_shared_transport_lock = threading.Lock()
+
+
+def get_shared_transport() -> RequestsTransport:
+    """
+    Get the HTTP transport shared by the credentials and clients of the process, pooling the connections
+    Returns: the shared transport
+    """
+    global _shared_transport
+    with _shared_transport_lock:
+        if _shared_transport is None:
+            _shared_transport = RequestsTransport(session=requests.Session(), session_owner=False)
+
+        return _shared_transport
+
 
 class AzMLConfig:
     """
@@ -29,7 +49,8 @@ class MlFlowUtils:
 
     sp_config: ServicePrincipalConfiguration
     ml_client: MLClient
-    mlflow_tracking_uri: str
+    cached_workspace: Optional[Workspace]
+    workspace_lock: threading.Lock
 
     def __init__(self, az_ml_config: AzMLConfig):
         """
@@ -43,10 +64,12 @@ class MlFlowUtils:
         client_id = dbutils.secrets.get(scope=az_ml_config.vault_name, key="ApplicationID")
         client_secret = dbutils.secrets.get(scope=az_ml_config.vault_name, key="ApplicationPassword")
 
+        transport = get_shared_transport()
         client_secret_credential = ClientSecretCredential(
             tenant_id=tenant_id,
             client_id=client_id,
             client_secret=client_secret,
+            transport=transport,
         )
 
         self.ml_client = MLClient(
@@ -54,6 +77,7 @@ class MlFlowUtils:
             subscription_id=az_ml_config.subscription_id,
             resource_group_name=az_ml_config.resource_group_name,
             workspace_name=az_ml_config.workspace_name,
+            transport=transport,
         )
 
         self.sp_config = ServicePrincipalConfiguration(tenant_id=tenant_id, client_id=client_id, client_secret=client_secret)
@@ -62,17 +86,90 @@ class MlFlowUtils:
         os.environ["AZURE_CLIENT_ID"] = client_id
         os.environ["AZURE_CLIENT_SECRET"] = client_secret
 
-        self.mlflow_tracking_uri = self.ml_client.workspaces.get(self.ml_client.workspace_name).mlflow_tracking_uri
+        self.cached_workspace = None
+        self.workspace_lock = threading.Lock()
+
+    @property
+    def workspace(self) -> Workspace:
+        """
+        Get the metadata of the workspace, retrieved on first use
+        Returns: the workspace
+        """
+        with self.workspace_lock:
+            if self.cached_workspace is None:
+                self.cached_workspace = self.ml_client.workspaces.get(self.ml_client.workspace_name)
+
+            return self.cached_workspace
+
+    @property
+    def mlflow_tracking_uri(self) -> str:
+        return self.workspace.mlflow_tracking_uri
+
+    def prefetch_workspace(self):
+        """
+        Retrieve the metadata of the workspace in the background, for a caller that will need them
+        """
+
+        def fetch_workspace():
+            try:
+                logger.debug("Prefetched workspace %s", self.workspace.name)
+            except Exception as error:
+                logger.warning("Cannot prefetch the workspace metadata: %s", error)
+
+        threading.Thread(target=fetch_workspace, name="drift-workspace-prefetch", daemon=True).start()
+
 
+class ClientProvider:
+    """
+    Process-wide provider of the Azure ML utils, keyed by subscription, resource group, workspace and vault
 
-def init_ml_flow_utils(jobConfig: JobConfig, vault_name: str) -> MlFlowUtils:
+    All the transformers of a pipeline run share the same credential, with its cached token, and the same MLClient.
     """
-    Initialize the MLFlow utils
+
+    ml_flow_utils: dict[tuple[str, str, str, str], MlFlowUtils]
+    lock: threading.Lock
+
+    def __init__(self):
+        self.ml_flow_utils = {}
+        self.lock = threading.Lock()
+
+    def get_ml_flow_utils(self, az_ml_config: AzMLConfig) -> MlFlowUtils:
+        """
+        Get the Azure ML utils of a workspace, created on first use
+        Args:
+            az_ml_config: Azure ML configuration
+
+        Returns: the MLFlow utils
+        """
+        key = (az_ml_config.subscription_id, az_ml_config.resource_group_name, az_ml_config.workspace_name, az_ml_config.vault_name)
+        with self.lock:
+            if key not in self.ml_flow_utils:
+                logger.info("Create the Azure ML client of workspace %s", az_ml_config.workspace_name)
+                self.ml_flow_utils[key] = MlFlowUtils(az_ml_config)
+
+            return self.ml_flow_utils[key]
+
+    def clear(self):
+        with self.lock:
+            self.ml_flow_utils = {}
+
+
+client_provider = ClientProvider()
+
+
+def init_ml_flow_utils(jobConfig: JobConfig, vault_name: str, prefetch_workspace: bool = False) -> MlFlowUtils:
+    """
+    Initialize the MLFlow utils, shared by all the callers with the same workspace and vault
     Args:
         jobConfig: the job configuration
         vault_name: key vault nane
+        prefetch_workspace: True to retrieve the workspace metadata, e.g. the MLflow tracking URI, in the background
 
     Returns: the MLFlow utils
     """
     az_ml_config = AzMLConfig(jobConfig, vault_name)
-    return MlFlowUtils(az_ml_config)
+    ml_flow_utils = client_provider.get_ml_flow_utils(az_ml_config)
+    if prefetch_workspace:
+        ml_flow_utils.prefetch_workspace()
+
+    return ml_flow_utils
@@ -0,0 +1,100 @@
+import logging
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+from azure.core.exceptions import HttpResponseError
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = (429, 503)
+
+T = TypeVar("T")
+
+
+class RateLimiter:
+    """
+    Client side limit of the request rate, shared by several threads
+    """
+
+    interval: float
+    next_request_time: float
+    lock: threading.Lock
+
+    def __init__(self, requests_per_second: Optional[float]):
+        """
+        Constructor
+        Args:
+            requests_per_second: the maximum number of requests per second, None for no limit
+        """
+        self.interval = 0.0 if requests_per_second is None else 1.0 / float(requests_per_second)
+        self.next_request_time = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Wait until a new request can be sent
+        """
+        if self.interval == 0.0:
+            return
+
+        with self.lock:
+            now = time.monotonic()
+            request_time = max(now, self.next_request_time)
+            self.next_request_time = request_time + self.interval
+
+        if request_time > now:
+            time.sleep(request_time - now)
+
+
+def get_retry_after(error: HttpResponseError) -> Optional[float]:
+    """
+    Get the delay requested by the service before retrying
+    Args:
+        error: the HTTP error
+
+    Returns: the delay in seconds from the Retry-After header, None if not provided
+    """
+    if error.response is None:
+        return None
+
+    retry_after = error.response.headers.get("Retry-After", None)
+    if retry_after is None:
+        return None
+
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        return None
+
+
+def call_with_retry(function: Callable[[], T], max_retries: int, backoff_delay: float, rate_limiter: Optional[RateLimiter] = None) -> T:
+    """
+    Call the function, retrying with an exponential backoff when the service is throttling
+    Args:
+        function: the function sending the request
+        max_retries: the maximum number of retries
+        backoff_delay: the initial backoff delay in seconds, doubled on each retry
+        rate_limiter: the optional rate limiter applied to each attempt
+
+    Returns: the result of the function
+    """
+    attempt = 0
+    while True:
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+
+        try:
+            return function()
+        except HttpResponseError as error:
+            if error.status_code not in RETRYABLE_STATUS_CODES or attempt >= max_retries:
+                raise
+
+            delay = get_retry_after(error)
+            if delay is None:
+                delay = backoff_delay * (2**attempt) * random.uniform(0.5, 1.5)
+
+            attempt += 1
+            logger.warning("Request throttled with status %s, retry %s/%s in %.1f seconds", error.status_code, attempt, max_retries, delay)
+            time.sleep(delay)
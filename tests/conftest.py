@@ -40,6 +40,8 @@ def create_mock_pipeline_job(display_name, train_path="azureml://datastores/data
     job.name = name or display_name.replace(" ", "_").lower()
     job.display_name = display_name
     job.status = status
+    job.tags = {}
+    job.properties = {}
     job.inputs = {
         "training_data": Mock(path=train_path),
         "validation_data": Mock(path=val_path),
@@ -0,0 +1,48 @@
+"""Tests for AsyncModelRetrainer"""
+import pytest
+
+from drift.retraining.async_model_retrainer import AsyncModelRetrainer
+from drift.retraining.async_training_status_refresher import AsyncTrainingStatusRefresher
+from drift.retraining.job_group import JobGroup
+from tests.conftest import create_mock_pipeline_job
+
+
+@pytest.fixture
+def model_retrainer(mock_job_config):
+    """Create an AsyncModelRetrainer instance"""
+    retrainer = AsyncModelRetrainer()
+    retrainer.jobConfig = mock_job_config
+    return retrainer
+
+
+def test_creates_async_refresher(model_retrainer, mock_job_config, mock_ml_client):
+    """Test that the asynchronous refresher watches the jobs"""
+    model_retrainer.compute_jobname_pattern({})
+    assert isinstance(model_retrainer.create_training_status_refresher(mock_job_config, mock_ml_client), AsyncTrainingStatusRefresher)
+
+
+def test_retrain_models_keeps_order(model_retrainer, mock_ml_client):
+    """Test that the concurrent submissions return the created jobs in the order of the groups"""
+    job_groups = [JobGroup(f"model{index}", 20231115120000, create_mock_pipeline_job(f"model{index}_20231115120000_abc")) for index in range(5)]
+    mock_ml_client.jobs.create_or_update.side_effect = lambda job: create_mock_pipeline_job(job.display_name)
+
+    result = model_retrainer.retrain_models(mock_ml_client, job_groups, {"data_asset_version": "v2"})
+
+    assert [job.display_name.split("_")[0] for job in result] == [f"model{index}" for index in range(5)]
+
+
+def test_retrain_models_reports_failed_submissions_together(model_retrainer, mock_ml_client):
+    """Test that a failed submission does not stop the concurrent ones, and the failures are reported together"""
+    job_groups = [JobGroup(f"model{index}", 20231115120000, create_mock_pipeline_job(f"model{index}_20231115120000_abc")) for index in range(3)]
+
+    def create_or_update(job):
+        if not job.display_name.startswith("model1_"):
+            raise Exception(f"failure of {job.display_name.split('_')[0]}")
+        return create_mock_pipeline_job(job.display_name, name=job.name)
+
+    mock_ml_client.jobs.create_or_update.side_effect = create_or_update
+
+    with pytest.raises(Exception, match="groups model0, model2: failure of model0; failure of model2"):
+        model_retrainer.retrain_models(mock_ml_client, job_groups, {"data_asset_version": "v2"})
+
+    assert mock_ml_client.jobs.create_or_update.call_count == 3
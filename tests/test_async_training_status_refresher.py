@@ -0,0 +1,81 @@
+"""Tests for AsyncTrainingStatusRefresher"""
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from drift.retraining.async_training_status_refresher import AsyncTrainingStatusRefresher
+from tests.conftest import create_mock_pipeline_job
+
+
+@pytest.fixture
+def refresher(mock_job_config, mock_ml_client):
+    """Create an AsyncTrainingStatusRefresher instance"""
+    return AsyncTrainingStatusRefresher(mock_job_config, mock_ml_client)
+
+
+@patch("drift.retraining.async_training_status_refresher.asyncio.sleep", new_callable=AsyncMock)
+def test_wait_training_returns_failed_jobs(mock_sleep, refresher):
+    """Test that each job is watched until completed or failed"""
+    statuses = {"job1": iter(["Running", "Completed"]), "job2": iter(["Failed"])}
+    refresher.ml_client.jobs.get.side_effect = lambda name: create_mock_pipeline_job(name, name=name, status=next(statuses[name]))
+
+    result = refresher.wait_training([create_mock_pipeline_job("job1", name="job1"), create_mock_pipeline_job("job2", name="job2")])
+
+    assert [job.name for job in result] == ["job2"]
+    assert mock_sleep.await_count == 1
+
+
+@patch("drift.retraining.async_training_status_refresher.asyncio.sleep", new_callable=AsyncMock)
+def test_wait_training_stops_at_canceled_jobs(mock_sleep, refresher):
+    """Test that the canceled jobs are not watched anymore nor reported as failed, unlike the jobs not responding"""
+    statuses = {"job1": "Canceled", "job2": "NotResponding"}
+    refresher.ml_client.jobs.get.side_effect = lambda name: create_mock_pipeline_job(name, name=name, status=statuses[name])
+
+    result = refresher.wait_training([create_mock_pipeline_job("job1", name="job1"), create_mock_pipeline_job("job2", name="job2")])
+
+    assert [job.name for job in result] == ["job2"]
+    mock_sleep.assert_not_awaited()
+
+
+@patch("drift.retraining.async_training_status_refresher.asyncio.sleep", new_callable=AsyncMock)
+def test_fail_fast_stops_pending_watchers(mock_sleep, mock_job_config, mock_ml_client):
+    """Test that the first failure cancels the jobs still watched"""
+    mock_job_config.parameters["failFast"] = "true"
+    refresher = AsyncTrainingStatusRefresher(mock_job_config, mock_ml_client)
+
+    statuses = {"job1": "Failed", "job2": "Running"}
+    refresher.ml_client.jobs.get.side_effect = lambda name: create_mock_pipeline_job(name, name=name, status=statuses[name])
+
+    result = refresher.wait_training([create_mock_pipeline_job("job1", name="job1"), create_mock_pipeline_job("job2", name="job2")])
+
+    assert sorted(job.name for job in result) == ["job1", "job2"]
+    refresher.ml_client.jobs.begin_cancel.assert_called_once_with("job2")
+
+
+@patch("drift.retraining.async_training_status_refresher.asyncio.sleep", new_callable=AsyncMock)
+def test_wait_training_watches_submitted_jobs(mock_sleep, refresher):
+    """Test that the jobs submitted by the scheduler are watched too"""
+    scheduler = Mock()
+    scheduler.release.side_effect = [[create_mock_pipeline_job("job2", name="job2")], []]
+    statuses = {"job1": iter(["Completed"]), "job2": iter(["Failed"])}
+    refresher.ml_client.jobs.get.side_effect = lambda name: create_mock_pipeline_job(name, name=name, status=next(statuses[name]))
+
+    result = refresher.wait_training([create_mock_pipeline_job("job1", name="job1")], scheduler=scheduler)
+
+    assert [job.name for job in result] == ["job2"]
+
+
+@patch("drift.retraining.async_training_status_refresher.asyncio.sleep", new_callable=AsyncMock)
+def test_detach_after_queued_groups_are_submitted(mock_sleep, mock_job_config, mock_ml_client):
+    """Test that the detach mode first waits for the queued groups to be submitted"""
+    mock_job_config.parameters["waitMode"] = "detach"
+    refresher = AsyncTrainingStatusRefresher(mock_job_config, mock_ml_client)
+    scheduler = Mock(queue=["group"])
+    scheduler.has_queued_jobs.side_effect = [True, False]
+    scheduler.release.side_effect = [[create_mock_pipeline_job("job2", name="job2")]]
+    refresher.ml_client.jobs.get.side_effect = lambda name: create_mock_pipeline_job(name, name=name, status="Completed" if name == "job1" else "Running")
+
+    result = refresher.wait_training([create_mock_pipeline_job("job1", name="job1")], scheduler=scheduler)
+
+    assert result == []
+    scheduler.release.assert_called_once_with(set())
@@ -4,7 +4,7 @@ from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 
-from drift.tools.azml import AzMLConfig, MlFlowUtils, init_ml_flow_utils
+from drift.tools.azml import AzMLConfig, MlFlowUtils, client_provider, get_shared_transport, init_ml_flow_utils
 
 
 @pytest.fixture
@@ -137,6 +137,7 @@ class TestMlFlowUtils:
                 tenant_id="test-tenant-id",
                 client_id="test-app-id",
                 client_secret="test-app-password",
+                transport=get_shared_transport(),
             )
 
             # Verify MLClient was created
@@ -145,6 +146,7 @@ class TestMlFlowUtils:
                 subscription_id="test-subscription-id",
                 resource_group_name="test-resource-group",
                 workspace_name="test-ml-workspace",
+                transport=get_shared_transport(),
             )
 
             # Verify ServicePrincipalConfiguration was created
@@ -159,8 +161,11 @@ class TestMlFlowUtils:
             assert os.environ["AZURE_CLIENT_ID"] == "test-app-id"
             assert os.environ["AZURE_CLIENT_SECRET"] == "test-app-password"
 
-            # Verify mlflow_tracking_uri was set
+            # Verify mlflow_tracking_uri is only retrieved on first use
+            mock_ml_client_instance.workspaces.get.assert_not_called()
             assert utils.mlflow_tracking_uri == "test-tracking-uri"
+            assert utils.mlflow_tracking_uri == "test-tracking-uri"
+            mock_ml_client_instance.workspaces.get.assert_called_once_with("test-workspace")
 
             # Verify attributes
             assert utils.ml_client == mock_ml_client_instance
@@ -204,6 +209,13 @@ class TestMlFlowUtils:
 class TestInitMlFlowUtils:
     """Test cases for init_ml_flow_utils function"""
 
+    @pytest.fixture(autouse=True)
+    def clear_client_provider(self):
+        """Start each test without shared clients"""
+        client_provider.clear()
+        yield
+        client_provider.clear()
+
     @patch("drift.tools.azml.MlFlowUtils")
     @patch("drift.tools.azml.AzMLConfig")
     def test_init_ml_flow_utils_success(self, mock_azml_config_class, mock_mlflow_utils_class, mock_job_config, mock_vault_name):
@@ -252,5 +264,22 @@ class TestInitMlFlowUtils:
         mock_mlflow_utils_class.assert_called_once_with(mock_azml_config_instance)
         assert result == mock_mlflow_utils_instance
 
+    @patch("drift.tools.azml.MlFlowUtils")
+    def test_init_ml_flow_utils_shares_clients(self, mock_mlflow_utils_class, mock_job_config):
+        """Test that the clients are created once per workspace and vault"""
+        first_utils = init_ml_flow_utils(mock_job_config, "test-vault")
+        second_utils = init_ml_flow_utils(mock_job_config, "test-vault")
+        other_vault_utils = init_ml_flow_utils(mock_job_config, "other-vault")
 
+        assert first_utils is second_utils
+        assert mock_mlflow_utils_class.call_count == 2
+        assert other_vault_utils is mock_mlflow_utils_class.return_value
+
+    @patch("drift.tools.azml.MlFlowUtils")
+    def test_init_ml_flow_utils_prefetches_workspace(self, mock_mlflow_utils_class, mock_job_config):
+        """Test that the workspace metadata are prefetched on request only"""
+        init_ml_flow_utils(mock_job_config, "test-vault")
+        mock_mlflow_utils_class.return_value.prefetch_workspace.assert_not_called()
 
+        init_ml_flow_utils(mock_job_config, "test-vault", prefetch_workspace=True)
+        mock_mlflow_utils_class.return_value.prefetch_workspace.assert_called_once()
@@ -1,7 +1,23 @@
 """Tests for DataAssetRegistrator"""
-from unittest.mock import Mock
+import json
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
+
+import pytest
+from azure.ai.ml.entities import AzureDataLakeGen2Datastore, ServicePrincipalConfiguration
+from azure.core.exceptions import ResourceNotFoundError
 
 from drift.registrating.data_asset_registrator import DataAssetRegistrator
+from drift.registrating.delta_table_inspector import DeltaChanges, DeltaCommit
+from drift.registrating.mltable_spec_builder import mltable_spec_builder
+
+
+@pytest.fixture(autouse=True)
+def clear_mltable_spec_builder():
+    """Forget the MLTable specs uploaded by the other tests"""
+    mltable_spec_builder.clear()
+    yield
+    mltable_spec_builder.clear()
 
 
 def test_init_computes_names():
@@ -17,7 +33,7 @@ def test_init_computes_names():
         "container_path": "data/training/path"
     }
     
-    registrator = DataAssetRegistrator(ml_client, sp_config, parameters, "v1", "2023-11-15T12:00:00Z")
+    registrator = DataAssetRegistrator(ml_client, sp_config, parameters, "v1", DeltaCommit(42, datetime(2023, 11, 15, 12, 0, tzinfo=timezone.utc)))
     
     # Should contain container name and sanitized path
     assert "test-container" in registrator.mltable_name
@@ -42,8 +58,210 @@ def test_path_sanitization():
         "container_path": "/leading/middle/trailing/"
     }
     
-    registrator = DataAssetRegistrator(ml_client, sp_config, parameters, "v1", "2023-11-15T12:00:00Z")
+    registrator = DataAssetRegistrator(ml_client, sp_config, parameters, "v1", DeltaCommit(42, datetime(2023, 11, 15, 12, 0, tzinfo=timezone.utc)))
     
     # Should strip leading/trailing slashes and replace middle ones with hyphens
     assert registrator.mltable_name == "container-leading-middle-trailing-mltable"
     assert registrator.data_asset_uri == "container-leading-middle-trailing-uri"
+
+
+def create_registrator(ml_client, sp_config=None):
+    """Helper to create a registrator of a test container"""
+    parameters = {
+        "subscription_id": "test-sub",
+        "resource_group": "test-rg",
+        "ml_workspace_name": "test-workspace",
+        "storage_account_name": "teststorage",
+        "container_name": "container",
+        "container_path": "data/path",
+    }
+    return DataAssetRegistrator(ml_client, sp_config or Mock(), parameters, "20231115000000-v42", DeltaCommit(42, datetime(2023, 11, 15, tzinfo=timezone.utc)))
+
+
+def test_delta_commit_recorded_in_tags():
+    """Test that the Delta commit is recorded in the data asset tags"""
+    registrator = create_registrator(Mock())
+
+    assert registrator.tags["delta_version"] == "42"
+
+
+def test_no_missing_data_asset():
+    """Test that the registration is looked up by the version pinned to the Delta commit"""
+    ml_client = Mock()
+    ml_client.data.get.return_value = Mock(version="20231115000000-v42", tags={"delta_version": "42"})
+
+    assert create_registrator(ml_client).get_missing_data_assets() == []
+    ml_client.data.get.assert_any_call(name="container-data-path-mltable", version="20231115000000-v42")
+    ml_client.data.get.assert_any_call(name="container-data-path-uri", version="20231115000000-v42")
+
+
+def test_missing_data_assets():
+    """Test that the data assets missing the version of a new Delta commit are listed"""
+    def get_data_asset(name, version):
+        if name != "container-data-path-mltable":
+            raise ResourceNotFoundError("not found")
+        return Mock(name=name, version=version)
+
+    ml_client = Mock()
+    ml_client.data.get.side_effect = get_data_asset
+
+    assert create_registrator(ml_client).get_missing_data_assets() == ["container-data-path-uri", "container-data-path-delta-mltable"]
+
+
+@patch("mltable.from_delta_lake")
+def test_register_mltable_pins_delta_version(mock_from_delta_lake):
+    """Test that the MLTable is registered against the Delta commit version"""
+    ml_client = Mock()
+
+    create_registrator(ml_client).register_mltable("azureml://datastores/container/paths/data/path")
+
+    mock_from_delta_lake.assert_called_once_with("azureml://datastores/container/paths/data/path", version_as_of=42)
+    assert ml_client.data.create_or_update.call_args[0][0].tags["delta_version"] == "42"
+
+
+@patch("mltable.from_delta_lake")
+def test_register_mltable_reuses_uploaded_spec(mock_from_delta_lake):
+    """Test that registering the same Delta version again neither rebuilds nor uploads the spec"""
+    ml_client = Mock()
+    ml_client.data.create_or_update.return_value = Mock(path="azureml://datastores/workspaceblobstore/paths/LocalUpload/abc/container-data-path-mltable/")
+
+    create_registrator(ml_client).register_mltable("azureml://datastores/container/paths/data/path")
+    create_registrator(ml_client).register_mltable("azureml://datastores/container/paths/data/path")
+
+    mock_from_delta_lake.assert_called_once()
+    assert ml_client.data.create_or_update.call_args[0][0].path == "azureml://datastores/workspaceblobstore/paths/LocalUpload/abc/container-data-path-mltable/"
+
+
+def test_drift_statistics_recorded_with_assets():
+    """Test that the drift statistics are recorded in the properties and the score in the tags"""
+    registrator = create_registrator(Mock())
+
+    registrator.set_drift_statistics({"delta_version": 42, "drift_score": 0.2, "columns": {}})
+
+    assert registrator.tags["drift_score"] == "0.2"
+    assert json.loads(registrator.properties["drift_statistics"])["delta_version"] == 42
+
+
+def test_latest_statistics():
+    """Test that the statistics of the latest registered version are read back"""
+    ml_client = Mock()
+    ml_client.data.get.return_value = Mock(properties={"drift_statistics": '{"drift_score": 0.1}'})
+
+    assert create_registrator(ml_client).get_latest_statistics() == {"drift_score": 0.1}
+
+
+def create_datastore(client_secret):
+    """Helper to create the datastore of the test container"""
+    sp_config = ServicePrincipalConfiguration(tenant_id="tenant", client_id="client", client_secret=client_secret)
+    return AzureDataLakeGen2Datastore(name="container", account_name="teststorage", filesystem="container", credentials=sp_config)
+
+
+@patch.object(DataAssetRegistrator, "register_uri_data_asset")
+@patch.object(DataAssetRegistrator, "register_mltable")
+def test_register_dataset_skips_identical_datastore(mock_register_mltable, mock_register_uri):
+    """Test that an identical datastore is not upserted before registering both data assets"""
+    ml_client = Mock()
+    ml_client.datastores.get.return_value = create_datastore("secret")
+
+    create_registrator(ml_client, create_datastore("secret").credentials).register_dataset()
+
+    ml_client.datastores.get.assert_called_once_with("container", include_secrets=True)
+    ml_client.create_or_update.assert_not_called()
+    mock_register_mltable.assert_called_once()
+    mock_register_uri.assert_called_once()
+
+
+@patch.object(DataAssetRegistrator, "register_uri_data_asset")
+@patch.object(DataAssetRegistrator, "register_mltable")
+def test_register_dataset_upserts_changed_datastore(mock_register_mltable, mock_register_uri):
+    """Test that a datastore with other credentials or no datastore at all is upserted"""
+    ml_client = Mock()
+    ml_client.datastores.get.return_value = create_datastore("rotated")
+
+    create_registrator(ml_client, create_datastore("secret").credentials).register_dataset()
+
+    ml_client.datastores.get.side_effect = ResourceNotFoundError("not found")
+    create_registrator(ml_client, create_datastore("secret").credentials).register_dataset()
+
+    assert ml_client.create_or_update.call_count == 2
+
+
+@patch.object(DataAssetRegistrator, "register_incremental_mltable")
+@patch.object(DataAssetRegistrator, "register_uri_data_asset")
+@patch.object(DataAssetRegistrator, "register_mltable")
+def test_register_dataset_reports_errors_together(mock_register_mltable, mock_register_uri, mock_register_incremental):
+    """Test that the data assets are registered even if one fails, the failures reported together and the MLTable not registered"""
+    ml_client = Mock()
+    ml_client.datastores.get.side_effect = ResourceNotFoundError("not found")
+    mock_register_uri.side_effect = Exception("uri failure")
+    mock_register_incremental.side_effect = Exception("incremental failure")
+    registrator = create_registrator(ml_client)
+    registrator.set_delta_changes(DeltaChanges(41, 42, ["part-1.parquet"], [], True))
+
+    with pytest.raises(Exception, match="container-data-path-uri, container-data-path-delta-mltable: uri failure; incremental failure") as raised:
+        registrator.register_dataset()
+
+    assert raised.value.__cause__ is mock_register_uri.side_effect
+
+    mock_register_uri.assert_called_once()
+    mock_register_incremental.assert_called_once()
+    mock_register_mltable.assert_not_called()
+
+
+@patch.object(DataAssetRegistrator, "register_uri_data_asset")
+@patch.object(DataAssetRegistrator, "register_mltable")
+def test_register_dataset_registers_given_data_assets(mock_register_mltable, mock_register_uri):
+    """Test that only the given data assets are registered"""
+    ml_client = Mock()
+    ml_client.datastores.get.side_effect = ResourceNotFoundError("not found")
+
+    create_registrator(ml_client).register_dataset(["container-data-path-mltable"])
+
+    mock_register_uri.assert_not_called()
+    mock_register_mltable.assert_called_once()
+
+
+def test_latest_delta_version():
+    """Test that the Delta version of the latest registered MLTable is read from its tags"""
+    ml_client = Mock()
+    ml_client.data.get.return_value = Mock(tags={"delta_version": "41"})
+
+    assert create_registrator(ml_client).get_latest_delta_version() == 41
+
+    ml_client.data.get.side_effect = ResourceNotFoundError("not found")
+    assert create_registrator(ml_client).get_latest_delta_version() is None
+
+
+@patch.object(DataAssetRegistrator, "register_incremental_mltable")
+@patch.object(DataAssetRegistrator, "register_uri_data_asset")
+@patch.object(DataAssetRegistrator, "register_mltable")
+def test_register_dataset_with_added_files_only(mock_register_mltable, mock_register_uri, mock_register_incremental):
+    """Test that the incremental MLTable is registered next to the full snapshot only when files were added"""
+    ml_client = Mock()
+    registrator = create_registrator(ml_client)
+    registrator.set_delta_changes(DeltaChanges(41, 42, [], [], False))
+
+    registrator.register_dataset()
+    mock_register_incremental.assert_not_called()
+
+    registrator.set_delta_changes(DeltaChanges(41, 42, ["part-1.parquet"], [], True))
+    registrator.register_dataset()
+
+    mock_register_incremental.assert_called_once()
+    assert mock_register_mltable.call_count == 2
+
+
+@patch("mltable.from_parquet_files")
+def test_register_incremental_mltable_tags(mock_from_parquet_files):
+    """Test that the incremental MLTable records the base Delta version and whether it only holds new rows"""
+    ml_client = Mock()
+    registrator = create_registrator(ml_client)
+    registrator.set_delta_changes(DeltaChanges(41, 42, ["part-1.parquet"], [], True))
+
+    registrator.register_incremental_mltable("azureml://datastores/container/paths/data/path")
+
+    incremental_data_asset = ml_client.data.create_or_update.call_args[0][0]
+    assert incremental_data_asset.name == "container-data-path-delta-mltable"
+    assert incremental_data_asset.version == "20231115000000-v42"
+    assert incremental_data_asset.tags["delta_base_version"] == "41"
+    assert incremental_data_asset.tags["delta_append_only"] == "true"
@@ -1,20 +1,19 @@
 """Tests for DatasetRegistrator"""
-import re
-from unittest.mock import Mock
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
 
+import pytest
+
+from drift.registrating.data_asset_registrator import DataAssetRegistrator
 from drift.registrating.dataset_registrator import DatasetRegistrator
+from drift.registrating.delta_table_inspector import DeltaCommit
 
 
 def test_compute_version_format():
-    """Test version format is YYYYMMDDHHMMSS and timestamp is ISO format"""
-    version, timestamp = DatasetRegistrator.compute_version()
-    
-    # Version should be 14 digits (YYYYMMDDHHMMSS)
-    assert re.match(r'^\d{14}$', version)
-    
-    # Timestamp should be ISO 8601 format
-    assert 'T' in timestamp
-    assert 'Z' in timestamp
+    """Test version is the commit timestamp YYYYMMDDHHMMSS followed by the commit version"""
+    version = DatasetRegistrator.compute_version(DeltaCommit(42, datetime(2023, 11, 15, 12, 30, 5, tzinfo=timezone.utc)))
+
+    assert version == "20231115123005-v42"
 
 
 def test_load_parameters_extracts_config():
@@ -39,3 +38,179 @@ def test_load_parameters_extracts_config():
     assert params['storage_account_name'] == "teststorage"
     assert params['container_name'] == "testcontainer"
     assert params['container_path'] == "data/path"
+
+
+@patch.object(DatasetRegistrator, "publish_new_version")
+@patch("drift.registrating.dataset_registrator.DataAssetRegistrator", wraps=DataAssetRegistrator)
+@patch("drift.registrating.dataset_registrator.DeltaTableInspector")
+@patch("drift.registrating.dataset_registrator.init_ml_flow_utils")
+def test_featurize_skips_unchanged_table(mock_init, mock_inspector, mock_registrator, mock_publish):
+    """Test that an unchanged Delta table is not registered again"""
+    job_config = Mock()
+    job_config.parameters = {
+        "azml": {"subscriptionId": "test-sub", "resourceGroup": "test-rg", "mlWorkspaceName": "test-workspace"},
+        "storageAccountName": "teststorage",
+        "containerName": "testcontainer",
+        "containerDataPath": "data/path",
+        "skipUnchanged": "true",
+    }
+    mock_inspector.return_value.get_latest_commit.return_value = DeltaCommit(42, datetime(2023, 11, 15, 12, 0, tzinfo=timezone.utc))
+    mock_registrator.return_value.get_missing_data_assets.return_value = []
+
+    DatasetRegistrator().featurize(job_config, Mock(), {"vault_name": "vault"})
+
+    mock_registrator.return_value.register_dataset.assert_not_called()
+    mock_publish.assert_called_once_with("20231115120000-v42", False, {
+        "testcontainer-data-path-mltable": {"version": "20231115120000-v42", "changed": False},
+        "testcontainer-data-path-uri": {"version": "20231115120000-v42", "changed": False},
+    })
+
+
+@patch.object(DatasetRegistrator, "publish_new_version")
+@patch("drift.registrating.dataset_registrator.DataAssetRegistrator", wraps=DataAssetRegistrator)
+@patch("drift.registrating.dataset_registrator.DeltaTableInspector")
+@patch("drift.registrating.dataset_registrator.init_ml_flow_utils")
+def test_featurize_registers_missing_data_assets(mock_init, mock_inspector, mock_registrator, mock_publish):
+    """Test that the data assets missing the version are registered again, and the complete registrations skipped"""
+    job_config = Mock()
+    job_config.parameters = {
+        "azml": {"subscriptionId": "test-sub", "resourceGroup": "test-rg", "mlWorkspaceName": "test-workspace"},
+        "storageAccountName": "teststorage",
+        "containerName": "testcontainer",
+        "containerDataPath": "data/path",
+    }
+    mock_inspector.return_value.get_latest_commit.return_value = DeltaCommit(42, datetime(2023, 11, 15, 12, 0, tzinfo=timezone.utc))
+    registrator = mock_registrator.return_value
+    registrator.mltable_name = "testcontainer-data-path-mltable"
+    registrator.data_asset_uri = "testcontainer-data-path-uri"
+
+    registrator.get_missing_data_assets.return_value = ["testcontainer-data-path-uri", "testcontainer-data-path-mltable"]
+    DatasetRegistrator().featurize(job_config, Mock(), {"vault_name": "vault"})
+    registrator.register_dataset.assert_called_once_with(["testcontainer-data-path-uri", "testcontainer-data-path-mltable"])
+
+    registrator.register_dataset.reset_mock()
+    registrator.get_missing_data_assets.return_value = ["testcontainer-data-path-uri"]
+    DatasetRegistrator().featurize(job_config, Mock(), {"vault_name": "vault"})
+    registrator.register_dataset.assert_called_once_with(["testcontainer-data-path-uri"])
+
+
+@patch.object(DatasetRegistrator, "publish_new_version")
+@patch("drift.registrating.dataset_registrator.DataAssetRegistrator")
+@patch("drift.registrating.dataset_registrator.DeltaTableInspector")
+@patch("drift.registrating.dataset_registrator.init_ml_flow_utils")
+def test_featurize_incremental_asset_of_untagged_registration(mock_init, mock_inspector, mock_registrator, mock_publish):
+    """Test that the changes know about a previous registration without Delta version, unlike a first registration"""
+    job_config = Mock()
+    job_config.parameters = {
+        "azml": {"subscriptionId": "test-sub", "resourceGroup": "test-rg", "mlWorkspaceName": "test-workspace"},
+        "storageAccountName": "teststorage",
+        "containerName": "testcontainer",
+        "containerDataPath": "data/path",
+        "incrementalAsset": "true",
+    }
+    mock_inspector.return_value.get_latest_commit.return_value = DeltaCommit(42, datetime(2023, 11, 15, 12, 0, tzinfo=timezone.utc))
+    registrator = mock_registrator.return_value
+    registrator.get_missing_data_assets.return_value = [registrator.mltable_name]
+    registrator.get_latest_delta_version.return_value = None
+
+    DatasetRegistrator().featurize(job_config, Mock(), {"vault_name": "vault"})
+    mock_inspector.return_value.get_changes.assert_called_once_with(None, 42, True)
+
+    mock_inspector.return_value.get_changes.reset_mock()
+    registrator.get_latest_mltable.return_value = None
+    DatasetRegistrator().featurize(job_config, Mock(), {"vault_name": "vault"})
+    mock_inspector.return_value.get_changes.assert_called_once_with(None, 42, False)
+
+
+@patch("drift.registrating.sketch_drift_analyzer.SketchDriftAnalyzer")
+@patch("drift.registrating.drift_analyzer.DriftAnalyzer")
+def test_analyze_drift_with_sketch_engine(mock_spark_analyzer, mock_sketch_analyzer, tmp_path):
+    """Test that the sketch engine reads the Delta files without Spark"""
+    job_config = Mock()
+    job_config.parameters = {"driftEngine": "sketch", "sketchCachePath": str(tmp_path)}
+    inspector = Mock(table_uri="abfss://table", storage_options={"azure_client_id": "client"})
+    registrator = Mock()
+    registrator.get_latest_statistics.return_value = None
+
+    DatasetRegistrator.analyze_drift(job_config, Mock(), {}, Mock(), inspector, DeltaCommit(42, datetime(2023, 11, 15, tzinfo=timezone.utc)), registrator)
+
+    mock_spark_analyzer.assert_not_called()
+    mock_sketch_analyzer.return_value.compute_statistics.assert_called_once_with(42, None)
+    registrator.set_drift_statistics.assert_called_once_with(mock_sketch_analyzer.return_value.compute_statistics.return_value)
+
+
+def create_multi_dataset_config():
+    """Helper to create the configuration of two datasets, the second one in another storage account"""
+    job_config = Mock()
+    job_config.parameters = {
+        "azml": {"subscriptionId": "test-sub", "resourceGroup": "test-rg", "mlWorkspaceName": "test-workspace"},
+        "storageAccountName": "teststorage",
+        "datasets": [
+            {"containerName": "train", "containerDataPath": "data/train"},
+            {"storageAccountName": "otherstorage", "containerName": "container", "containerDataPath": "data/path"},
+        ],
+    }
+    return job_config
+
+
+def test_load_parameters_of_dataset():
+    """Test that a dataset specification overrides the container and defaults to the storage account of the job"""
+    job_config = create_multi_dataset_config()
+
+    first_params = DatasetRegistrator.load_parameters(job_config, job_config.parameters["datasets"][0])
+    second_params = DatasetRegistrator.load_parameters(job_config, job_config.parameters["datasets"][1])
+
+    assert (first_params["storage_account_name"], first_params["container_name"], first_params["container_path"]) == ("teststorage", "train", "data/train")
+    assert (second_params["storage_account_name"], second_params["container_name"], second_params["container_path"]) == ("otherstorage", "container", "data/path")
+    assert first_params["subscription_id"] == "test-sub"
+
+
+@patch.object(DatasetRegistrator, "publish_new_version")
+@patch.object(DatasetRegistrator, "register")
+@patch("drift.registrating.dataset_registrator.init_ml_flow_utils")
+def test_featurize_registers_datasets_and_publishes_versions(mock_init, mock_register, mock_publish):
+    """Test that all the datasets are registered with shared clients and their versions published by data asset name"""
+    mock_register.side_effect = lambda job_config, spark, parameters, ml_flow_utils: ("20231115120000-v1", parameters["container_name"] == "train")
+
+    DatasetRegistrator().featurize(create_multi_dataset_config(), Mock(), {"vault_name": "vault"})
+
+    mock_init.assert_called_once()
+    assert {call.args[3] for call in mock_register.call_args_list} == {mock_init.return_value}
+    mock_publish.assert_called_once_with(None, True, {
+        "train-data-train-mltable": {"version": "20231115120000-v1", "changed": True},
+        "train-data-train-uri": {"version": "20231115120000-v1", "changed": True},
+        "container-data-path-mltable": {"version": "20231115120000-v1", "changed": False},
+        "container-data-path-uri": {"version": "20231115120000-v1", "changed": False},
+    })
+
+
+@patch("drift.registrating.dataset_registrator.init_ml_flow_utils")
+def test_featurize_rejects_duplicated_datasets(mock_init):
+    """Test that a dataset configured twice is rejected, as both would publish the same data asset names"""
+    job_config = create_multi_dataset_config()
+    job_config.parameters["datasets"].append({"containerName": "train", "containerDataPath": "data/train"})
+
+    with pytest.raises(Exception, match="train-data-train-mltable"):
+        DatasetRegistrator().featurize(job_config, Mock(), {"vault_name": "vault"})
+
+    mock_init.assert_not_called()
+
+
+@patch.object(DatasetRegistrator, "publish_new_version")
+@patch.object(DatasetRegistrator, "register")
+@patch("drift.registrating.dataset_registrator.init_ml_flow_utils")
+def test_featurize_reports_failed_datasets(mock_init, mock_register, mock_publish):
+    """Test that the failed datasets are reported together after registering the other ones"""
+    def register(job_config, spark, parameters, ml_flow_utils):
+        if parameters["container_name"] == "train":
+            raise Exception("registration failure")
+        return "20231115120000-v1", True
+
+    mock_register.side_effect = register
+
+    with pytest.raises(Exception, match="train-data-train-mltable") as error:
+        DatasetRegistrator().featurize(create_multi_dataset_config(), Mock(), {"vault_name": "vault"})
+
+    assert str(error.value.__cause__) == "registration failure"
+    assert mock_register.call_count == 2
+    mock_publish.assert_not_called()
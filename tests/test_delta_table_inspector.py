@@ -0,0 +1,99 @@
+"""Tests for DeltaTableInspector"""
+import os
+from unittest.mock import Mock
+
+import pyarrow as pa
+from deltalake import DeltaTable, write_deltalake
+
+from drift.registrating.delta_table_inspector import DeltaTableInspector
+
+
+def create_inspector():
+    """Helper to create an inspector of a test container"""
+    parameters = {"storage_account_name": "teststorage", "container_name": "container", "container_path": "/data/path/"}
+    sp_config = Mock(tenant_id="tenant", client_id="client", client_secret="secret")
+    return DeltaTableInspector(parameters, sp_config)
+
+
+def test_table_uri_and_credentials():
+    """Test that the table is read from ADLS Gen2 with the service principal"""
+    inspector = create_inspector()
+
+    assert inspector.table_uri == "abfss://container@teststorage.dfs.core.windows.net/data/path"
+    assert inspector.storage_options["azure_client_id"] == "client"
+
+
+def test_latest_commit(tmp_path):
+    """Test that the latest commit version and timestamp are read from the transaction log"""
+    write_deltalake(str(tmp_path), pa.table({"value": [1, 2]}))
+    write_deltalake(str(tmp_path), pa.table({"value": [3]}), mode="append")
+
+    inspector = create_inspector()
+    inspector.table_uri = str(tmp_path)
+    inspector.storage_options = {}
+
+    latest_commit = inspector.get_latest_commit()
+
+    assert latest_commit.version == 1
+    assert latest_commit.timestamp.tzinfo is not None
+
+
+def create_local_inspector(table_path):
+    """Helper to create an inspector of a local Delta table"""
+    inspector = create_inspector()
+    inspector.table_uri = table_path
+    inspector.storage_options = {}
+    return inspector
+
+
+def test_changes_of_appends(tmp_path):
+    """Test that only the files appended since the base version are changes, with the partition columns"""
+    write_deltalake(str(tmp_path), pa.table({"value": [1, 2], "country": ["FR", "ES"]}), partition_by=["country"])
+    write_deltalake(str(tmp_path), pa.table({"value": [3], "country": ["FR"]}), mode="append", partition_by=["country"])
+
+    inspector = create_local_inspector(str(tmp_path))
+    changes = inspector.get_changes(0, 1)
+    full_changes = inspector.get_changes(None, 1)
+
+    assert len(changes.added_files) == 1
+    assert changes.added_files[0].startswith("country=FR/")
+    assert changes.partition_columns == ["country"]
+    assert changes.append_only is True
+    assert len(full_changes.added_files) == 3
+    assert full_changes.base_version is None
+
+
+def test_changes_without_base_version_of_registered_assets(tmp_path):
+    """Test that all the files are changes, not append only, when the registered assets do not record their Delta version"""
+    write_deltalake(str(tmp_path), pa.table({"value": [1, 2]}))
+
+    changes = create_local_inspector(str(tmp_path)).get_changes(None, 0, previously_registered=True)
+
+    assert changes.base_version is None
+    assert len(changes.added_files) == 1
+    assert changes.append_only is False
+
+
+def test_changes_of_overwrite_are_not_append_only(tmp_path):
+    """Test that the changes removing files of the base version are flagged"""
+    write_deltalake(str(tmp_path), pa.table({"value": [1, 2]}))
+    write_deltalake(str(tmp_path), pa.table({"value": [3]}), mode="overwrite")
+
+    changes = create_local_inspector(str(tmp_path)).get_changes(0, 1)
+
+    assert len(changes.added_files) == 1
+    assert changes.append_only is False
+
+
+def test_changes_since_expired_base_version(tmp_path):
+    """Test that all the files are changes when the log of the base version was removed"""
+    write_deltalake(str(tmp_path), pa.table({"value": [1, 2]}))
+    write_deltalake(str(tmp_path), pa.table({"value": [3]}), mode="append")
+    DeltaTable(str(tmp_path)).create_checkpoint()
+    os.remove(os.path.join(str(tmp_path), "_delta_log", "00000000000000000000.json"))
+
+    changes = create_local_inspector(str(tmp_path)).get_changes(0, 1)
+
+    assert changes.base_version is None
+    assert len(changes.added_files) == 2
+    assert changes.append_only is False
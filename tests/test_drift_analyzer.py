@@ -0,0 +1,106 @@
+"""Tests for DriftAnalyzer"""
+import math
+import os
+import shutil
+from unittest.mock import Mock
+
+import pytest
+
+from drift.registrating.drift_analyzer import DriftAnalyzer
+
+requires_java = pytest.mark.skipif(shutil.which("java") is None and "JAVA_HOME" not in os.environ, reason="Spark needs a Java runtime")
+
+
+@pytest.fixture(scope="module")
+def spark():
+    """Create a local spark session"""
+    from pyspark.sql import SparkSession
+
+    spark = SparkSession.builder.master("local[1]").appName("test-drift-analyzer").config("spark.ui.enabled", "false").getOrCreate()
+    yield spark
+    spark.stop()
+
+
+def create_analyzer(spark, bins):
+    """Helper to create an analyzer of a snapshot with 10 values from 1 to 10, 2 null values and 2 categories"""
+    rows = [(float(value), "a" if value <= 5 else "b") for value in range(1, 11)] + [(None, "a"), (None, "b")]
+    data_frame = spark.createDataFrame(rows, "value double, category string")
+
+    # The Delta reader is not needed to test the aggregation of the snapshot
+    analyzer = DriftAnalyzer(Mock(), "abfss://container@account.dfs.core.windows.net/table", bins)
+    analyzer.spark.read.format.return_value.option.return_value.load.return_value = data_frame
+    return analyzer
+
+
+def test_psi_of_identical_distributions_is_zero():
+    """Test that identical distributions do not drift"""
+    assert DriftAnalyzer.compute_psi([0.25, 0.25, 0.5], [0.25, 0.25, 0.5]) == pytest.approx(0.0)
+
+
+def test_psi_grows_with_the_shift():
+    """Test that a larger shift of the distribution gives a larger PSI"""
+    expected = [0.5, 0.5]
+
+    assert DriftAnalyzer.compute_psi(expected, [0.4, 0.6]) < DriftAnalyzer.compute_psi(expected, [0.1, 0.9])
+
+
+def test_histogram_edges_merge_tied_quantiles():
+    """Test that tied quantiles give one edge holding the share of all of them"""
+    edges = DriftAnalyzer.compute_histogram_edges([1.0, 1.0, 2.0], [0.25, 0.5, 0.75])
+
+    assert edges == [(1.0, 0.5), (2.0, 0.75)]
+    assert DriftAnalyzer.expected_proportions(edges) == [0.5, 0.25, 0.25]
+
+
+def test_histogram_edges_without_previous_quantiles():
+    """Test that no histogram is computed for the first registration"""
+    assert DriftAnalyzer.compute_histogram_edges(None, [0.5]) is None
+
+
+def test_drift_score_is_highest_psi():
+    """Test that the drift score is the highest PSI of the columns"""
+    statistics = {"columns": {"a": {"psi": 0.05}, "b": {"psi": 0.3}, "c": {"null_rate": 0.0}}}
+
+    assert DriftAnalyzer.get_drift_score(statistics) == 0.3
+    assert DriftAnalyzer.get_drift_score({"columns": {"c": {"null_rate": 0.0}}}) is None
+
+
+@requires_java
+def test_statistics_of_first_snapshot(spark):
+    """Test the counts, null rates, distinct counts and quantiles of a snapshot without previous statistics"""
+    analyzer = create_analyzer(spark, bins=2)
+
+    statistics = analyzer.compute_statistics(42, None)
+
+    analyzer.spark.read.format.return_value.option.assert_called_once_with("versionAsOf", 42)
+    assert statistics["row_count"] == 12
+    assert statistics["columns"]["value"]["null_rate"] == pytest.approx(2 / 12)
+    assert statistics["columns"]["value"]["distinct"] == 10
+    assert statistics["columns"]["value"]["quantiles"] == [5.0]
+    assert statistics["columns"]["category"] == {"null_rate": 0.0, "distinct": 2}
+    assert statistics["drift_score"] is None
+
+
+@requires_java
+def test_statistics_drift_from_previous_quantiles(spark):
+    """Test that the histogram over the previous quantiles gives the PSI of the column and the drift score"""
+    analyzer = create_analyzer(spark, bins=2)
+
+    statistics = analyzer.compute_statistics(43, {"columns": {"value": {"quantiles": [3.0]}}})
+
+    # 3 of the 10 non null values are below the previous median
+    expected_psi = (0.3 - 0.5) * math.log(0.3 / 0.5) + (0.7 - 0.5) * math.log(0.7 / 0.5)
+    assert statistics["columns"]["value"]["psi"] == pytest.approx(expected_psi)
+    assert statistics["drift_score"] == pytest.approx(expected_psi)
+
+
+@requires_java
+def test_histogram_aggregations_count_values_per_bin(spark):
+    """Test that each value is counted in the bin of its upper edge, the null values in none"""
+    from pyspark.sql import functions as F
+
+    data_frame = create_analyzer(spark, bins=2).spark.read.format.return_value.option.return_value.load.return_value
+
+    result = data_frame.agg(*DriftAnalyzer.histogram_aggregations(F.col("value"), [3.0, 7.0], "bin")).collect()[0]
+
+    assert [result["bin0"], result["bin1"], result["bin2"]] == [3, 4, 3]
@@ -0,0 +1,49 @@
+"""Import time regression tests, measured with python -X importtime in a fresh interpreter"""
+import subprocess
+import sys
+
+import pytest
+
+# Budget of the cumulative import time of the entry point, in microseconds
+ENTRY_POINT_BUDGET_US = 500_000
+
+
+def import_time(module_name: str) -> dict[str, int]:
+    """Import a module in a fresh interpreter and return the cumulative import time in microseconds of each imported module"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module_name}"], capture_output=True, text=True, check=True)
+
+    cumulative_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, imported_module = line[len("import time:"):].split("|")
+        cumulative_times[imported_module.strip()] = int(cumulative)
+
+    return cumulative_times
+
+
+def test_entry_point_within_budget():
+    """Test that the entry point starts without importing the SDKs"""
+    cumulative_times = import_time("drift.__main__")
+
+    assert cumulative_times["drift.__main__"] < ENTRY_POINT_BUDGET_US
+    for heavy_module in ("azure.identity", "databricks.sdk", "pydataio.pipeline", "pyspark", "mltable"):
+        assert heavy_module not in cumulative_times
+
+
+@pytest.mark.parametrize("module_name", ["drift.retraining.model_retrainer", "drift.retraining.async_model_retrainer"])
+def test_retrainer_does_not_import_registration_dependencies(module_name):
+    """Test that the retraining transformers do not import the dependencies of the registration"""
+    cumulative_times = import_time(module_name)
+
+    for registration_module in ("mltable", "deltalake", "drift.registrating.data_asset_registrator"):
+        assert registration_module not in cumulative_times
+
+
+def test_registrator_imports_drift_engine_on_demand():
+    """Test that the registration transformer imports the sketch drift engine only when it is configured"""
+    cumulative_times = import_time("drift.registrating.dataset_registrator")
+
+    assert "mltable" not in cumulative_times
+    assert "drift.registrating.sketch_drift_analyzer" not in cumulative_times
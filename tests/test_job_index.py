@@ -0,0 +1,52 @@
+"""Tests for JobIndex"""
+from datetime import datetime, timezone
+
+from drift.retraining.job_index import JobIndex
+
+
+def test_newest_job_per_group(tmp_path):
+    """Test that the newest job of each group is looked up from the index"""
+    with JobIndex(str(tmp_path / "index.sqlite"), "scope") as job_index:
+        job_index.add_job("modela", 20231115120000, "job-a1", {"training_data": "train:1"}, None)
+        job_index.add_job("modela", 20231116120000, "job-a2", {"training_data": "train:2"}, None)
+        job_index.add_job("modelb", 20231114120000, "job-b1", {"training_data": "train:1"}, None)
+
+        assert job_index.get_newest_jobs() == [("modela", 20231116120000, "job-a2"), ("modelb", 20231114120000, "job-b1")]
+
+
+def test_index_is_persisted_with_watermark(tmp_path):
+    """Test that the jobs and the watermark are kept between runs"""
+    index_path = str(tmp_path / "index" / "index.sqlite")
+    watermark = datetime(2023, 11, 15, 12, 0, tzinfo=timezone.utc)
+
+    with JobIndex(index_path, "scope") as job_index:
+        job_index.add_job("modela", 20231115120000, "job-a1", {}, watermark)
+        job_index.set_watermark(watermark)
+
+    with JobIndex(index_path, "scope") as job_index:
+        assert job_index.get_watermark() == watermark
+        assert job_index.get_newest_jobs() == [("modela", 20231115120000, "job-a1")]
+
+
+def test_index_is_reset_when_scope_changes(tmp_path):
+    """Test that the index is rebuilt when the retraining scope changes"""
+    index_path = str(tmp_path / "index.sqlite")
+
+    with JobIndex(index_path, "scope") as job_index:
+        job_index.add_job("modela", 20231115120000, "job-a1", {}, None)
+        job_index.set_watermark(datetime(2023, 11, 15, 12, 0, tzinfo=timezone.utc))
+
+    with JobIndex(index_path, "other-scope") as job_index:
+        assert job_index.get_watermark() is None
+        assert job_index.get_newest_jobs() == []
+
+
+def test_durations_ordered_by_creation_date(tmp_path):
+    """Test that the durations are returned from the oldest to the newest job, whatever the order they were added in"""
+    with JobIndex(str(tmp_path / "index.sqlite"), "scope") as job_index:
+        for job_name, day, duration in [("job-3", 17, 30.0), ("job-2", 16, 20.0), ("job-1", 15, 10.0)]:
+            job_index.add_job("modela", 20231100000000 + day * 1000000, job_name, {}, datetime(2023, 11, day, tzinfo=timezone.utc))
+            job_index.add_duration("modela", job_name, duration)
+
+        assert [duration for _, duration, _ in job_index.get_durations()] == [10.0, 20.0, 30.0]
+        assert job_index.get_durations()[0][2] == datetime(2023, 11, 15, tzinfo=timezone.utc)
@@ -0,0 +1,85 @@
+"""Tests for MLTableSpecBuilder"""
+import os
+from unittest.mock import patch
+
+from drift.registrating.delta_table_inspector import DeltaChanges
+from drift.registrating.mltable_spec_builder import MLTableSpecBuilder
+
+DATASTORE_PATH = "azureml://datastores/container/paths/data/path"
+
+
+def save_spec(spec_path):
+    """Helper to save a fake MLTable spec"""
+    os.makedirs(spec_path)
+    with open(os.path.join(spec_path, "MLTable"), "w", encoding="utf-8") as spec_file:
+        spec_file.write("type: mltable\n")
+
+
+@patch("mltable.from_delta_lake")
+def test_build_in_removed_temporary_directory(mock_from_delta_lake, tmp_path):
+    """Test that the spec is saved in a temporary directory removed once registered"""
+    mock_from_delta_lake.return_value.save.side_effect = save_spec
+    builder = MLTableSpecBuilder(str(tmp_path))
+
+    with builder.build(DATASTORE_PATH, 42, "container-data-path-mltable") as spec_path:
+        assert os.path.basename(spec_path) == "container-data-path-mltable"
+        assert os.path.dirname(os.path.dirname(spec_path)) == str(tmp_path)
+        assert os.path.exists(os.path.join(spec_path, "MLTable"))
+
+    mock_from_delta_lake.assert_called_once_with(DATASTORE_PATH, version_as_of=42)
+    assert not os.path.exists(spec_path)
+    assert os.listdir(tmp_path) == []
+
+
+@patch("mltable.from_delta_lake")
+def test_build_reuses_uploaded_spec(mock_from_delta_lake, tmp_path):
+    """Test that an uploaded spec is reused for the same Delta version only"""
+    mock_from_delta_lake.return_value.save.side_effect = save_spec
+    builder = MLTableSpecBuilder(str(tmp_path))
+    builder.record_upload(DATASTORE_PATH, 42, "azureml://datastores/workspaceblobstore/paths/LocalUpload/abc/container-data-path-mltable/")
+
+    with builder.build(DATASTORE_PATH, 42, "container-data-path-mltable") as spec_path:
+        assert spec_path == "azureml://datastores/workspaceblobstore/paths/LocalUpload/abc/container-data-path-mltable/"
+
+    mock_from_delta_lake.assert_not_called()
+
+    with builder.build(DATASTORE_PATH, 43, "container-data-path-mltable"):
+        pass
+
+    mock_from_delta_lake.assert_called_once_with(DATASTORE_PATH, version_as_of=43)
+
+
+def test_record_upload_ignores_local_paths(tmp_path):
+    """Test that only the paths uploaded to the workspace are recorded"""
+    builder = MLTableSpecBuilder(str(tmp_path))
+
+    builder.record_upload(DATASTORE_PATH, 42, "./container-data-path-mltable")
+    builder.record_upload(DATASTORE_PATH, 43, None)
+
+    assert builder.uploaded_specs == {}
+
+
+@patch("mltable.from_parquet_files")
+def test_build_incremental_of_partitioned_files(mock_from_parquet_files, tmp_path):
+    """Test that the incremental spec reads the added files with the partition values of their directories"""
+    builder = MLTableSpecBuilder(str(tmp_path))
+    changes = DeltaChanges(41, 42, ["country=FR/part-1.parquet"], ["country"], True)
+
+    with builder.build_incremental(DATASTORE_PATH + "/", changes, "container-data-path-delta-mltable"):
+        pass
+
+    mock_from_parquet_files.assert_called_once_with([{"file": f"{DATASTORE_PATH}/country=FR/part-1.parquet"}])
+    table = mock_from_parquet_files.return_value
+    table.extract_columns_from_partition_format.assert_called_once_with("/country={country}/{delta_file_name}")
+    table.extract_columns_from_partition_format.return_value.drop_columns.assert_called_once_with(["delta_file_name"])
+    table.extract_columns_from_partition_format.return_value.drop_columns.return_value.save.assert_called_once()
+
+
+def test_incremental_uploads_are_kept_apart(tmp_path):
+    """Test that the upload of an incremental spec is not reused for the full snapshot"""
+    builder = MLTableSpecBuilder(str(tmp_path))
+
+    builder.record_upload(DATASTORE_PATH, 42, "azureml://datastores/workspaceblobstore/paths/LocalUpload/abc/delta/", base_version=41)
+
+    assert builder.get_uploaded_path(DATASTORE_PATH, 42) is None
+    assert builder.get_uploaded_path(DATASTORE_PATH, 42, 41) == "azureml://datastores/workspaceblobstore/paths/LocalUpload/abc/delta/"
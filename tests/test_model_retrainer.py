@@ -1,10 +1,17 @@
 """Tests for ModelRetrainer"""
-from unittest.mock import Mock
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
 
 import pytest
+from azure.core.exceptions import HttpResponseError
 
+from drift.registrating.dataset_registrator import DatasetRegistrator
 from drift.retraining.model_retrainer import ModelRetrainer
 from drift.retraining.job_group import JobGroup
+from drift.retraining.submission_journal import SubmissionJournal
+from drift.retraining.template_cache import CachedTemplate, TemplateCache
 from tests.conftest import create_mock_pipeline_job
 
 
@@ -19,12 +26,12 @@ def model_retrainer(mock_job_config):
 def test_job_name_pattern_with_prefix(model_retrainer):
     """Test job name pattern generation with model prefix"""
     model_retrainer.compute_jobname_pattern({"model_name_prefix": "modelA,modelB"})
-    assert model_retrainer.job_name_pattern == r"^(modelA|modelB)_[0-9]{14}_.*$"
+    assert model_retrainer.job_name_pattern == r"^(?P<group_name>modelA|modelB)_(?P<training_timestamp>[0-9]{14})_.*$"
 
 
 def test_is_in_scope_filters_correctly(model_retrainer):
     """Test job filtering by name pattern and data assets"""
-    model_retrainer.job_name_pattern = r"^model_[0-9]{14}_.*$"
+    model_retrainer.compute_jobname_pattern({"model_name_prefix": "model"})
     
     # Should accept: matching name and assets
     valid_job = create_mock_pipeline_job("model_20231115120000_abc")
@@ -42,7 +49,7 @@ def test_is_in_scope_filters_correctly(model_retrainer):
 
 def test_retrieve_jobs_picks_newest_per_group(model_retrainer, mock_ml_client):
     """Test that only the newest job per group is selected for retraining"""
-    model_retrainer.job_name_pattern = r"^model_[0-9]{14}_.*$"
+    model_retrainer.compute_jobname_pattern({})
     
     old_job = create_mock_pipeline_job("model_20231115120000_abc")
     new_job = create_mock_pipeline_job("model_20231115130000_def")
@@ -52,12 +59,31 @@ def test_retrieve_jobs_picks_newest_per_group(model_retrainer, mock_ml_client):
     result = model_retrainer.retrieve_jobs_to_retrain(mock_ml_client)
     
     assert len(result) == 1
-    assert result[0].training_timestamp == "20231115130000"
+    assert result[0].training_timestamp == 20231115130000
+    mock_ml_client.jobs.get.assert_called_once_with(new_job.name)
+
+
+def test_retrieve_jobs_keeps_durations_of_newest_jobs(model_retrainer, mock_ml_client):
+    """Test that the training history keeps the durations of the newest jobs when they are listed newest first"""
+    model_retrainer.compute_jobname_pattern({})
+    model_retrainer.training_history.max_durations = 2
+
+    jobs = []
+    for day, minutes in [(17, 30), (16, 20), (15, 10)]:
+        job = create_mock_pipeline_job(f"model_202311{day}120000_abc", name=f"job-{day}", status="Completed")
+        created_at = datetime(2023, 11, day, 12, 0, tzinfo=timezone.utc)
+        job.creation_context = Mock(created_at=created_at, last_modified_at=created_at + timedelta(minutes=minutes))
+        jobs.append(job)
+    mock_ml_client.jobs.list.return_value = jobs
+
+    model_retrainer.retrieve_jobs_to_retrain(mock_ml_client)
+
+    assert model_retrainer.training_history.durations == {"model": [1200, 1800]}
 
 
 def test_retrieve_jobs_raises_when_none_found(model_retrainer, mock_ml_client):
     """Test error handling when no jobs match criteria"""
-    model_retrainer.job_name_pattern = r"^model_[0-9]{14}_.*$"
+    model_retrainer.compute_jobname_pattern({})
     mock_ml_client.jobs.list.return_value = []
     
     with pytest.raises(Exception, match="No jobs in scope to retrain"):
@@ -88,3 +114,274 @@ def test_check_success_raises_on_failures(model_retrainer):
     
     with pytest.raises(Exception, match="Some jobs failed"):
         model_retrainer.check_success([create_mock_pipeline_job("job")])
+
+
+def test_retrieve_jobs_stops_listing_at_cutoff(model_retrainer, mock_ml_client):
+    """Test that the listing stops at the first job older than the configured cutoff"""
+    model_retrainer.compute_jobname_pattern({})
+    model_retrainer.jobConfig.parameters["jobsMaxAgeDays"] = "7"
+
+    recent_job = create_mock_pipeline_job("model_20231115130000_def")
+    recent_job.creation_context = Mock(created_at=datetime.now(timezone.utc) - timedelta(days=1))
+    old_job = create_mock_pipeline_job("model_20231115120000_abc")
+    old_job.creation_context = Mock(created_at=datetime.now(timezone.utc) - timedelta(days=30))
+
+    def paged_jobs():
+        yield recent_job
+        yield old_job
+        raise AssertionError("Listing should have stopped at the cutoff")
+
+    mock_ml_client.jobs.list.return_value = paged_jobs()
+    mock_ml_client.jobs.get.side_effect = lambda name: recent_job if name == recent_job.name else None
+
+    result = model_retrainer.retrieve_jobs_to_retrain(mock_ml_client)
+
+    assert len(result) == 1
+    assert result[0].job is recent_job
+
+
+def test_retrieve_jobs_from_index_only_lists_new_jobs(model_retrainer, mock_ml_client, tmp_path):
+    """Test that the second run with a job index only lists the jobs created after the watermark"""
+    model_retrainer.compute_jobname_pattern({})
+    model_retrainer.jobConfig.parameters["jobIndexPath"] = str(tmp_path / "index.sqlite")
+
+    first_job = create_mock_pipeline_job("model_20231115120000_abc", name="first")
+    first_job.creation_context = Mock(created_at=datetime(2023, 11, 15, 12, 0, tzinfo=timezone.utc))
+    mock_ml_client.jobs.list.return_value = [first_job]
+    mock_ml_client.jobs.get.side_effect = lambda name: create_mock_pipeline_job("model_20231115120000_abc", name=name)
+
+    result = model_retrainer.retrieve_jobs_to_retrain(mock_ml_client)
+    assert result[0].job.name == "first"
+
+    second_job = create_mock_pipeline_job("model_20231116120000_def", name="second")
+    second_job.creation_context = Mock(created_at=datetime(2023, 11, 16, 12, 0, tzinfo=timezone.utc))
+    older_job = create_mock_pipeline_job("model_20231114120000_ghi", name="older")
+    older_job.creation_context = Mock(created_at=datetime(2023, 11, 14, 12, 0, tzinfo=timezone.utc))
+
+    def paged_jobs():
+        yield second_job
+        yield first_job
+        yield older_job
+        raise AssertionError("Listing should have stopped at the watermark")
+
+    mock_ml_client.jobs.list.return_value = paged_jobs()
+
+    result = model_retrainer.retrieve_jobs_to_retrain(mock_ml_client)
+
+    assert len(result) == 1
+    assert result[0].job.name == "second"
+    assert result[0].training_timestamp == 20231116120000
+
+
+def test_retrain_models_in_parallel_keeps_order(model_retrainer, mock_ml_client):
+    """Test that parallel submission returns the created jobs in the order of the groups"""
+    model_retrainer.jobConfig.parameters["submissionMaxWorkers"] = "4"
+    job_groups = [JobGroup(f"model{index}", 20231115120000, create_mock_pipeline_job(f"model{index}_20231115120000_abc")) for index in range(8)]
+
+    mock_ml_client.jobs.create_or_update.side_effect = lambda job: create_mock_pipeline_job(job.display_name)
+
+    result = model_retrainer.retrain_models(mock_ml_client, job_groups, {"data_asset_version": "v2"})
+
+    assert [job.display_name.split("_")[0] for job in result] == [f"model{index}" for index in range(8)]
+
+
+def test_retrain_models_tags_jobs_with_run_id(model_retrainer, mock_ml_client):
+    """Test that the submitted jobs carry the run id as tag and property"""
+    job_template = create_mock_pipeline_job("model_20231115120000_abc")
+    mock_ml_client.jobs.create_or_update.side_effect = lambda job: job
+
+    result = model_retrainer.retrain_models(mock_ml_client, [JobGroup("model", 20231115120000, job_template)], {"data_asset_version": "v2"})
+
+    assert result[0].properties["drift_run_id"] == result[0].tags["drift_run_id"]
+
+
+@patch("drift.tools.throttling.time.sleep")
+def test_retried_submission_does_not_create_another_job(mock_sleep, model_retrainer, mock_ml_client):
+    """Test that a submission accepted despite an error is not created again under another name when retried"""
+    job_template = create_mock_pipeline_job("model_20231115120000_abc")
+    error = HttpResponseError(message="unavailable", response=Mock(status_code=503, headers={}))
+    error.status_code = 503
+    submitted_names = []
+
+    def create_or_update(job):
+        submitted_names.append(job.name)
+        raise error
+
+    mock_ml_client.jobs.create_or_update.side_effect = create_or_update
+    mock_ml_client.jobs.get.side_effect = lambda name: create_mock_pipeline_job("model_20231115130000_new", name=name)
+
+    result = model_retrainer.retrain_models(mock_ml_client, [JobGroup("model", 20231115120000, job_template)], {"data_asset_version": "v2"})
+
+    assert len(submitted_names) == 1
+    mock_ml_client.jobs.get.assert_called_once_with(submitted_names[0])
+    assert result[0].name == submitted_names[0]
+
+
+def test_retrain_models_reports_failed_submissions_together(model_retrainer, mock_ml_client, tmp_path):
+    """Test that a failed submission neither stops the other ones nor loses the jobs created in other threads"""
+    model_retrainer.jobConfig.parameters["submissionMaxWorkers"] = "4"
+    model_retrainer.submission_journal = SubmissionJournal(str(tmp_path), "run")
+    job_groups = [JobGroup(f"model{index}", 20231115120000, create_mock_pipeline_job(f"model{index}_20231115120000_abc")) for index in range(3)]
+
+    def create_or_update(job):
+        if job.display_name.startswith("model1_"):
+            raise Exception("submission failure")
+        return create_mock_pipeline_job(job.display_name, name=job.name)
+
+    mock_ml_client.jobs.create_or_update.side_effect = create_or_update
+
+    with pytest.raises(Exception, match="model1: submission failure") as raised:
+        model_retrainer.retrain_models(mock_ml_client, job_groups, {"data_asset_version": "v2"})
+
+    assert str(raised.value.__cause__) == "submission failure"
+    assert mock_ml_client.jobs.create_or_update.call_count == 3
+    assert model_retrainer.submission_journal.get_submitted_job("model0") is not None
+    assert model_retrainer.submission_journal.get_submitted_job("model2") is not None
+
+
+def test_featurize_skips_unchanged_data(mock_job_config):
+    """Test that no job is retrained when the data asset did not change"""
+    retrainer = ModelRetrainer()
+    retrainer.retrieve_jobs_to_retrain = Mock()
+
+    retrainer.featurize(mock_job_config, Mock(), {"data_asset_version": "v1", "data_asset_changed": "false", "vault_name": "vault"})
+
+    retrainer.retrieve_jobs_to_retrain.assert_not_called()
+
+
+def test_filter_drifted_groups(model_retrainer, mock_ml_client):
+    """Test that the groups are skipped when their data assets drifted below the threshold"""
+    model_retrainer.jobConfig.parameters["driftThreshold"] = "0.1"
+    model_retrainer.jobConfig.parameters["dataAssets"] = [
+        {"name": "training_data", "value": "azureml:train-mltable"},
+        {"name": "validation_data", "value": "azureml:val-mltable"},
+    ]
+    job_groups = [JobGroup("model", 20231115120000, create_mock_pipeline_job("model_20231115120000_abc"))]
+
+    data_asset_versions = model_retrainer.get_data_asset_versions({"data_asset_version": "v2"})
+
+    mock_ml_client.data.get.return_value = Mock(tags={"drift_score": "0.05"})
+    assert model_retrainer.filter_drifted_groups(mock_ml_client, job_groups, data_asset_versions) == []
+
+    mock_ml_client.data.get.side_effect = [Mock(tags={"drift_score": "0.05"}), Mock(tags={"drift_score": "0.3"})]
+    assert model_retrainer.filter_drifted_groups(mock_ml_client, job_groups, data_asset_versions) == job_groups
+
+
+def test_retrain_models_with_version_per_data_asset(model_retrainer, mock_ml_client):
+    """Test that each data asset is updated to its own version"""
+    job_template = create_mock_pipeline_job("model_20231115120000_abc")
+    mock_ml_client.jobs.create_or_update.side_effect = lambda job: job
+    data_asset_versions = '{"training_data": "v3", "validation_data": {"version": "v2", "changed": false}}'
+
+    result = model_retrainer.retrain_models(mock_ml_client, [JobGroup("model", 20231115120000, job_template)], {"data_asset_versions": data_asset_versions})
+
+    assert result[0].inputs["training_data"].path == "azureml://datastores/data/paths/train:v3"
+    assert result[0].inputs["validation_data"].path == "azureml://datastores/data/paths/val:v2"
+
+
+def test_get_data_asset_versions_published_by_registrator(model_retrainer, caplog):
+    """Test that the versions published by the dataset registrator are resolved through the values of the data assets"""
+    model_retrainer.jobConfig.parameters["dataAssets"] = [
+        {"name": "training_data", "value": "azureml:train-data-train-mltable"},
+        {"name": "raw_data", "value": "azureml:train-data-train-uri@latest"},
+        {"name": "validation_data", "value": "azureml:val-data-val-mltable:3"},
+        {"name": "reference_data", "value": "azureml:reference-mltable"},
+    ]
+    data_asset_versions = {
+        **DatasetRegistrator.compute_data_asset_versions({"container_name": "train", "container_path": "data/train"}, "20231115120000-v2", True),
+        **DatasetRegistrator.compute_data_asset_versions({"container_name": "val", "container_path": "data/val"}, "20231115120000-v1", False),
+    }
+
+    with caplog.at_level(logging.ERROR):
+        result = model_retrainer.get_data_asset_versions({"data_asset_versions": json.dumps(data_asset_versions), "data_asset_version": ""})
+
+    assert (result["training_data"].version, result["training_data"].changed) == ("20231115120000-v2", True)
+    assert (result["raw_data"].version, result["raw_data"].changed) == ("20231115120000-v2", True)
+    assert (result["validation_data"].version, result["validation_data"].changed) == ("20231115120000-v1", False)
+    assert result["reference_data"].version is None
+    assert "reference_data" in caplog.text
+
+
+def test_filter_changed_groups(model_retrainer):
+    """Test that the groups only referencing unchanged data assets are skipped"""
+    model_retrainer.jobConfig.parameters["dataAssetsMatch"] = "any"
+    model_retrainer.compute_jobname_pattern({})
+    training_job = create_mock_pipeline_job("train_20231115120000_abc")
+    del training_job.inputs["validation_data"]
+    validation_job = create_mock_pipeline_job("val_20231115120000_abc")
+    del validation_job.inputs["training_data"]
+    job_groups = [JobGroup("train", 20231115120000, training_job), JobGroup("val", 20231115120000, validation_job)]
+    data_asset_versions = model_retrainer.get_data_asset_versions({"data_asset_versions": {"training_data": {"version": "v1", "changed": False}, "validation_data": "v2"}})
+
+    assert model_retrainer.is_in_scope(training_job)
+    assert model_retrainer.filter_changed_groups(job_groups, data_asset_versions) == [job_groups[1]]
+
+
+def test_data_assets_match_all_by_default(model_retrainer):
+    """Test that a job referencing only some of the data assets is out of scope by default"""
+    model_retrainer.compute_jobname_pattern({})
+    job = create_mock_pipeline_job("model_20231115120000_abc")
+    del job.inputs["validation_data"]
+
+    assert not model_retrainer.is_in_scope(job)
+
+
+def test_cancel_superseded_jobs(model_retrainer, mock_ml_client):
+    """Test that only the in-flight jobs of the retrained groups on older data are cancelled"""
+    model_retrainer.compute_jobname_pattern({})
+    older_job = create_mock_pipeline_job("model_20231115120000_abc", name="older")
+    current_job = create_mock_pipeline_job("model_20231115130000_abc", train_path="azureml://datastores/data/paths/train:v2", val_path="azureml://datastores/data/paths/val:v2", name="current")
+    completed_job = create_mock_pipeline_job("model_20231115110000_abc", name="completed", status="Completed")
+    other_group_job = create_mock_pipeline_job("other_20231115120000_abc", name="other")
+    mock_ml_client.jobs.list.return_value = [current_job, older_job, None, completed_job, other_group_job]
+    job_groups = [JobGroup("model", 20231115120000, older_job)]
+
+    model_retrainer.cancel_superseded_jobs(mock_ml_client, job_groups, model_retrainer.get_data_asset_versions({"data_asset_version": "v2"}))
+
+    mock_ml_client.jobs.list.assert_called_once_with(tag="drift_run_id")
+    mock_ml_client.jobs.begin_cancel.assert_called_once_with("older")
+
+
+def test_retried_run_resumes_journaled_jobs(model_retrainer, mock_ml_client, tmp_path):
+    """Test that a retried run only submits the groups without live journaled job"""
+    data_asset_versions = model_retrainer.get_data_asset_versions({"data_asset_version": "v2"})
+    journal_key = ModelRetrainer.compute_journal_key("123", data_asset_versions)
+    journal = SubmissionJournal(str(tmp_path), journal_key)
+    journal.set_drift_run_id("previous-run")
+    journal.record("running", "running-job")
+    journal.record("failed", "failed-job")
+
+    model_retrainer.submission_journal = SubmissionJournal(str(tmp_path), journal_key)
+    mock_ml_client.jobs.get.side_effect = lambda name: create_mock_pipeline_job(name, name=name, status="Running" if name == "running-job" else "Failed")
+    job_groups = [JobGroup(group_name, 20231115120000, create_mock_pipeline_job(f"{group_name}_20231115120000_abc")) for group_name in ["running", "failed", "new"]]
+
+    remaining_jobs, resumed_jobs = model_retrainer.resume_submissions(mock_ml_client, job_groups)
+
+    assert [group_job.group_name for group_job in remaining_jobs] == ["failed", "new"]
+    assert [job.name for _, job in resumed_jobs] == ["running-job"]
+    assert model_retrainer.get_run_id() == "previous-run"
+
+
+def test_retrieve_jobs_from_template_cache(model_retrainer, mock_ml_client, tmp_path):
+    """Test that the second run loads the templates and only lists the jobs created since the first run"""
+    model_retrainer.compute_jobname_pattern({})
+    model_retrainer.jobConfig.parameters["templateCachePath"] = str(tmp_path)
+    cached_job = create_mock_pipeline_job("model_20231115120000_abc", name="first")
+    mock_ml_client.jobs.list.return_value = [cached_job]
+    mock_ml_client.jobs.get.return_value = cached_job
+
+    with patch.object(TemplateCache, "save") as mock_save:
+        model_retrainer.retrieve_jobs_to_retrain(mock_ml_client)
+        mock_save.assert_called_once()
+
+    template_cache = TemplateCache(str(tmp_path), model_retrainer.compute_scope_signature())
+    template_cache.listed_at = datetime.now(timezone.utc)
+    template_cache.templates = {"model": CachedTemplate("model", 20231115120000, "first", "model.yaml")}
+    mock_ml_client.jobs.list.return_value = []
+    mock_ml_client.jobs.get.reset_mock()
+
+    with patch("drift.retraining.model_retrainer.TemplateCache", return_value=template_cache), patch.object(template_cache, "load_job", return_value=cached_job), patch.object(template_cache, "save"):
+        result = model_retrainer.retrieve_jobs_to_retrain(mock_ml_client)
+
+    assert result[0].job is cached_job
+    mock_ml_client.jobs.get.assert_not_called()
@@ -0,0 +1,19 @@
+"""Tests for PollScheduler"""
+from drift.retraining.poll_scheduler import PollScheduler
+
+
+def test_unknown_group_uses_min_delay():
+    """Test that jobs without history are checked every minimum delay"""
+    scheduler = PollScheduler(10, 600)
+
+    assert scheduler.next_check_delay("model", 0) == 10
+
+
+def test_delay_shrinks_near_expected_end():
+    """Test that jobs are checked rarely early and often near the expected end"""
+    scheduler = PollScheduler(10, 600, {"model": 1800})
+
+    assert scheduler.next_check_delay("model", 0) == 600
+    assert scheduler.next_check_delay("model", 1500) == 150
+    assert scheduler.next_check_delay("model", 1790) == 10
+    assert scheduler.next_check_delay("model", 2000) == 10
@@ -0,0 +1,61 @@
+"""Tests for RetrainingScheduler"""
+from unittest.mock import Mock
+
+from drift.retraining.job_group import JobGroup
+from drift.retraining.retraining_scheduler import RetrainingScheduler
+from tests.conftest import create_mock_pipeline_job
+
+
+def create_group_job(group_name, compute="cluster"):
+    """Helper to create a job to retrain on a compute target"""
+    job = create_mock_pipeline_job(f"{group_name}_20231115120000_abc")
+    job.compute = compute
+    return JobGroup(group_name, 20231115120000, job)
+
+
+def create_scheduler(mock_job_config, expected_durations=None):
+    """Helper to create a scheduler submitting jobs named after their group"""
+    submit = Mock(side_effect=lambda group_jobs: [create_mock_pipeline_job(group_job.job.display_name, name=f"{group_job.group_name}-job") for group_job in group_jobs])
+    return RetrainingScheduler(mock_job_config, expected_durations or {}, submit)
+
+
+def test_submits_everything_without_cap(mock_job_config):
+    """Test that all the groups are submitted at once without concurrency cap"""
+    scheduler = create_scheduler(mock_job_config)
+    scheduler.schedule([create_group_job("a"), create_group_job("b")])
+
+    assert [job.name for job in scheduler.submit_next()] == ["a-job", "b-job"]
+    assert not scheduler.has_queued_jobs()
+
+
+def test_caps_running_jobs_per_compute(mock_job_config):
+    """Test that the queued groups are released as the running jobs of their compute finish"""
+    mock_job_config.parameters["maxRunningPerCompute"] = "1"
+    scheduler = create_scheduler(mock_job_config)
+    scheduler.schedule([create_group_job("a"), create_group_job("b"), create_group_job("c", compute="other")])
+
+    assert [job.name for job in scheduler.submit_next()] == ["a-job", "c-job"]
+    assert scheduler.release({"a-job"}) == []
+    assert [job.name for job in scheduler.release({"c-job"})] == ["b-job"]
+
+
+def test_orders_by_priority_then_longest_first(mock_job_config):
+    """Test that the groups are ordered by priority, then by expected duration"""
+    mock_job_config.parameters["retrainingPriorities"] = {"c": "10"}
+    mock_job_config.parameters["longestFirst"] = "true"
+    scheduler = create_scheduler(mock_job_config, {"a": 60, "b": 600})
+    scheduler.schedule([create_group_job("a"), create_group_job("b"), create_group_job("c")])
+
+    assert [group_job.group_name for group_job in scheduler.queue] == ["c", "b", "a"]
+
+
+def test_cancel_queued(mock_job_config):
+    """Test that the queued groups are dropped"""
+    mock_job_config.parameters["maxRunningPerCompute"] = "1"
+    scheduler = create_scheduler(mock_job_config)
+    scheduler.schedule([create_group_job("a"), create_group_job("b")])
+    scheduler.submit_next()
+
+    scheduler.cancel_queued("another job failed")
+
+    assert scheduler.release(set()) == []
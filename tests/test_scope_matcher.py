@@ -0,0 +1,51 @@
+"""Tests for ScopeMatcher"""
+import pytest
+
+from drift.retraining.scope_matcher import ScopeMatcher
+from tests.conftest import create_mock_pipeline_job
+
+JOB_NAME_PATTERN = r"^(?P<group_name>[a-z,0-9]{2,})_(?P<training_timestamp>[0-9]{14})_.*$"
+
+DATA_ASSETS = [
+    {"name": "training_data", "value": "azureml://datastores/data/paths/train"},
+    {"name": "validation_data", "value": "azureml://datastores/data/paths/val"},
+]
+
+
+def test_match_parses_display_name():
+    """Test that a job in the scope is summarized from the named groups of the display name"""
+    job_summary = ScopeMatcher(JOB_NAME_PATTERN, DATA_ASSETS).match(create_mock_pipeline_job("model1_20231115120000_abc", name="job1"))
+
+    assert job_summary.group_name == "model1"
+    assert job_summary.training_timestamp == 20231115120000
+    assert job_summary.name == "job1"
+
+
+def test_match_projects_job_on_summary():
+    """Test that a job in the scope is projected on its name, group, integer timestamp and input paths only"""
+    job_summary = ScopeMatcher(JOB_NAME_PATTERN, DATA_ASSETS).match(create_mock_pipeline_job("model_20231115120000_abc", name="job1"))
+
+    assert job_summary.input_paths == {"training_data": "azureml://datastores/data/paths/train:v1", "validation_data": "azureml://datastores/data/paths/val:v1"}
+    assert isinstance(job_summary.training_timestamp, int)
+    assert not hasattr(job_summary, "__dict__")
+
+
+def test_match_rejects_out_of_scope_jobs():
+    """Test that the display name and all the data assets must match"""
+    scope_matcher = ScopeMatcher(JOB_NAME_PATTERN, DATA_ASSETS)
+
+    assert scope_matcher.match(create_mock_pipeline_job("Model_20231115120000_abc")) is None
+    assert scope_matcher.match(create_mock_pipeline_job("model_20231115120000_abc", val_path="azureml://other/val:v1")) is None
+
+
+def test_match_any_data_asset():
+    """Test that a job referencing some of the data assets is in the scope with match_any"""
+    job = create_mock_pipeline_job("model_20231115120000_abc", val_path="azureml://other/val:v1")
+
+    assert ScopeMatcher(JOB_NAME_PATTERN, DATA_ASSETS, match_any=True).match(job) is not None
+
+
+def test_pattern_without_named_groups_is_rejected():
+    """Test that the pattern must name the group name and the training timestamp"""
+    with pytest.raises(Exception, match="named groups"):
+        ScopeMatcher(r"^model_[0-9]{14}_.*$", DATA_ASSETS)
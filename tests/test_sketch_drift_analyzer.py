@@ -0,0 +1,55 @@
+"""Tests for SketchDriftAnalyzer"""
+from unittest.mock import patch
+
+import pyarrow as pa
+from deltalake import write_deltalake
+
+from drift.registrating.sketch_cache import SketchCache
+from drift.registrating.sketch_drift_analyzer import SketchDriftAnalyzer
+
+
+def create_analyzer(tmp_path):
+    """Helper to create an analyzer of a local Delta table"""
+    return SketchDriftAnalyzer(str(tmp_path / "table"), {}, SketchCache(str(tmp_path / "cache")), bins=4)
+
+
+def test_compute_statistics(tmp_path):
+    """Test the statistics of numeric and categorical columns"""
+    write_deltalake(str(tmp_path / "table"), pa.table({"value": [float(index) for index in range(100)], "category": ["a", "b", None, "a"] * 25}))
+
+    statistics = create_analyzer(tmp_path).compute_statistics(0, None)
+
+    assert statistics["row_count"] == 100
+    assert statistics["drift_score"] is None
+    assert abs(statistics["columns"]["value"]["distinct"] - 100) <= 2
+    assert statistics["columns"]["value"]["quantiles"] == [24.0, 49.0, 74.0]
+    assert statistics["columns"]["category"]["null_rate"] == 0.25
+    assert statistics["columns"]["category"]["frequencies"]["a"] == 50 / 75
+
+
+def test_only_added_files_are_sketched(tmp_path):
+    """Test that the files of the previous snapshot are read from the cache"""
+    analyzer = create_analyzer(tmp_path)
+    write_deltalake(str(tmp_path / "table"), pa.table({"value": [float(index) for index in range(100)]}))
+    previous_statistics = analyzer.compute_statistics(0, None)
+    write_deltalake(str(tmp_path / "table"), pa.table({"value": [float(index) for index in range(100)]}), mode="append")
+
+    with patch.object(SketchDriftAnalyzer, "sketch_file", wraps=SketchDriftAnalyzer.sketch_file) as mock_sketch_file:
+        statistics = analyzer.compute_statistics(1, previous_statistics)
+
+    assert mock_sketch_file.call_count == 1
+    assert statistics["row_count"] == 200
+    assert statistics["drift_score"] < 0.01
+
+
+def test_drift_is_detected(tmp_path):
+    """Test that shifted values and frequencies increase the drift score"""
+    analyzer = create_analyzer(tmp_path)
+    write_deltalake(str(tmp_path / "table"), pa.table({"value": [float(index) for index in range(100)], "category": ["a", "b"] * 50}))
+    previous_statistics = analyzer.compute_statistics(0, None)
+    write_deltalake(str(tmp_path / "table"), pa.table({"value": [float(index) + 50 for index in range(100)], "category": ["a"] * 100}), mode="overwrite")
+
+    statistics = analyzer.compute_statistics(1, previous_statistics)
+
+    assert statistics["columns"]["value"]["psi"] > 0.2
+    assert statistics["columns"]["category"]["psi"] > 0.2
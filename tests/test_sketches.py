@@ -0,0 +1,96 @@
+"""Tests for the mergeable sketches"""
+from unittest.mock import patch
+
+import pyarrow as pa
+
+from drift.registrating import sketches
+from drift.registrating.sketches import ColumnSketch, CountMinSketch, HyperLogLog, KllSketch, bit_length, hash_values
+
+
+def test_hyperloglog_estimates_distinct_values():
+    """Test that the distinct count of numeric and string values is estimated within a few percent"""
+    numeric_sketch = HyperLogLog()
+    numeric_sketch.update(hash_values(pa.array(list(range(50000)) * 2)))
+    string_sketch = HyperLogLog()
+    string_sketch.update(hash_values(pa.array([f"value-{index}" for index in range(20000)])))
+
+    assert abs(numeric_sketch.estimate() - 50000) < 2500
+    assert abs(string_sketch.estimate() - 20000) < 1000
+
+
+def test_hyperloglog_merge_is_a_union():
+    """Test that merging sketches of overlapping values estimates the distinct count of the union"""
+    sketch = HyperLogLog()
+    sketch.update(hash_values(pa.array(range(0, 30000))))
+    other_sketch = HyperLogLog()
+    other_sketch.update(hash_values(pa.array(range(20000, 50000))))
+
+    sketch.merge(other_sketch)
+
+    assert abs(sketch.estimate() - 50000) < 2500
+
+
+def test_kll_quantiles_of_merged_sketches():
+    """Test that the quantiles of merged sketches are close to the exact quantiles"""
+    sketch = KllSketch()
+    sketch.update(pa.array([float(value) for value in range(0, 50000)]))
+    other_sketch = KllSketch()
+    other_sketch.update(pa.array([float(value) for value in range(50000, 100000)]))
+
+    sketch.merge(other_sketch)
+    quantiles = sketch.quantiles([0.1, 0.5, 0.9])
+
+    assert sketch.count() == 100000
+    assert abs(quantiles[0] - 10000) < 2000
+    assert abs(quantiles[1] - 50000) < 2000
+    assert abs(quantiles[2] - 90000) < 2000
+    assert abs(sketch.cdf(25000.0) - 0.25) < 0.02
+
+
+def test_kll_empty_sketch():
+    """Test that an empty sketch has no quantiles"""
+    assert KllSketch().quantiles([0.5]) is None
+
+
+def test_count_min_tracks_most_frequent_values():
+    """Test that the most frequent values are tracked across merges"""
+    sketch = CountMinSketch(top_k=2)
+    sketch.update(pa.array(["a"] * 300 + ["b"] * 100 + [str(index) for index in range(1000)]))
+    other_sketch = CountMinSketch(top_k=2)
+    other_sketch.update(pa.array(["b"] * 300 + ["c"] * 50))
+
+    sketch.merge(other_sketch)
+
+    assert list(sketch.heavy_hitters) == ["b", "a"]
+    assert sketch.estimate_all(["b"])["b"] >= 400
+
+
+def test_column_sketch_round_trip():
+    """Test that the sketches of a column are serialized and restored"""
+    sketch = ColumnSketch.for_type(pa.string())
+    sketch.update(pa.array(["a", None, "b", "a"]))
+
+    restored_sketch = ColumnSketch.from_dict(sketch.to_dict())
+
+    assert restored_sketch.count == 3
+    assert restored_sketch.null_count == 1
+    assert restored_sketch.quantiles is None
+    assert restored_sketch.frequencies.heavy_hitters == {"a": 2, "b": 1}
+    assert round(restored_sketch.distinct.estimate()) == 2
+
+
+def test_column_sketch_hashes_strings_once():
+    """Test that the strings of a column are hashed once for both the distinct values and the frequencies"""
+    sketch = ColumnSketch.for_type(pa.string())
+
+    with patch("drift.registrating.sketches.hash_values", wraps=sketches.hash_values) as mock_hash_values:
+        sketch.update(pa.array(["a", "b", "a"]).dictionary_encode())
+
+    # The other call only hashes the heavy hitter candidates
+    assert [len(call.args[0]) for call in mock_hash_values.call_args_list].count(3) == 1
+    assert sketch.frequencies.estimate_all(["a", "b"]) == {"a": 2, "b": 1}
+
+
+def test_bit_length():
+    """Test the number of bits of unsigned 64 bits values"""
+    assert bit_length(pa.array([0, 1, 3, 255, 2**63], pa.uint64())).to_pylist() == [0, 1, 2, 8, 64]
@@ -0,0 +1,22 @@
+"""Tests for SubmissionJournal"""
+from drift.retraining.submission_journal import SubmissionJournal
+
+
+def test_journal_survives_restart(tmp_path):
+    """Test that the submitted jobs and the Drift run id are read back by a new journal"""
+    journal = SubmissionJournal(str(tmp_path), "run-1")
+    journal.set_drift_run_id("abc")
+    journal.record("model", "job1")
+
+    restarted_journal = SubmissionJournal(str(tmp_path), "run-1")
+
+    assert restarted_journal.drift_run_id == "abc"
+    assert restarted_journal.get_submitted_job("model") == "job1"
+    assert restarted_journal.get_submitted_job("other") is None
+
+
+def test_journals_are_keyed(tmp_path):
+    """Test that the journals of different runs are independent"""
+    SubmissionJournal(str(tmp_path), "run-1").record("model", "job1")
+
+    assert SubmissionJournal(str(tmp_path), "run-2").get_submitted_job("model") is None
@@ -0,0 +1,35 @@
+"""Tests for TemplateCache"""
+from datetime import datetime, timezone
+
+from azure.ai.ml import Input
+from azure.ai.ml.entities import PipelineJob
+
+from drift.retraining.job_group import JobGroup
+from drift.retraining.template_cache import TemplateCache
+
+
+def create_pipeline_job(name):
+    """Helper to create a pipeline job that can be serialized"""
+    job = PipelineJob(display_name="model_20231115120000_abc", inputs={"training_data": Input(type="mltable", path="azureml:train:1")}, jobs={}, compute="cpu")
+    job.name = name
+    return job
+
+
+def test_templates_survive_restart(tmp_path):
+    """Test that the cached templates, listing time and durations are read back"""
+    listed_at = datetime(2023, 11, 15, 12, 0, tzinfo=timezone.utc)
+    TemplateCache(str(tmp_path), "scope").save([JobGroup("model", 20231115120000, create_pipeline_job("job1"))], listed_at, {"model": [60.0]})
+
+    template_cache = TemplateCache(str(tmp_path), "scope")
+
+    assert template_cache.listed_at == listed_at
+    assert template_cache.templates["model"].job_name == "job1"
+    assert template_cache.durations == {"model": [60.0]}
+    assert template_cache.load_job("model").compute == "cpu"
+
+
+def test_cache_of_another_scope_is_ignored(tmp_path):
+    """Test that a cache built for another scope is empty"""
+    TemplateCache(str(tmp_path), "scope").save([JobGroup("model", 20231115120000, create_pipeline_job("job1"))], datetime.now(timezone.utc), {})
+
+    assert TemplateCache(str(tmp_path), "other-scope").is_empty()
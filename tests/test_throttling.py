@@ -0,0 +1,58 @@
+"""Tests for the throttling tools"""
+from unittest.mock import Mock, patch
+
+import pytest
+from azure.core.exceptions import HttpResponseError
+
+from drift.tools.throttling import RateLimiter, call_with_retry
+
+
+def create_http_error(status_code, retry_after=None):
+    """Helper to create an HTTP error with an optional Retry-After header"""
+    response = Mock(status_code=status_code, headers={} if retry_after is None else {"Retry-After": retry_after})
+    error = HttpResponseError(message="error", response=response)
+    error.status_code = status_code
+    return error
+
+
+@patch("drift.tools.throttling.time.sleep")
+def test_retry_honors_retry_after(mock_sleep):
+    """Test that throttled requests are retried after the delay requested by the service"""
+    function = Mock(side_effect=[create_http_error(429, "7"), "created"])
+
+    assert call_with_retry(function, max_retries=3, backoff_delay=1) == "created"
+    mock_sleep.assert_called_once_with(7.0)
+
+
+@patch("drift.tools.throttling.time.sleep")
+def test_retry_gives_up_after_max_retries(mock_sleep):
+    """Test that the error is raised once the retries are exhausted"""
+    function = Mock(side_effect=create_http_error(503))
+
+    with pytest.raises(HttpResponseError):
+        call_with_retry(function, max_retries=2, backoff_delay=1)
+
+    assert function.call_count == 3
+    assert mock_sleep.call_count == 2
+
+
+def test_no_retry_on_other_errors():
+    """Test that non throttling errors are raised immediately"""
+    function = Mock(side_effect=create_http_error(400))
+
+    with pytest.raises(HttpResponseError):
+        call_with_retry(function, max_retries=3, backoff_delay=1)
+
+    assert function.call_count == 1
+
+
+@patch("drift.tools.throttling.time.sleep")
+def test_rate_limiter_spaces_requests(mock_sleep):
+    """Test that the rate limiter waits between consecutive requests"""
+    rate_limiter = RateLimiter(2)
+
+    rate_limiter.acquire()
+    rate_limiter.acquire()
+
+    assert mock_sleep.call_count == 1
+    assert mock_sleep.call_args[0][0] == pytest.approx(0.5, abs=0.05)
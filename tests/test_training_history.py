@@ -0,0 +1,57 @@
+"""Tests for TrainingHistory"""
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+from drift.retraining.training_history import TrainingHistory
+from tests.conftest import create_mock_pipeline_job
+
+
+def create_finished_job(status, minutes, day=15):
+    """Helper to create a job created on the given day of November 2023 which ran for the given minutes"""
+    job = create_mock_pipeline_job("model_20231115120000_abc", status=status)
+    created_at = datetime(2023, 11, day, 12, 0)
+    job.creation_context = Mock(created_at=created_at, last_modified_at=created_at + timedelta(minutes=minutes))
+    return job
+
+
+def test_expected_duration_is_median_of_completed_jobs():
+    """Test that only completed jobs are recorded and the median is expected"""
+    history = TrainingHistory()
+
+    history.add_job("model", create_finished_job("Completed", 10))
+    history.add_job("model", create_finished_job("Completed", 30))
+    history.add_job("model", create_finished_job("Completed", 20))
+    history.add_job("model", create_finished_job("Failed", 1))
+
+    assert history.get_expected_durations() == {"model": 1200}
+
+
+def test_history_keeps_latest_durations():
+    """Test that only the latest durations are kept per group"""
+    history = TrainingHistory(max_durations=2)
+
+    for duration in [100, 200, 300]:
+        history.add_duration("model", duration)
+
+    assert history.durations["model"] == [200, 300]
+
+
+def test_history_keeps_newest_jobs_listed_newest_first():
+    """Test that the durations of the newest jobs are kept when the jobs are listed from the newest to the oldest"""
+    history = TrainingHistory(max_durations=2)
+
+    for day, minutes in [(18, 40), (17, 30), (16, 20), (15, 10)]:
+        history.add_job("model", create_finished_job("Completed", minutes, day))
+
+    assert history.durations["model"] == [1800, 2400]
+
+
+def test_history_orders_undated_durations_first():
+    """Test that the undated durations, e.g. read from a cache, are older than the durations of listed jobs"""
+    history = TrainingHistory(max_durations=2)
+
+    history.add_job("model", create_finished_job("Completed", 30))
+    history.add_duration("model", 100)
+    history.add_duration("model", 200)
+
+    assert history.durations["model"] == [200, 1800]
@@ -1,12 +1,15 @@
 """Tests for TrainingStatusRefresher"""
 from datetime import datetime, timedelta
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import pytest
 
+from drift.retraining.scope_matcher import ScopeMatcher
 from drift.retraining.training_status_refresher import TrainingStatusRefresher
 from tests.conftest import create_mock_pipeline_job
 
+JOB_NAME_PATTERN = r"^(?P<group_name>[a-z_]{2,})_(?P<training_timestamp>[0-9]{14})_.*$"
+
 
 @pytest.fixture
 def refresher(mock_job_config, mock_ml_client):
@@ -38,6 +41,15 @@ def test_refresh_filters_completed_jobs(refresher):
     assert result[0].status == "Running"
 
 
+def test_group_name_parsed_with_job_name_pattern(mock_job_config, mock_ml_client):
+    """Test that the group is parsed with the pattern selecting the jobs, the other jobs using the default settings"""
+    refresher = TrainingStatusRefresher(mock_job_config, mock_ml_client, ScopeMatcher(JOB_NAME_PATTERN, []))
+
+    assert refresher.get_group_name(create_mock_pipeline_job("model_a_20240101000000_x")) == "model_a"
+    assert refresher.get_group_name(create_mock_pipeline_job("Job 1")) is None
+    assert TrainingStatusRefresher(mock_job_config, mock_ml_client).get_group_name(create_mock_pipeline_job("model_a_20240101000000_x")) is None
+
+
 def test_timeout_raises_exception(refresher):
     """Test that exceeding timeout raises an exception"""
     past_time = datetime.now() - timedelta(seconds=1)
@@ -60,7 +72,7 @@ def test_wait_training_polls_until_done(mock_sleep, refresher):
     result = refresher.wait_training([job])
     
     assert len(result) == 0  # No failed jobs
-    assert mock_sleep.call_count == 2
+    assert mock_sleep.call_count == 1  # No sleep after the last check
 
 
 @patch("drift.retraining.training_status_refresher.time.sleep")
@@ -73,3 +85,139 @@ def test_wait_training_returns_failed_jobs(mock_sleep, refresher):
     
     assert len(result) == 1
     assert result[0].status == "Failed"
+
+
+@patch("drift.retraining.training_status_refresher.time.sleep")
+def test_wait_training_stops_at_canceled_jobs(mock_sleep, refresher):
+    """Test that the canceled jobs are not polled anymore nor reported as failed, unlike the jobs not responding"""
+    refresher.ml_client.jobs.get.side_effect = [
+        create_mock_pipeline_job("Job 1", name="job1", status="Canceled"),
+        create_mock_pipeline_job("Job 2", name="job2", status="NotResponding"),
+    ]
+
+    result = refresher.wait_training([create_mock_pipeline_job("Job 1", name="job1"), create_mock_pipeline_job("Job 2", name="job2")])
+
+    assert [job.name for job in result] == ["job2"]
+    mock_sleep.assert_not_called()
+
+
+def test_batched_refresh_lists_jobs_of_the_run(mock_job_config, mock_ml_client):
+    """Test that the batched refresh uses one listing per run and falls back to get for missing jobs"""
+    mock_job_config.parameters["batchedRefresh"] = "true"
+    refresher = TrainingStatusRefresher(mock_job_config, mock_ml_client)
+
+    job1 = create_mock_pipeline_job("Job 1", name="job1")
+    job1.properties = {"drift_run_id": "run"}
+    job2 = create_mock_pipeline_job("Job 2", name="job2")
+    job2.properties = {"drift_run_id": "run"}
+
+    refresher.ml_client.jobs.list.return_value = [create_mock_pipeline_job("Job 1", name="job1", status="Completed")]
+    refresher.ml_client.jobs.get.return_value = create_mock_pipeline_job("Job 2", name="job2", status="Running")
+
+    result = refresher.refresh_job_status([job1, job2])
+
+    refresher.ml_client.jobs.list.assert_called_once_with(properties="drift_run_id=run")
+    refresher.ml_client.jobs.get.assert_called_once_with("job2")
+    assert [job.name for job in result] == ["job2"]
+
+
+@patch("drift.retraining.training_status_refresher.time.sleep")
+def test_adaptive_refresh_waits_for_expected_duration(mock_sleep, mock_job_config, mock_ml_client):
+    """Test that the adaptive refresh postpones the checks of jobs far from their expected end"""
+    mock_job_config.parameters["adaptiveRefresh"] = "true"
+    refresher = TrainingStatusRefresher(mock_job_config, mock_ml_client, ScopeMatcher(JOB_NAME_PATTERN, []))
+
+    job = create_mock_pipeline_job("model_20231115120000_abc", name="job1")
+    refresher.ml_client.jobs.get.side_effect = [
+        create_mock_pipeline_job("model_20231115120000_abc", name="job1", status="Running"),
+        create_mock_pipeline_job("model_20231115120000_abc", name="job1", status="Completed"),
+    ]
+
+    result = refresher.wait_training([job], {"model": 1200})
+
+    assert len(result) == 0
+    assert mock_sleep.call_count == 1
+    assert mock_sleep.call_args[0][0] > 500
+
+
+@patch("drift.retraining.training_status_refresher.time.sleep")
+def test_fail_fast_cancels_pending_jobs(mock_sleep, mock_job_config, mock_ml_client):
+    """Test that the first failure cancels the pending jobs and stops the waiting"""
+    mock_job_config.parameters["failFast"] = "true"
+    refresher = TrainingStatusRefresher(mock_job_config, mock_ml_client)
+
+    jobs = [create_mock_pipeline_job("Job 1", name="job1"), create_mock_pipeline_job("Job 2", name="job2")]
+    refresher.ml_client.jobs.get.side_effect = [
+        create_mock_pipeline_job("Job 1", name="job1", status="Failed"),
+        create_mock_pipeline_job("Job 2", name="job2", status="Running"),
+    ]
+
+    result = refresher.wait_training(jobs)
+
+    assert [job.name for job in result] == ["job1", "job2"]
+    refresher.ml_client.jobs.begin_cancel.assert_called_once_with("job2")
+    assert mock_sleep.call_count == 0
+
+
+@patch("drift.retraining.training_status_refresher.time.sleep")
+def test_group_deadline_stops_waiting(mock_sleep, mock_job_config, mock_ml_client):
+    """Test that a job past its group deadline is abandoned and reported"""
+    mock_job_config.parameters["groupTimeouts"] = {"model": "0"}
+    mock_job_config.parameters["stopAction"] = "abandon"
+    refresher = TrainingStatusRefresher(mock_job_config, mock_ml_client, ScopeMatcher(JOB_NAME_PATTERN, []))
+
+    job = create_mock_pipeline_job("model_20231115120000_abc", name="job1")
+    refresher.ml_client.jobs.get.return_value = create_mock_pipeline_job("model_20231115120000_abc", name="job1", status="Running")
+
+    result = refresher.wait_training([job])
+
+    assert [job.name for job in result] == ["job1"]
+    refresher.ml_client.jobs.begin_cancel.assert_not_called()
+
+
+def test_detach_returns_immediately(mock_job_config, mock_ml_client):
+    """Test that the detach mode hands the monitoring back to Azure ML"""
+    mock_job_config.parameters["waitMode"] = "detach"
+    refresher = TrainingStatusRefresher(mock_job_config, mock_ml_client)
+
+    assert refresher.wait_training([create_mock_pipeline_job("Job 1", name="job1")]) == []
+    refresher.ml_client.jobs.get.assert_not_called()
+
+
+@patch("drift.retraining.training_status_refresher.time.sleep")
+def test_wait_training_submits_queued_groups(mock_sleep, refresher):
+    """Test that the scheduler submits the queued groups as the running jobs finish"""
+    scheduler = Mock()
+    next_job = create_mock_pipeline_job("model_20231115120000_def", name="job2")
+    scheduler.release.side_effect = [[], [next_job], []]
+    refresher.ml_client.jobs.get.side_effect = [
+        create_mock_pipeline_job("model_20231115120000_abc", name="job1", status="Running"),
+        create_mock_pipeline_job("model_20231115120000_abc", name="job1", status="Completed"),
+        create_mock_pipeline_job("model_20231115120000_def", name="job2", status="Completed"),
+    ]
+
+    result = refresher.wait_training([create_mock_pipeline_job("model_20231115120000_abc", name="job1")], scheduler=scheduler)
+
+    assert len(result) == 0
+    assert scheduler.release.call_args_list[1][0][0] == set()
+    assert [call[0][0] for call in refresher.ml_client.jobs.get.call_args_list] == ["job1", "job1", "job2"]
+
+
+@patch("drift.retraining.training_status_refresher.time.sleep")
+def test_detach_after_queued_groups_are_submitted(mock_sleep, mock_job_config, mock_ml_client):
+    """Test that the detach mode first waits for the queued groups to be submitted"""
+    mock_job_config.parameters["waitMode"] = "detach"
+    refresher = TrainingStatusRefresher(mock_job_config, mock_ml_client)
+    scheduler = Mock(queue=["group"])
+    scheduler.has_queued_jobs.side_effect = [True, True, False]
+    scheduler.release.side_effect = [[], [create_mock_pipeline_job("model_20231115120000_def", name="job2")]]
+    refresher.ml_client.jobs.get.side_effect = [
+        create_mock_pipeline_job("model_20231115120000_abc", name="job1", status="Running"),
+        create_mock_pipeline_job("model_20231115120000_abc", name="job1", status="Completed"),
+    ]
+
+    result = refresher.wait_training([create_mock_pipeline_job("model_20231115120000_abc", name="job1")], scheduler=scheduler)
+
+    assert result == []
+    assert scheduler.release.call_count == 2
+    assert refresher.ml_client.jobs.get.call_count == 2
@@ -0,0 +1,38 @@
+"""Tests for WaitPolicy"""
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import pytest
+
+from drift.retraining.wait_policy import WaitPolicy
+
+
+def create_policy(**parameters):
+    """Helper to create a wait policy from job parameters"""
+    job_config = Mock()
+    job_config.parameters = parameters
+    return WaitPolicy(job_config)
+
+
+def test_default_policy():
+    """Test that the default policy only relies on the global timeout"""
+    policy = create_policy()
+
+    assert policy.fail_fast is False
+    assert policy.detach is False
+    assert policy.get_deadline("model", datetime(2023, 11, 15), {"model": 600}) is None
+
+
+def test_configured_group_timeout_prevails():
+    """Test that a configured group timeout prevails over the history"""
+    policy = create_policy(groupTimeouts={"model": "300"}, deadlineFactor="2")
+    started_at = datetime(2023, 11, 15)
+
+    assert policy.get_deadline("model", started_at, {"model": 600}) == started_at + timedelta(seconds=300)
+    assert policy.get_deadline("other", started_at, {"other": 600}) == started_at + timedelta(seconds=1200)
+
+
+def test_unknown_stop_action_raises():
+    """Test that an unknown stop action is rejected"""
+    with pytest.raises(Exception, match="Unknown stop action"):
+        create_policy(stopAction="ignore")